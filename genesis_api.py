@@ -17,6 +17,9 @@ Docs:  http://localhost:8080/docs
 UI:    http://localhost:8080/ui
 """
 
+import asyncio
+import atexit
+import gc
 import json
 import hashlib
 import hmac
@@ -25,29 +28,91 @@ import secrets
 import sqlite3
 import sys
 import os
+import queue
+import random
 import time
 import threading
-from collections import defaultdict, deque
+from collections import OrderedDict, defaultdict, deque
+from contextlib import asynccontextmanager, contextmanager
+from concurrent.futures import ThreadPoolExecutor
+from contextvars import ContextVar, copy_context
 from datetime import datetime, timezone
 from pathlib import Path
-from typing import Optional
+from typing import Callable, Optional
 
 import urllib.request
 import urllib.error
+import httpx
 import psutil
 import numpy as np
-from fastapi import FastAPI, HTTPException, Depends, Request, Security
+from anyio import to_thread
+from fastapi import FastAPI, HTTPException, Depends, Query, Request, Response, Security, WebSocket, WebSocketDisconnect
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import RedirectResponse
+from fastapi.responses import JSONResponse, PlainTextResponse, RedirectResponse, StreamingResponse
 from fastapi.security import APIKeyHeader
 from fastapi.staticfiles import StaticFiles
 from pydantic import BaseModel, model_validator, Field
+from prometheus_client import (
+    CONTENT_TYPE_LATEST, CollectorRegistry, Counter, Gauge, Histogram,
+    GCCollector, PlatformCollector, ProcessCollector, disable_created_metrics, generate_latest, multiprocess,
+)
+from prometheus_client.core import CounterMetricFamily, GaugeMetricFamily
 import uvicorn
 
+try:  # optional fast JSON path (pip install orjson) — stdlib json otherwise
+    import orjson
+except ImportError:
+    orjson = None
+
+# ─────────────────────────────────────────────────────────────
+# JSON RESPONSES — orjson when installed, stdlib fallback
+# _JSONResponse is the app's default_response_class. Handlers with a
+# known plain-dict shape return it directly, which skips FastAPI's
+# jsonable_encoder walk. GENESIS_JSON_BACKEND=stdlib forces the fallback.
+# ─────────────────────────────────────────────────────────────
+_JSON_BACKEND = os.environ.get("GENESIS_JSON_BACKEND", "orjson").lower()
+_USE_ORJSON = orjson is not None and _JSON_BACKEND != "stdlib"
+_ORJSON_OPTS = (orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS) if orjson is not None else 0
+
+
+def _json_default(obj):
+    """stdlib fallback for what orjson encodes natively (NumPy scalars/arrays, datetimes)."""
+    if isinstance(obj, (np.generic, np.ndarray)):
+        return obj.tolist()
+    if isinstance(obj, datetime):
+        return obj.isoformat()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def _json_dumps(content) -> bytes:
+    if _USE_ORJSON:
+        return orjson.dumps(content, option=_ORJSON_OPTS)
+    return json.dumps(content, ensure_ascii=False, allow_nan=False, separators=(",", ":"),
+                      default=_json_default).encode()
+
+
+_json_loads = orjson.loads if _USE_ORJSON else json.loads
+
+
+class _JSONResponse(JSONResponse):
+    def render(self, content) -> bytes:
+        return _json_dumps(content)
+
+
 # ─────────────────────────────────────────────────────────────
 # APP SETUP
 # ─────────────────────────────────────────────────────────────
 
+@asynccontextmanager
+async def _lifespan(app: FastAPI):
+    """Start the background workers with the server (the samplers also start on first use)."""
+    _host_sampler.start()
+    _probes.start()
+    _rule_sync.start()
+    yield
+    await _llama.aclose()
+
+
 app = FastAPI(
     title="GENESIS v10.1 - Sovereign AI OS",
     description="""
@@ -77,6 +142,8 @@ GitHub: https://github.com/Alvoradozerouno/GENESIS-v10.1
         "name": "Apache 2.0",
         "url": "https://www.apache.org/licenses/LICENSE-2.0",
     },
+    default_response_class=_JSONResponse,
+    lifespan=_lifespan,
 )
 
 app.add_middleware(
@@ -91,26 +158,246 @@ _STATIC_DIR = Path(__file__).parent / "static"
 if _STATIC_DIR.exists():
     app.mount("/ui", StaticFiles(directory=str(_STATIC_DIR), html=True), name="ui")
 
+# ─────────────────────────────────────────────────────────────
+# METRICS — prometheus_client instruments
+# Counters, histograms and live gauges are updated where the work
+# happens; /metrics only serializes them plus a few values read from
+# in-process caches (see _StateCollector) — no database query per scrape.
+# Multi-worker: point PROMETHEUS_MULTIPROC_DIR at an empty directory
+# before start; each worker then keeps its values in mmap files there
+# and whichever worker serves the scrape sums all of them. Live gauges
+# (in flight, busy, queued) only count workers that are still running.
+# ─────────────────────────────────────────────────────────────
+_PROM_MULTIPROC_DIR = os.environ.get("PROMETHEUS_MULTIPROC_DIR", "")
+_LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+_LLM_BUCKETS     = (0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+_LAG_BUCKETS     = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+_GC_BUCKETS      = (0.0001, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1.0)
+
+disable_created_metrics()
+_METRICS_REGISTRY = CollectorRegistry()
+if _PROM_MULTIPROC_DIR:
+    os.makedirs(_PROM_MULTIPROC_DIR, exist_ok=True)
+    atexit.register(lambda: multiprocess.mark_process_dead(os.getpid()))
+else:  # process_* / python_* collectors read this process only, so single-process mode only
+    ProcessCollector(registry=_METRICS_REGISTRY)
+    PlatformCollector(registry=_METRICS_REGISTRY)
+    GCCollector(registry=_METRICS_REGISTRY)
+
+
+def _live_gauge(name: str, doc: str, labels: tuple = ()) -> Gauge:
+    return Gauge(name, doc, labels, registry=_METRICS_REGISTRY, multiprocess_mode="livesum")
+
+
+_HTTP_LATENCY = Histogram("genesis_http_request_duration_seconds", "Request latency by route template and status",
+                          ("method", "route", "status"), buckets=_LATENCY_BUCKETS, registry=_METRICS_REGISTRY)
+_HTTP_ERRORS = Counter("genesis_http_errors", "4xx/5xx responses by route template", ("route", "class"),
+                       registry=_METRICS_REGISTRY)
+_HTTP_IN_FLIGHT = _live_gauge("genesis_http_requests_in_flight", "Requests currently being served")
+_PHASE_LATENCY = Histogram("genesis_phase_duration_seconds", "Handler phase latency (auth, rate, score, checks, audit, llm)",
+                           ("phase",), buckets=_LATENCY_BUCKETS, registry=_METRICS_REGISTRY)
+
+_EXECUTOR_WORKERS = _live_gauge("genesis_executor_workers", "Threads per blocking-work pool", ("pool",))
+_EXECUTOR_BUSY    = _live_gauge("genesis_executor_busy", "Pool threads currently running a task", ("pool",))
+_EXECUTOR_QUEUED  = _live_gauge("genesis_executor_queued", "Tasks waiting for a free pool thread", ("pool",))
+_EXECUTOR_WAIT = Histogram("genesis_executor_wait_seconds", "Time from submit to start on a pool thread",
+                           ("pool",), buckets=_LATENCY_BUCKETS, registry=_METRICS_REGISTRY)
+
+_RISK_SCORES = Counter("genesis_risk_scores", "Risk scores computed, by framework and level",
+                       ("framework", "level"), registry=_METRICS_REGISTRY)
+_COMPLIANCE_EVALUATIONS = Counter("genesis_compliance_evaluations", "Framework evaluations (cache misses, /all, bulk tenants) by outcome",
+                                  ("framework", "status"), registry=_METRICS_REGISTRY)
+_COMPLIANCE_CACHE_HITS   = Counter("genesis_compliance_cache_hits", "Compliance results served from the content-addressed cache",
+                                   registry=_METRICS_REGISTRY)
+_COMPLIANCE_CACHE_MISSES = Counter("genesis_compliance_cache_misses", "Compliance evaluations that missed the cache",
+                                   registry=_METRICS_REGISTRY)
+_SIGNATURES = Counter("genesis_signatures", "QES document signatures issued, by provider", ("provider",),
+                      registry=_METRICS_REGISTRY)
+_LLM_REQUESTS = Counter("genesis_llm_requests", "LLM explanation requests by outcome (ok, offline, timeout, error, cancelled)",
+                        ("outcome",), registry=_METRICS_REGISTRY)
+_LLM_LATENCY = Histogram("genesis_llm_request_duration_seconds", "llama-server completion latency",
+                         buckets=_LLM_BUCKETS, registry=_METRICS_REGISTRY)
+_LLM_FIRST_TOKEN = Histogram("genesis_llm_time_to_first_token_seconds", "Streamed explanations: request to first token",
+                             buckets=_LLM_BUCKETS, registry=_METRICS_REGISTRY)
+_LLM_SLOTS      = _live_gauge("genesis_llm_slots", "Concurrent llama-server completions allowed")
+_LLM_SLOTS_BUSY = _live_gauge("genesis_llm_slots_busy", "llama-server completions currently in flight")
+_LLM_SLOT_WAIT = Histogram("genesis_llm_slot_wait_seconds", "Time a completion waited for a free llama-server slot",
+                           buckets=_LLM_BUCKETS, registry=_METRICS_REGISTRY)
+_EXPLAIN_CACHE_HITS   = Counter("genesis_explain_cache_hits", "AI explanations served from cache, by tier (memory, sqlite)",
+                                ("tier",), registry=_METRICS_REGISTRY)
+_EXPLAIN_CACHE_MISSES = Counter("genesis_explain_cache_misses", "AI explanations not cached in either tier",
+                                registry=_METRICS_REGISTRY)
+
+_AUDIT_WRITES = Counter("genesis_audit_writes", "Audit entries written by this deployment", registry=_METRICS_REGISTRY)
+_AUDIT_QUEUE  = _live_gauge("genesis_audit_queue_depth", "Audit writes waiting for or running on the DB writer")
+_STREAM_SUBSCRIBERS = _live_gauge("genesis_stream_subscribers", "Open SSE/WebSocket assessment subscribers")
+_LOG_DROPPED = Counter("genesis_log_records_dropped", "Log records not written (queue full, sampled out, rate capped)",
+                       ("reason",), registry=_METRICS_REGISTRY)
+_LOG_QUEUE_DEPTH = _live_gauge("genesis_log_queue_depth", "Log records waiting for the writer thread")
+
+_LOOP_LAG = Histogram("genesis_event_loop_lag_seconds", "How late the event-loop heartbeat woke up",
+                      buckets=_LAG_BUCKETS, registry=_METRICS_REGISTRY)
+_LOOP_LAG_MAX = Gauge("genesis_event_loop_lag_max_seconds", "Worst heartbeat lag over the last minute",
+                      registry=_METRICS_REGISTRY, multiprocess_mode="livemax")
+_THREADPOOL_SIZE    = _live_gauge("genesis_threadpool_size", "anyio default thread limiter capacity (Starlette threadpool)")
+_THREADPOOL_BUSY    = _live_gauge("genesis_threadpool_busy", "anyio threadpool tokens in use")
+_THREADPOOL_WAITING = _live_gauge("genesis_threadpool_waiting", "Tasks waiting for an anyio threadpool token")
+_GC_PAUSE = Histogram("genesis_gc_pause_seconds", "Garbage collection pause by generation", ("generation",),
+                      buckets=_GC_BUCKETS, registry=_METRICS_REGISTRY)
+_GC_COLLECTED = Counter("genesis_gc_collected_objects", "Objects freed by the garbage collector", ("generation",),
+                        registry=_METRICS_REGISTRY)
+_PROCESS_RSS = _live_gauge("genesis_process_rss_bytes", "Resident set size")
+_ALLOCATED_BLOCKS = _live_gauge("genesis_python_allocated_blocks", "Memory blocks currently allocated by the interpreter")
+
 # ─────────────────────────────────────────────────────────────
 # STRUCTURED LOGGING — JSON output for Docker/log aggregators
 # Replaces raw print() calls; pipe to Loki / CloudWatch / etc.
+# The handler only enqueues: formatting and the write happen on a
+# background thread in batches, so a slow stdout never stalls a request.
+# Full queue → record dropped and counted. Below WARNING, events can be
+# sampled (GENESIS_LOG_SAMPLE="request=0.01,…") and capped per second
+# (GENESIS_LOG_RATE_CAP). Records carry a reference to the ASGI scope of
+# the request that logged them; route, tenant and latency are read from
+# it at format time.
 # ─────────────────────────────────────────────────────────────
+_LOG_QUEUE_SIZE = int(os.environ.get("GENESIS_LOG_QUEUE_SIZE", "10000"))
+_LOG_BATCH      = 256
+_LOG_RATE_CAP   = int(os.environ.get("GENESIS_LOG_RATE_CAP", "0"))  # records/s per event, 0 = unlimited
+_LOG_SAMPLE: dict[str, float] = {
+    event.strip(): float(rate)
+    for event, _, rate in (item.partition("=") for item in os.environ.get("GENESIS_LOG_SAMPLE", "").split(","))
+    if event.strip()
+}
+
+_request_scope: ContextVar[Optional[dict]] = ContextVar("genesis_request_scope", default=None)
+_RECORD_ATTRS = frozenset(vars(logging.makeLogRecord({}))) | {"message", "asctime", "request"}
+
 
 class _JsonFormatter(logging.Formatter):
-    """Emit every log record as a single-line JSON object."""
+    """Emit every log record as a single-line JSON object (extras and request context included)."""
     def format(self, record: logging.LogRecord) -> str:
         log: dict = {
-            "ts":     datetime.now(timezone.utc).isoformat(),
+            "ts":     datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
             "level":  record.levelname,
             "logger": record.name,
             "msg":    record.getMessage(),
         }
+        for key, value in record.__dict__.items():
+            if key not in _RECORD_ATTRS:
+                log[key] = value
+        scope = getattr(record, "request", None)
+        if scope is not None:
+            log["route"] = _route_label(scope)
+            log["tenant"] = scope.get("state", {}).get("tenant_id")
+            if "genesis.t0" in scope:
+                log["latency_ms"] = round((record.created - scope["genesis.t0"]) * 1000.0, 2)
         if record.exc_info:
             log["exc"] = self.formatException(record.exc_info)
-        return json.dumps(log)
-
-
-_handler = logging.StreamHandler()
+        return json.dumps(log, default=str)
+
+
+class _QueueLogHandler(logging.Handler):
+    """Enqueue-only handler; a daemon writer thread formats and writes batches."""
+
+    def __init__(self, stream, maxsize: int, sample: dict[str, float], rate_cap: int,
+                 dropped_metric: Optional[Counter] = None, depth_metric: Optional[Gauge] = None) -> None:
+        super().__init__()
+        self.stream = stream
+        self.queue: queue.Queue = queue.Queue(maxsize)
+        self.sample = sample
+        self.rate_cap = rate_cap
+        self.dropped = {"queue_full": 0, "sampled": 0, "rate_capped": 0}
+        self._dropped_metric = dropped_metric
+        self._depth_metric = depth_metric
+        if dropped_metric is not None:
+            for reason in self.dropped:
+                dropped_metric.labels(reason)  # export every reason from the start, zeros included
+        self._windows: dict[str, list] = {}  # event → [second, count]
+        self._writer: Optional[threading.Thread] = None
+        self._pid = 0
+
+    def emit(self, record: logging.LogRecord) -> None:  # called under the handler lock
+        if record.levelno < logging.WARNING:
+            event = record.msg
+            rate = self.sample.get(event)
+            if rate is not None and rate < 1.0 and random.random() >= rate:
+                self._drop("sampled")
+                return
+            if self.rate_cap:
+                second = int(record.created)
+                window = self._windows.get(event)
+                if window is None or window[0] != second:
+                    window = self._windows[event] = [second, 0]
+                if window[1] >= self.rate_cap:
+                    self._drop("rate_capped")
+                    return
+                window[1] += 1
+        record.request = _request_scope.get()
+        if self._pid != os.getpid():  # first record, or first in a forked worker
+            self._start()
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self._drop("queue_full")
+
+    def _drop(self, reason: str) -> None:
+        self.dropped[reason] += 1
+        if self._dropped_metric is not None:
+            self._dropped_metric.labels(reason).inc()
+
+    def _start(self) -> None:
+        self._pid = os.getpid()
+        self._writer = threading.Thread(target=self._drain, name="genesis-log-writer", daemon=True)
+        self._writer.start()
+
+    def _drain(self) -> None:
+        q = self.queue
+        while True:
+            records = [q.get()]
+            while len(records) < _LOG_BATCH:
+                try:
+                    records.append(q.get_nowait())
+                except queue.Empty:
+                    break
+            lines = []
+            for record in records:
+                if record is not None:
+                    try:
+                        lines.append(self.format(record))
+                    except Exception:
+                        pass
+            if lines:
+                try:
+                    self.stream.write("\n".join(lines) + "\n")
+                    self.stream.flush()
+                except Exception:
+                    pass
+            for _ in records:
+                q.task_done()
+            if self._depth_metric is not None:
+                self._depth_metric.set(q.qsize())
+            if None in records:
+                return
+
+    def flush(self, timeout: float = 2.0) -> None:
+        """Wait (bounded) until everything queued so far is written."""
+        deadline = time.monotonic() + timeout
+        while self.queue.unfinished_tasks and self._writer is not None and self._writer.is_alive():
+            if time.monotonic() > deadline:
+                break
+            time.sleep(0.005)
+
+    def close(self) -> None:
+        if self._writer is not None and self._writer.is_alive() and self._pid == os.getpid():
+            try:
+                self.queue.put(None, timeout=1.0)
+            except queue.Full:
+                pass
+            self._writer.join(timeout=2.0)
+        super().close()
+
+
+_handler = _QueueLogHandler(sys.stderr, _LOG_QUEUE_SIZE, _LOG_SAMPLE, _LOG_RATE_CAP, _LOG_DROPPED, _LOG_QUEUE_DEPTH)
 _handler.setFormatter(_JsonFormatter())
 _log = logging.getLogger("genesis")
 _log.setLevel(logging.INFO)
@@ -165,14 +452,6 @@ def _seed_default_keys() -> None:
             pass
 
 
-def _key_count() -> int:
-    try:
-        with sqlite3.connect(_DB_PATH) as conn:
-            return conn.execute("SELECT COUNT(*) FROM api_keys WHERE active=1").fetchone()[0]
-    except Exception:
-        return 0
-
-
 async def require_api_key(
     request: Request,
     api_key: Optional[str] = Security(_API_KEY_HEADER),
@@ -184,13 +463,20 @@ async def require_api_key(
         if auth.startswith("Bearer "):
             raw = auth[7:]
     if raw:
-        tenant_id = _lookup_key(raw)
+        with _phase("auth"):
+            tenant_id = await _db_readers.run(_lookup_key, raw)
         if tenant_id:
             request.state.tenant_id = tenant_id
             return tenant_id
     raise HTTPException(status_code=401, detail="Missing or invalid API key. Add header: X-API-Key: <key>")
 
 
+def _require_own_tenant(tenant_id: str, auth_tenant: str) -> None:
+    """Tenant-scoped routes: a key may only touch its own tenant's data."""
+    if tenant_id != auth_tenant:
+        raise HTTPException(status_code=403, detail=f"API key is not valid for tenant '{tenant_id}'.")
+
+
 async def require_admin_key(
     request: Request,
     api_key: Optional[str] = Security(_API_KEY_HEADER),
@@ -235,34 +521,592 @@ def _check_rate(key: str, limit: int) -> tuple[bool, int]:
         return True, remaining - 1
 
 
-@app.middleware("http")
-async def rate_limit_middleware(request: Request, call_next):
-    ip = request.client.host if request.client else "unknown"
-    method = request.method
-    path = request.url.path
-
-    # Determine limit tier
-    is_write = method in ("POST", "PUT", "PATCH", "DELETE")
-    limit = _RATE_WRITE if is_write else _RATE_GLOBAL
-    bucket_key = f"{ip}:{'w' if is_write else 'r'}"
-
-    allowed, remaining = _check_rate(bucket_key, limit)
-    if not allowed:
-        from fastapi.responses import JSONResponse
-        return JSONResponse(
-            status_code=429,
-            content={
-                "detail": f"Rate limit exceeded. Max {limit} {'write' if is_write else 'read'} requests/min per IP.",
-                "retry_after_seconds": int(_RATE_WINDOW),
+# Paths that bypass the rate limiter entirely: Prometheus scrapes, liveness /
+# readiness probes and the static dashboard assets. Checked with a plain prefix match, no allocation.
+_RATE_EXEMPT_PATHS    = ("/metrics", "/livez", "/readyz")
+_RATE_EXEMPT_PREFIXES = ("/ui/",)
+_WRITE_METHODS        = frozenset(("POST", "PUT", "PATCH", "DELETE"))
+
+
+def _is_exempt(path: str) -> bool:
+    return path in _RATE_EXEMPT_PATHS or path == "/ui" or path.startswith(_RATE_EXEMPT_PREFIXES)
+
+
+class _RateLimitMiddleware:
+    """
+    Pure-ASGI sliding-window rate limiter.
+    Avoids BaseHTTPMiddleware's per-request task + body stream wrapping:
+    the downstream app writes straight to the server's `send`, we only
+    append the X-RateLimit-* headers to the `http.response.start` message.
+    """
+
+    def __init__(self, app) -> None:
+        self.app = app
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope["type"] != "http" or _is_exempt(scope["path"]):
+            await self.app(scope, receive, send)
+            return
+
+        client = scope.get("client")
+        ip = client[0] if client else "unknown"
+        is_write = scope["method"] in _WRITE_METHODS
+        limit = _RATE_WRITE if is_write else _RATE_GLOBAL
+        with _phase("rate"):
+            allowed, remaining = _check_rate(f"{ip}:{'w' if is_write else 'r'}", limit)
+
+        if not allowed:
+            response = JSONResponse(
+                status_code=429,
+                content={
+                    "detail": f"Rate limit exceeded. Max {limit} {'write' if is_write else 'read'} requests/min per IP.",
+                    "retry_after_seconds": int(_RATE_WINDOW),
+                },
+                headers={"Retry-After": str(int(_RATE_WINDOW))},
+            )
+            await response(scope, receive, send)
+            return
+
+        extra = [
+            (b"x-ratelimit-limit", str(limit).encode()),
+            (b"x-ratelimit-remaining", str(remaining).encode()),
+            (b"x-ratelimit-window", b"60s"),
+        ]
+
+        async def send_with_headers(message) -> None:
+            if message["type"] == "http.response.start":
+                message["headers"] = [*message.get("headers", ()), *extra]
+            await send(message)
+
+        await self.app(scope, receive, send_with_headers)
+
+
+# ─────────────────────────────────────────────────────────────
+# REQUEST TIMING — per-route latency histograms + Server-Timing
+# Handlers mark phases with `with _phase("audit"): ...`; durations are
+# collected in a per-request ContextVar (copied into threadpool workers
+# by anyio) and exported as Prometheus histograms on /metrics.
+# Set GENESIS_SERVER_TIMING=1 to expose phases to clients.
+# ─────────────────────────────────────────────────────────────
+_SERVER_TIMING = os.environ.get("GENESIS_SERVER_TIMING", "0").lower() in ("1", "true", "yes")
+
+_request_phases: ContextVar[Optional[dict]] = ContextVar("genesis_request_phases", default=None)
+_ACCESS_LOG = _LOG_SAMPLE.get("request", 0.0) > 0  # per-request "request" line; off unless sampled in
+# Rejections by policy (bad / missing key, rate limit) are counted as
+# requests but not as errors: a throttled scraper is not a service fault.
+_NOT_ERRORS = frozenset({401, 429})
+
+
+class _RollingWindow:
+    """
+    Request / 4xx / 5xx counts per key over the last hour in fixed-width
+    time buckets. Counters live in one preallocated bucket-major NumPy
+    block (BUCKETS × keys × 3 int32, ~4 KB per key) under a single ring of
+    bucket epochs, and an extra all-keys ring backs aggregate(). record()
+    is O(1) under the lock; totals() and aggregate() only take references
+    under it and sum outside, so a scan never stalls requests. Rows idle for
+    a full span are recycled. 401 and 429 count as requests only
+    (_NOT_ERRORS).
+    """
+
+    SPAN = 3600
+    BUCKETS = 360  # 10 s buckets
+
+    def __init__(self, capacity: int = 64) -> None:
+        self.width = self.SPAN / self.BUCKETS
+        self._epochs = np.full(self.BUCKETS, -1, dtype=np.int64)  # epoch held by each bucket column
+        self._counts = np.zeros((self.BUCKETS, capacity, 3), dtype=np.int32)  # bucket → row → [requests, 4xx, 5xx]
+        self._total = np.zeros((self.BUCKETS, 3), dtype=np.int64)  # all keys
+        self._rows: dict[tuple, int] = {}
+        self._keys: list[Optional[tuple]] = []  # row → key; None = free
+        self._free: list[int] = []
+        self._lock = threading.Lock()
+
+    def _epoch(self, now: Optional[float]) -> int:
+        return int((time.monotonic() if now is None else now) / self.width)
+
+    def _claim(self, key: tuple) -> int:
+        if self._free:
+            row = self._free.pop()
+            self._keys[row] = key
+        else:
+            row = len(self._keys)
+            if row == self._counts.shape[1]:
+                grown = np.zeros((self.BUCKETS, 2 * row, 3), dtype=np.int32)
+                grown[:, :row] = self._counts
+                self._counts = grown
+            self._keys.append(key)
+        self._rows[key] = row
+        return row
+
+    def record(self, key: tuple, status: int, now: Optional[float] = None) -> None:
+        epoch = self._epoch(now)
+        idx = epoch % self.BUCKETS
+        kind = 2 if status >= 500 else 1 if status >= 400 and status not in _NOT_ERRORS else 0
+        with self._lock:
+            if self._epochs[idx] != epoch:
+                self._epochs[idx] = epoch
+                self._counts[idx] = 0
+                self._total[idx] = 0
+            row = self._rows.get(key)
+            if row is None:
+                row = self._claim(key)
+            counts, total = self._counts, self._total
+            counts[idx, row, 0] += 1
+            total[idx, 0] += 1
+            if kind:
+                counts[idx, row, kind] += 1
+                total[idx, kind] += 1
+
+    def _oldest(self, window: float, current: int) -> int:
+        return current - max(1, min(self.BUCKETS, round(window / self.width))) + 1
+
+    def aggregate(self, window: float, now: Optional[float] = None) -> list[int]:
+        """[requests, 4xx, 5xx] over the last `window` seconds across all keys (O(BUCKETS))."""
+        oldest = self._oldest(window, self._epoch(now))
+        with self._lock:
+            total = self._total[self._epochs >= oldest]  # copy, ≤ BUCKETS × 3
+        return total.sum(axis=0).tolist()
+
+    def totals(self, window: float, match: Optional[Callable[[tuple], bool]] = None,
+               now: Optional[float] = None) -> dict[tuple, list[int]]:
+        """{key: [requests, 4xx, 5xx]} over the last `window` seconds; idle keys are recycled."""
+        current = self._epoch(now)
+        oldest_live = current - self.BUCKETS + 1
+        oldest = self._oldest(window, current)
+        with self._lock:
+            epochs = self._epochs.copy()
+            counts = self._counts
+            keys = self._keys[:]
+        # Summed outside the lock: a concurrent record() may or may not be counted.
+        n = len(keys)
+        live = counts[epochs >= oldest_live, :n, 0].sum(axis=0)
+        sums = counts[epochs >= oldest, :n].sum(axis=0)
+        out = {}
+        for row in np.flatnonzero(sums[:, 0]).tolist():
+            key = keys[row]
+            if key is not None and (match is None or match(key)):
+                out[key] = sums[row].tolist()
+        idle = [row for row in np.flatnonzero(live == 0).tolist() if keys[row] is not None]
+        if idle:
+            self._release(idle, oldest_live)
+        return out
+
+    def _release(self, idle: list[int], oldest_live: int) -> None:
+        with self._lock:
+            stale = self._epochs < oldest_live
+            for row in idle:
+                key = self._keys[row]
+                if key is None or self._counts[~stale, row, 0].any():
+                    continue  # already freed, or recorded since the snapshot
+                self._counts[:, row] = 0
+                self._keys[row] = None
+                del self._rows[key]
+                self._free.append(row)
+
+
+def _route_error_rates() -> list[tuple[str, float]]:
+    by_route: dict[str, list[int]] = defaultdict(lambda: [0, 0])
+    for (route, _), (n, c4, c5) in _request_outcomes.totals(_ERROR_WINDOW).items():
+        by_route[route][0] += n
+        by_route[route][1] += c4 + c5
+    return [(r, round(e / n * 100.0, 2)) for r, (n, e) in sorted(by_route.items())]
+
+
+def _error_rates(window: float, match: Optional[Callable[[tuple], bool]] = None) -> dict:
+    """Aggregate live error rate over the window (optionally a subset of (route, tenant) keys)."""
+    if match is None:
+        requests, client_errors, server_errors = _request_outcomes.aggregate(window)
+    else:
+        requests = client_errors = server_errors = 0
+        for n, c4, c5 in _request_outcomes.totals(window, match).values():
+            requests += n
+            client_errors += c4
+            server_errors += c5
+
+    def pct(k: int) -> float:
+        return round(k / requests * 100.0, 2) if requests else 0.0
+
+    return {
+        "window_s": window,
+        "requests": requests,
+        "error_rate_pct": pct(client_errors + server_errors),
+        "client_error_rate_pct": pct(client_errors),
+        "server_error_rate_pct": pct(server_errors),
+    }
+
+
+_ERROR_WINDOW = min(3600.0, max(60.0, float(os.environ.get("GENESIS_ERROR_WINDOW", "300"))))
+
+_request_outcomes = _RollingWindow()  # (route, tenant)
+
+
+@contextmanager
+def _phase(name: str):
+    """Time a handler phase (auth, rate, score, checks, audit, llm) for the current request."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        _PHASE_LATENCY.labels(name).observe(elapsed)
+        phases = _request_phases.get()
+        if phases is not None:
+            phases[name] = phases.get(name, 0.0) + elapsed
+
+
+def _route_label(scope) -> str:
+    """Route template (e.g. /api/compliance/{framework}) — never the raw path, to bound cardinality."""
+    route = scope.get("route")
+    return getattr(route, "path", None) or "unmatched"
+
+
+class _TimingMiddleware:
+    """
+    Pure-ASGI request timer. Records latency per (method, route, status),
+    the in-flight gauge and 4xx/5xx counters; optionally emits Server-Timing.
+    """
+
+    def __init__(self, app) -> None:
+        self.app = app
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope["type"] != "lifespan":
+            _runtime.ensure_running()
+        if scope["type"] != "http" or _is_exempt(scope["path"]):
+            await self.app(scope, receive, send)
+            return
+
+        phases: dict = {}
+        token = _request_phases.set(phases)
+        scope["genesis.t0"] = time.time()
+        scope_token = _request_scope.set(scope)
+        start = time.perf_counter()
+        status = 500
+
+        async def send_with_timing(message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                if _SERVER_TIMING:
+                    total = (time.perf_counter() - start) * 1000.0
+                    value = ", ".join(
+                        [f"{k};dur={v * 1000.0:.2f}" for k, v in phases.items()] + [f"total;dur={total:.2f}"]
+                    )
+                    message["headers"] = [*message.get("headers", ()), (b"server-timing", value.encode())]
+            await send(message)
+
+        _HTTP_IN_FLIGHT.inc()
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            elapsed = time.perf_counter() - start
+            route = _route_label(scope)
+            _HTTP_LATENCY.labels(scope["method"], route, str(status)).observe(elapsed)
+            _HTTP_IN_FLIGHT.dec()
+            if status >= 400:
+                _HTTP_ERRORS.labels(route, "5xx" if status >= 500 else "4xx").inc()
+            _request_outcomes.record((route, scope.get("state", {}).get("tenant_id", "anonymous")), status)
+            if _ACCESS_LOG:
+                _log.info("request", extra={"method": scope["method"], "status": status})
+            _request_scope.reset(scope_token)
+            _request_phases.reset(token)
+
+
+# ─────────────────────────────────────────────────────────────
+# EXECUTORS — purpose-sized thread pools for blocking work
+# Handlers are async; SQLite and psutil sampling run on their own pools
+# so a burst of audit writes can only exhaust its own workers (llama.cpp
+# calls are async, see _LlamaClient). One DB writer serializes SQLite writes.
+# The request's context (phases, log scope) is carried into the worker.
+# ─────────────────────────────────────────────────────────────
+class _Executor:
+    """Named thread pool with saturation accounting (busy, queued, queue wait)."""
+
+    def __init__(self, name: str, size: int) -> None:
+        self.name = name
+        self.size = size
+        self._pool = ThreadPoolExecutor(max_workers=size, thread_name_prefix=f"genesis-{name}")
+        self._busy, self._queued = _EXECUTOR_BUSY.labels(name), _EXECUTOR_QUEUED.labels(name)
+        self._wait = _EXECUTOR_WAIT.labels(name)
+        _EXECUTOR_WORKERS.labels(name).set(size)
+
+    async def run(self, fn, *args):
+        submitted = time.perf_counter()
+        ctx = copy_context()
+
+        def call():
+            self._queued.dec()
+            self._busy.inc()
+            self._wait.observe(time.perf_counter() - submitted)
+            try:
+                return ctx.run(fn, *args)
+            finally:
+                self._busy.dec()
+
+        self._queued.inc()
+        job = self._pool.submit(call)
+        # Cancelled before a thread picked it up: call() never runs, so un-queue here.
+        job.add_done_callback(lambda f: self._queued.dec() if f.cancelled() else None)
+        return await asyncio.wrap_future(job)
+
+
+_db_writer   = _Executor("db-writer", 1)
+_db_readers  = _Executor("db-reader", int(os.environ.get("GENESIS_DB_READERS", "8")))
+_metrics_pool = _Executor("metrics", int(os.environ.get("GENESIS_METRICS_WORKERS", "2")))
+_EXECUTORS = (_db_writer, _db_readers, _metrics_pool)
+
+
+# ─────────────────────────────────────────────────────────────
+# RUNTIME TELEMETRY — event loop, anyio threadpool, GC, memory
+# A heartbeat task sleeps GENESIS_LOOP_LAG_INTERVAL seconds and records
+# how late it woke up: the excess is time the loop spent on something
+# else (blocking calls, long callbacks). Each tick also reads anyio's
+# default thread limiter (Starlette's threadpool). gc.callbacks time
+# every collection; the callback only appends to a deque and the
+# heartbeat or a scrape folds it into the metrics, because taking a
+# metric lock inside a GC callback could deadlock the collecting thread.
+# The heartbeat starts with the first request on each event loop.
+# ─────────────────────────────────────────────────────────────
+_LOOP_LAG_INTERVAL = float(os.environ.get("GENESIS_LOOP_LAG_INTERVAL", "0.25"))
+
+
+class _RuntimeTelemetry:
+    """Loop lag, threadpool occupancy, GC pauses and memory for this process."""
+
+    def __init__(self, interval: float) -> None:
+        self.interval = interval
+        self.lag: deque = deque(maxlen=max(1, round(60 / interval)))  # last minute of heartbeats
+        self.threadpool = {"size": 0, "busy": 0, "waiting": 0}
+        self.gc = {gen: {"collections": 0, "collected": 0, "pause_ms_total": 0.0, "pause_ms_max": 0.0}
+                   for gen in range(3)}
+        self._gc_events: deque = deque(maxlen=10_000)
+        self._gc_started = 0.0
+        self._blocks_at_start = sys.getallocatedblocks()
+        self._process: Optional[psutil.Process] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._task: Optional[asyncio.Task] = None
+        self._lock = threading.Lock()
+
+    def on_gc(self, phase: str, info: dict) -> None:
+        # Runs inside the collector with the GIL held: no locks, no metric updates
+        if phase == "start":
+            self._gc_started = time.perf_counter()
+        else:
+            self._gc_events.append((info["generation"], time.perf_counter() - self._gc_started, info["collected"]))
+
+    def ensure_running(self) -> None:
+        loop = asyncio.get_running_loop()
+        if self._loop is loop:
+            return
+        self._loop = loop
+        self._task = loop.create_task(self._heartbeat())
+
+    async def _heartbeat(self) -> None:
+        loop = asyncio.get_running_loop()
+        limiter = to_thread.current_default_thread_limiter()
+        while True:
+            start = loop.time()
+            await asyncio.sleep(self.interval)
+            lag = max(0.0, loop.time() - start - self.interval)
+            self.lag.append(lag)
+            _LOOP_LAG.observe(lag)
+            _LOOP_LAG_MAX.set(max(self.lag))
+            stats = limiter.statistics()
+            self.threadpool = {"size": stats.total_tokens, "busy": stats.borrowed_tokens, "waiting": stats.tasks_waiting}
+            _THREADPOOL_SIZE.set(stats.total_tokens)
+            _THREADPOOL_BUSY.set(stats.borrowed_tokens)
+            _THREADPOOL_WAITING.set(stats.tasks_waiting)
+            self.sample()
+
+    def sample(self) -> None:
+        """Fold pending GC events into the metrics; refresh RSS and allocated blocks."""
+        with self._lock:
+            while self._gc_events:
+                gen, pause, collected = self._gc_events.popleft()
+                stats = self.gc[gen]
+                stats["collections"] += 1
+                stats["collected"] += collected
+                stats["pause_ms_total"] += pause * 1000.0
+                stats["pause_ms_max"] = max(stats["pause_ms_max"], pause * 1000.0)
+                _GC_PAUSE.labels(str(gen)).observe(pause)
+                _GC_COLLECTED.labels(str(gen)).inc(collected)
+            if self._process is None or self._process.pid != os.getpid():
+                self._process = psutil.Process()
+            _PROCESS_RSS.set(self._process.memory_info().rss)
+            _ALLOCATED_BLOCKS.set(sys.getallocatedblocks())
+
+    def snapshot(self) -> dict:
+        self.sample()
+        lags = list(self.lag)
+        blocks = sys.getallocatedblocks()
+        return {
+            "event_loop_lag_ms": {
+                "last": round(lags[-1] * 1000.0, 2) if lags else None,
+                "max_1m": round(max(lags) * 1000.0, 2) if lags else None,
+                "mean_1m": round(sum(lags) / len(lags) * 1000.0, 2) if lags else None,
+                "interval_ms": self.interval * 1000.0,
             },
-            headers={"Retry-After": str(int(_RATE_WINDOW))},
-        )
+            "threadpool": dict(self.threadpool),
+            "gc": {str(gen): {k: round(v, 3) if isinstance(v, float) else v for k, v in stats.items()}
+                   for gen, stats in self.gc.items()},
+            "memory": {
+                "rss_mb": round(self._process.memory_info().rss / 1e6, 1),
+                "allocated_blocks": blocks,
+                "allocated_blocks_growth": blocks - self._blocks_at_start,
+            },
+        }
+
+
+_runtime = _RuntimeTelemetry(_LOOP_LAG_INTERVAL)
+gc.callbacks.append(_runtime.on_gc)
+
+
+# ─────────────────────────────────────────────────────────────
+# PROFILING — on-demand statistical stack sampler
+# Snapshots sys._current_frames() at a fixed rate from a daemon thread;
+# no tracing hooks, so request threads run unmodified. Output is the
+# collapsed-stack format ("thread;outer;inner count") read by
+# flamegraph.pl, speedscope and inferno. Per-request profiles go to the
+# request_profiles table (last _RECENT_PROFILES_MAX), so whichever
+# uvicorn worker serves /api/admin/profile/{id} can return them.
+# ─────────────────────────────────────────────────────────────
+_PROFILE_MAX_SECONDS = 60.0
+_PROFILE_MAX_HZ      = 1000
+_PROFILE_HEADER      = b"x-genesis-profile"
+
+_profile_lock = threading.Lock()  # one sampler at a time per process
+_RECENT_PROFILES_MAX = 20
+
+
+class _StackSampler:
+    """Samples every thread's Python stack at `hz` until stopped."""
+
+    def __init__(self, hz: int = 100) -> None:
+        self.interval = 1.0 / max(1, min(hz, _PROFILE_MAX_HZ))
+        self.samples = 0
+        self._counts: dict[tuple, int] = defaultdict(int)
+        self._labels: dict = {}  # code object → "func (file:line)", memoised
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="genesis-profiler", daemon=True)
+
+    def start(self) -> "_StackSampler":
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._thread.join()
+
+    def _label(self, code) -> str:
+        label = self._labels.get(code)
+        if label is None:
+            label = self._labels[code] = f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+        return label
+
+    def _run(self) -> None:
+        own = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            names = {t.ident: t.name for t in threading.enumerate()}
+            for ident, frame in sys._current_frames().items():
+                if ident == own:
+                    continue
+                stack = []
+                while frame is not None:
+                    stack.append(self._label(frame.f_code))
+                    frame = frame.f_back
+                stack.append(names.get(ident, str(ident)))
+                self._counts[tuple(reversed(stack))] += 1
+            self.samples += 1
+
+    def collapsed(self) -> str:
+        return "\n".join(f"{';'.join(stack)} {n}" for stack, n in sorted(self._counts.items()))
+
+
+def _store_profile(profile_id: str, collapsed: str) -> None:
+    with sqlite3.connect(_DB_PATH) as conn:
+        seq = conn.execute("INSERT INTO request_profiles (id, collapsed, created_at) VALUES (?,?,?)",
+                           (profile_id, collapsed, datetime.now(timezone.utc).isoformat())).lastrowid
+        conn.execute("DELETE FROM request_profiles WHERE seq <= ?", (seq - _RECENT_PROFILES_MAX,))
+        conn.commit()
+
+
+def _load_profile(profile_id: str) -> Optional[str]:
+    with sqlite3.connect(_DB_PATH) as conn:
+        row = conn.execute("SELECT collapsed FROM request_profiles WHERE id=?", (profile_id,)).fetchone()
+    return row[0] if row else None
 
-    response = await call_next(request)
-    response.headers["X-RateLimit-Limit"] = str(limit)
-    response.headers["X-RateLimit-Remaining"] = str(remaining)
-    response.headers["X-RateLimit-Window"] = "60s"
-    return response
+
+def _is_admin_scope(scope) -> bool:
+    """True when the raw ASGI headers carry the admin key (X-API-Key or Bearer)."""
+    for name, value in scope["headers"]:
+        if name == b"x-api-key" or name == b"authorization":
+            raw = value.decode("latin-1")
+            if name == b"authorization" and raw.startswith("Bearer "):
+                raw = raw[7:]
+            if raw == _GENESIS_ADMIN_KEY:
+                return True
+    return False
+
+
+class _ProfileMiddleware:
+    """
+    Per-request profiling toggle: an admin request carrying
+    `X-Genesis-Profile: 1` is sampled for its duration (all threads — the
+    handler may run in any threadpool worker). The response gets
+    `X-Genesis-Profile-Id`; fetch the stacks from /api/admin/profile/{id}.
+    The profile is stored before the last body chunk goes out, so it can
+    be fetched as soon as the response is complete.
+    """
+
+    def __init__(self, app) -> None:
+        self.app = app
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope["type"] != "http" or not any(
+            name == _PROFILE_HEADER and value == b"1" for name, value in scope["headers"]
+        ) or not _is_admin_scope(scope):
+            await self.app(scope, receive, send)
+            return
+
+        if not _profile_lock.acquire(blocking=False):
+            async def send_busy(message) -> None:
+                if message["type"] == "http.response.start":
+                    message["headers"] = [*message.get("headers", ()), (b"x-genesis-profile-id", b"busy")]
+                await send(message)
+            await self.app(scope, receive, send_busy)
+            return
+
+        profile_id = secrets.token_hex(8)
+        sampler = _StackSampler().start()
+        stored = False
+
+        async def finish() -> None:
+            nonlocal stored
+            if not stored:
+                stored = True
+                sampler.stop()
+                _profile_lock.release()
+                await _db_writer.run(_store_profile, profile_id, sampler.collapsed())
+
+        async def send_with_id(message) -> None:
+            if message["type"] == "http.response.start":
+                message["headers"] = [*message.get("headers", ()), (b"x-genesis-profile-id", profile_id.encode())]
+            elif message["type"] == "http.response.body" and not message.get("more_body", False):
+                await finish()
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_id)
+        finally:
+            await finish()
+
+
+# Middleware order (outermost first): profile → timing → rate limit → CORS → routes.
+# The rate limiter sits where the old @app.middleware("http") decorator did.
+app.add_middleware(_RateLimitMiddleware)
+app.add_middleware(_TimingMiddleware)
+app.add_middleware(_ProfileMiddleware)
 
 # ─────────────────────────────────────────────────────────────
 # RISK ENGINE — Pure NumPy (sklearn not yet Py3.14 compatible)
@@ -364,13 +1208,166 @@ _log.info("risk_engine_loaded", extra={"r2": _MODEL_R2, "frameworks": len(_FW_WE
 
 # ─────────────────────────────────────────────────────────────
 # LOCAL AI (llama.cpp) CONFIG
+# Completions go through one pooled httpx.AsyncClient per event loop:
+# keep-alive connections to LLAMA_BASE are reused instead of a fresh TCP
+# connect (and health round trip) per call, and waiting for inference
+# holds no thread. A semaphore caps in-flight completions at the
+# server's slot count (llama-server --parallel); callers beyond that
+# queue here rather than inside llama-server. GENESIS_LLAMA_TIMEOUT is
+# the whole deadline of one completion, slot wait included. The client
+# is rebuilt when the running loop changes (a pool is tied to the loop
+# that opened its sockets).
 # ─────────────────────────────────────────────────────────────
 LLAMA_BASE = os.environ.get("LLAMA_BASE", "http://localhost:8090")
 LLAMA_MODEL = os.path.join(os.path.dirname(os.path.abspath(__file__)), "models", "qwen2.5-0.5b-instruct-q4_k_m.gguf")
+_LLAMA_SLOTS = max(1, int(os.environ.get("GENESIS_LLAMA_SLOTS", "4")))
+_LLAMA_TIMEOUT = float(os.environ.get("GENESIS_LLAMA_TIMEOUT", "30"))
+
+
+class _LlamaUnavailable(Exception):
+    """llama-server refused the connection or is still loading its model."""
+
+
+class _LlamaClient:
+    """Pooled async client for llama-server with a per-loop slot semaphore."""
+
+    def __init__(self, base: str, slots: int, timeout: float, transport: Optional[httpx.AsyncBaseTransport] = None) -> None:
+        self.base = base
+        self.slots = slots
+        self.timeout = timeout
+        self._transport = transport
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._http: Optional[httpx.AsyncClient] = None
+        self._sem: Optional[asyncio.Semaphore] = None
+        self._closer: Optional[asyncio.Task] = None
+
+    def _bind(self) -> tuple[httpx.AsyncClient, asyncio.Semaphore]:
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            self._retire()
+            self._http = httpx.AsyncClient(
+                base_url=self.base,
+                transport=self._transport,
+                limits=httpx.Limits(max_connections=self.slots + 1, max_keepalive_connections=self.slots + 1),
+                timeout=httpx.Timeout(self.timeout, connect=2.0),
+            )
+            self._sem = asyncio.Semaphore(self.slots)
+            self._loop = loop
+            self._closer = loop.create_task(self._close_with_loop(self._http))
+        return self._http, self._sem
+
+    def _retire(self) -> None:
+        """Close the client bound to the previous loop, on that loop (see _close_with_loop)."""
+        loop, closer = self._loop, self._closer
+        self._http = self._sem = self._loop = self._closer = None
+        if closer is not None and not loop.is_closed():
+            loop.call_soon_threadsafe(closer.cancel)
+
+    @staticmethod
+    async def _close_with_loop(http: httpx.AsyncClient) -> None:
+        """
+        Parked on the loop `http` is bound to until cancelled: by _retire(),
+        or by asyncio.run() / anyio cancelling leftover tasks before they
+        close the loop. Either way aclose() runs while the pool's loop is
+        still alive, which is the only loop that can close its connections.
+        """
+        try:
+            await asyncio.get_running_loop().create_future()
+        finally:
+            await http.aclose()
+
+    async def aclose(self) -> None:
+        """Close the pooled client (lifespan shutdown)."""
+        http, closer = self._http, self._closer
+        self._http = self._sem = self._loop = self._closer = None
+        if closer is not None:
+            closer.cancel()
+        if http is not None:
+            await http.aclose()
+
+    async def complete(self, prompt: str, max_tokens: int = 150) -> str:
+        """
+        OpenAI-compatible chat completion. Raises _LlamaUnavailable when the
+        server is down, TimeoutError when the deadline passes (waiting for a
+        slot counts), httpx.HTTPError for any other failed exchange.
+        """
+        http, sem = self._bind()
+        body = self._body(prompt, max_tokens)
+        async with asyncio.timeout(self.timeout):
+            queued = time.perf_counter()
+            async with sem:
+                _LLM_SLOT_WAIT.observe(time.perf_counter() - queued)
+                _LLM_SLOTS_BUSY.inc()
+                try:
+                    r = await http.post("/v1/chat/completions", json=body)
+                except (httpx.ConnectError, httpx.ConnectTimeout) as e:
+                    raise _LlamaUnavailable(str(e)) from e
+                except httpx.TimeoutException as e:
+                    raise TimeoutError(str(e)) from e
+                finally:
+                    _LLM_SLOTS_BUSY.dec()
+        if r.status_code == 503:
+            raise _LlamaUnavailable("llama-server is loading its model")
+        r.raise_for_status()
+        return r.json()["choices"][0]["message"]["content"].strip()
+
+    async def stream(self, prompt: str, max_tokens: int = 150):
+        """
+        Streaming chat completion (llama-server SSE). Yields "" once the
+        server has accepted the request, then each content delta. Closing
+        the generator early closes the upstream response and its
+        connection, which is how llama-server learns to stop generating.
+        The deadline is checked while waiting for a slot and between tokens.
+        """
+        http, sem = self._bind()
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.timeout
+        queued = time.perf_counter()
+        await asyncio.wait_for(sem.acquire(), self.timeout)
+        _LLM_SLOT_WAIT.observe(time.perf_counter() - queued)
+        _LLM_SLOTS_BUSY.inc()
+        try:
+            async with http.stream("POST", "/v1/chat/completions",
+                                   json={**self._body(prompt, max_tokens), "stream": True}) as r:
+                if r.status_code == 503:
+                    raise _LlamaUnavailable("llama-server is loading its model")
+                r.raise_for_status()
+                yield ""
+                async for line in r.aiter_lines():
+                    if loop.time() > deadline:
+                        raise TimeoutError(f"completion exceeded {self.timeout:g}s")
+                    if not line.startswith("data:"):
+                        continue
+                    data = line[5:].strip()
+                    if data == "[DONE]":
+                        break
+                    delta = json.loads(data)["choices"][0].get("delta", {}).get("content")
+                    if delta:
+                        yield delta
+        except (httpx.ConnectError, httpx.ConnectTimeout) as e:
+            raise _LlamaUnavailable(str(e)) from e
+        except httpx.TimeoutException as e:
+            raise TimeoutError(str(e)) from e
+        finally:
+            _LLM_SLOTS_BUSY.dec()
+            sem.release()
+
+    @staticmethod
+    def _body(prompt: str, max_tokens: int) -> dict:
+        return {
+            "model": "local",
+            "messages": [{"role": "user", "content": prompt}],
+            "max_tokens": max_tokens,
+            "temperature": 0.3,
+        }
+
+
+_llama = _LlamaClient(LLAMA_BASE, _LLAMA_SLOTS, _LLAMA_TIMEOUT)
+_LLM_SLOTS.set(_LLAMA_SLOTS)
 
 
 def _llama_available() -> bool:
-    """Quick check if llama-server is accepting connections."""
+    """Blocking health check for the background dependency probe thread."""
     try:
         req = urllib.request.Request(f"{LLAMA_BASE}/health", method="GET")
         with urllib.request.urlopen(req, timeout=1):
@@ -378,25 +1375,6 @@ def _llama_available() -> bool:
     except Exception:
         return False
 
-
-def _llama_complete(prompt: str, max_tokens: int = 150) -> str:
-    """Call llama-server OpenAI-compatible chat endpoint."""
-    payload = json.dumps({
-        "model": "local",
-        "messages": [{"role": "user", "content": prompt}],
-        "max_tokens": max_tokens,
-        "temperature": 0.3,
-    }).encode()
-    req = urllib.request.Request(
-        f"{LLAMA_BASE}/v1/chat/completions",
-        data=payload,
-        headers={"Content-Type": "application/json"},
-        method="POST",
-    )
-    with urllib.request.urlopen(req, timeout=30) as resp:
-        data = json.loads(resp.read())
-    return data["choices"][0]["message"]["content"].strip()
-
 # ─────────────────────────────────────────────────────────────
 # SCHEMAS
 # ─────────────────────────────────────────────────────────────
@@ -467,6 +1445,10 @@ class ComplianceCheck(BaseModel):
     cet1_ratio_pct:   float = Field(12.5,  ge=0.0,  le=100.0,  description="CET1 capital ratio %")    # Basel III/EBA
     lcr_ratio_pct:    float = Field(115.0, ge=0.0,  le=5000.0, description="LCR ratio %")             # Basel III
 
+class BulkComplianceRequest(BaseModel):
+    postures:   list[ComplianceCheck] = Field(..., min_length=1, max_length=10000, description="One posture per tenant")
+    frameworks: Optional[list[str]]   = Field(None, description="Subset of frameworks (default: all)")
+
 class SignRequest(BaseModel):
     document_name: str = "compliance_report.pdf"
     document_hash: Optional[str] = None
@@ -549,6 +1531,395 @@ FRAMEWORKS = {
     },
 }
 
+# ─────────────────────────────────────────────────────────────
+# COMPLIANCE RULES — declarative, compiled at startup
+# Each rule: check name, ComplianceCheck field, operator, threshold and
+# the regulatory article it implements. Compiled into a per-framework
+# evaluation plan (tuple of (check, field, op_fn, operand)) so a request
+# is a single pass with no dict/branch rebuilding.
+# Override with a JSON file (same shape) via GENESIS_RULES_PATH and
+# hot-reload with POST /api/admin/rules/reload — the compiled plan is
+# swapped atomically; in-flight requests keep the plan they started with.
+# Other uvicorn workers adopt it from the shared DB (see RULE PLAN SYNC).
+# ─────────────────────────────────────────────────────────────
+_EU_RESIDENCY = ["EU", "EEA", "AT", "DE", "CH", "FR", "NL", "BE", "IE"]
+
+
+def _r(check: str, field: str, op: str = "true", value=None, ref: str = "") -> dict:
+    rule = {"check": check, "field": field, "op": op, "ref": ref}
+    if value is not None:
+        rule["value"] = value
+    return rule
+
+
+_RESIDENCY_RULE = _r("data_residency_eu", "data_residency", "in", _EU_RESIDENCY, "EU/EEA data residency")
+
+DEFAULT_COMPLIANCE_RULES: dict[str, list[dict]] = {
+    "basel_iii": [
+        _RESIDENCY_RULE,
+        _r("encryption_at_rest",        "encryption_at_rest"),
+        _r("audit_logging",             "audit_logging"),
+        _r("mfa_enabled",               "mfa_enabled"),
+        _r("cet1_above_minimum",        "cet1_ratio_pct",      ">=", 8.0,   "CRR2: 8% total capital"),
+        _r("lcr_above_100pct",          "lcr_ratio_pct",       ">=", 100.0, "Basel III: LCR ≥ 100%"),
+        _r("data_retention_10yr",       "data_retention_days", ">=", 3650,  "EBA: 10-year retention"),
+    ],
+    "dora": [
+        _RESIDENCY_RULE,
+        _r("encryption_at_rest",        "encryption_at_rest"),
+        _r("encryption_in_transit",     "encryption_in_transit"),
+        _r("audit_logging",             "audit_logging"),
+        _r("ict_incident_reporting",    "ict_incident_reporting",    ref="DORA Art. 19"),
+        _r("third_party_risk_assessed", "third_party_risk_assessed", ref="DORA Art. 28"),
+        _r("penetration_testing_done",  "penetration_testing_done",  ref="DORA Art. 26 (TLPT)"),
+        _r("mfa_enabled",               "mfa_enabled"),
+    ],
+    "gdpr": [
+        _RESIDENCY_RULE,
+        _r("encryption_at_rest",        "encryption_at_rest"),
+        _r("encryption_in_transit",     "encryption_in_transit"),
+        _r("audit_logging",             "audit_logging"),
+        _r("consent_management",        "consent_management",        ref="GDPR Art. 7"),
+        _r("data_minimization",         "data_minimization",         ref="GDPR Art. 5(1)(c)"),
+        _r("breach_notification_proc",  "breach_notification_proc",  ref="GDPR Art. 33 (72h)"),
+        _r("data_retention_ok",         "data_retention_days", ">=", 365, "GDPR Art. 5(1)(e): purpose-limited"),
+    ],
+    "ai_act": [
+        _RESIDENCY_RULE,
+        _r("audit_logging",             "audit_logging"),
+        _r("ai_risk_classification",    "ai_risk_classification",    ref="AI Act Art. 9"),
+        _r("explainability_docs",       "explainability_docs",       ref="AI Act Art. 13"),
+        _r("conformity_assessment",     "conformity_assessment",     ref="AI Act Art. 43 (high-risk)"),
+        _r("encryption_at_rest",        "encryption_at_rest"),
+        _r("mfa_enabled",               "mfa_enabled"),
+    ],
+    "aml6": [
+        _RESIDENCY_RULE,
+        _r("encryption_at_rest",        "encryption_at_rest"),
+        _r("audit_logging",             "audit_logging"),
+        _r("kyc_cdd_process",           "kyc_cdd_process",           ref="AML6 Art. 13"),
+        _r("transaction_monitoring",    "transaction_monitoring",    ref="AML6 Art. 16"),
+        _r("str_filing_process",        "str_filing_process",        ref="AML6 Art. 33"),
+        _r("data_retention_5yr",        "data_retention_days", ">=", 1825, "AML6: 5-year retention"),
+        _r("mfa_enabled",               "mfa_enabled"),
+    ],
+    "psd2": [
+        _RESIDENCY_RULE,
+        _r("encryption_at_rest",        "encryption_at_rest"),
+        _r("encryption_in_transit",     "encryption_in_transit"),
+        _r("sca_implemented",           "sca_implemented",           ref="PSD2 Art. 97 (SCA)"),
+        _r("xs2a_api_available",        "xs2a_api_available",        ref="PSD2 Art. 66-67 (Open Banking)"),
+        _r("audit_logging",             "audit_logging"),
+        _r("mfa_enabled",               "mfa_enabled"),
+    ],
+    "mifid_ii": [
+        _RESIDENCY_RULE,
+        _r("encryption_at_rest",        "encryption_at_rest"),
+        _r("encryption_in_transit",     "encryption_in_transit"),
+        _r("audit_logging",             "audit_logging"),
+        _r("best_execution_policy",     "best_execution_policy",     ref="MiFID II Art. 27"),
+        _r("transaction_reporting",     "transaction_reporting",     ref="MiFID II Art. 26 (RTS 22)"),
+        _r("data_retention_5yr",        "data_retention_days", ">=", 1825, "MiFID II Art. 25(1)"),
+    ],
+    "solvency_ii": [
+        _RESIDENCY_RULE,
+        _r("encryption_at_rest",        "encryption_at_rest"),
+        _r("audit_logging",             "audit_logging"),
+        _r("scr_coverage_ok",           "scr_coverage_pct",    ">=", 100.0, "Solvency II Art. 101"),
+        _r("orsa_reporting",            "orsa_reporting",            ref="Solvency II Art. 45 (ORSA)"),
+        _r("data_retention_10yr",       "data_retention_days", ">=", 3650),
+        _r("mfa_enabled",               "mfa_enabled"),
+    ],
+    "eba": [
+        _RESIDENCY_RULE,
+        _r("encryption_at_rest",        "encryption_at_rest"),
+        _r("encryption_in_transit",     "encryption_in_transit"),
+        _r("audit_logging",             "audit_logging"),
+        _r("mfa_enabled",               "mfa_enabled"),
+        _r("cet1_above_minimum",        "cet1_ratio_pct",      ">=", 4.5,  "EBA: CET1 ≥ 4.5%"),
+        _r("data_retention_5yr",        "data_retention_days", ">=", 1825),
+        _r("ict_incident_reporting",    "ict_incident_reporting"),
+    ],
+}
+
+# Operators available to rules. `in` / `not_in` compare strings
+# case-insensitively (operands are upper-cased once at compile time).
+_RULE_OPS: dict[str, Callable] = {
+    "true":   lambda x, _: bool(x),
+    "false":  lambda x, _: not x,
+    ">=":     lambda x, v: x >= v,
+    ">":      lambda x, v: x > v,
+    "<=":     lambda x, v: x <= v,
+    "<":      lambda x, v: x < v,
+    "==":     lambda x, v: x == v,
+    "!=":     lambda x, v: x != v,
+    "in":     lambda x, v: str(x).upper() in v,
+    "not_in": lambda x, v: str(x).upper() not in v,
+}
+
+# Column-wise equivalents for bulk evaluation over NumPy arrays (one value per tenant).
+_VECTOR_RULE_OPS: dict[str, Callable] = {
+    "true":   lambda col, _: col.astype(bool),
+    "false":  lambda col, _: ~col.astype(bool),
+    ">=":     lambda col, v: col >= v,
+    ">":      lambda col, v: col > v,
+    "<=":     lambda col, v: col <= v,
+    "<":      lambda col, v: col < v,
+    "==":     lambda col, v: col == v,
+    "!=":     lambda col, v: col != v,
+    "in":     lambda col, v: np.isin(np.char.upper(col.astype(str)), list(v)),
+    "not_in": lambda col, v: ~np.isin(np.char.upper(col.astype(str)), list(v)),
+}
+
+_RULES_PATH = os.environ.get("GENESIS_RULES_PATH", "")
+
+
+class _RulePlan:
+    """
+    Compiled, immutable rule set. `version` is a content hash of the source rules.
+    Identical (field, op, value) predicates are shared across frameworks —
+    e.g. data residency, encryption, audit logging and MFA appear in most of
+    them — so all-framework evaluation computes each predicate once.
+    """
+
+    def __init__(self, rules: dict[str, list[dict]], source: str = "builtin") -> None:
+        fields = ComplianceCheck.model_fields
+        predicates: list[tuple] = []            # (field, op, fn, operand)
+        pred_index: dict[tuple, int] = {}       # (field, op, operand key) → predicate index
+        plans: dict[str, tuple] = {}
+        for framework, fw_rules in rules.items():
+            if framework not in FRAMEWORKS:
+                raise ValueError(f"{framework}: unknown framework (known: {list(FRAMEWORKS)})")
+            seen, steps = set(), []
+            for rule in fw_rules:
+                check, field, op = rule.get("check"), rule.get("field"), rule.get("op", "true")
+                if not check or check in seen:
+                    raise ValueError(f"{framework}: missing or duplicate check name {check!r}")
+                if field not in fields:
+                    raise ValueError(f"{framework}.{check}: unknown field {field!r}")
+                if op not in _RULE_OPS:
+                    raise ValueError(f"{framework}.{check}: unknown op {op!r} (use {list(_RULE_OPS)})")
+                operand = rule.get("value")
+                if op in ("in", "not_in"):
+                    if not isinstance(operand, list):
+                        raise ValueError(f"{framework}.{check}: op {op!r} needs a list value")
+                    operand = frozenset(str(v).upper() for v in operand)
+                elif op not in ("true", "false") and operand is None:
+                    raise ValueError(f"{framework}.{check}: op {op!r} needs a value")
+                key = (field, op, tuple(sorted(operand)) if isinstance(operand, frozenset) else operand)
+                idx = pred_index.get(key)
+                if idx is None:
+                    idx = pred_index[key] = len(predicates)
+                    predicates.append((field, op, _RULE_OPS[op], operand))
+                seen.add(check)
+                steps.append((check, field, _RULE_OPS[op], operand, idx))
+            if not steps:
+                raise ValueError(f"{framework}: no rules")
+            plans[framework] = tuple(steps)
+        dependents: dict[str, list] = defaultdict(list)  # field → [(framework, check, predicate idx)]
+        for fw, steps in plans.items():
+            for check, field, _, _, idx in steps:
+                dependents[field].append((fw, check, idx))
+        self.rules = rules
+        self.source = source
+        self.frameworks = plans
+        self.predicates = tuple(predicates)
+        self.dependents = {f: tuple(deps) for f, deps in dependents.items()}
+        self.version = hashlib.sha256(json.dumps(rules, sort_keys=True).encode()).hexdigest()[:16]
+
+    def evaluate(self, framework: str, data: "ComplianceCheck") -> dict[str, bool]:
+        return {check: fn(getattr(data, field), operand) for check, field, fn, operand, _ in self.frameworks[framework]}
+
+    def evaluate_all(self, data: "ComplianceCheck", frameworks=None) -> dict[str, dict[str, bool]]:
+        """Every shared predicate once, then each framework's checks by index."""
+        values = [fn(getattr(data, field), operand) for field, _, fn, operand in self.predicates]
+        return {
+            fw: {step[0]: values[step[4]] for step in self.frameworks[fw]}
+            for fw in (frameworks or self.frameworks)
+        }
+
+    def evaluate_fields(self, data: "ComplianceCheck", changed) -> dict[str, dict[str, bool]]:
+        """
+        Incremental evaluation: only the checks whose rules read a field in
+        `changed`, each distinct predicate once. Returns {framework: {check: bool}}.
+        """
+        values: dict[int, bool] = {}
+        out: dict[str, dict[str, bool]] = defaultdict(dict)
+        for field in changed:
+            for fw, check, idx in self.dependents.get(field, ()):
+                if idx not in values:
+                    _, _, fn, operand = self.predicates[idx]
+                    values[idx] = fn(getattr(data, field), operand)
+                out[fw][check] = values[idx]
+        return dict(out)
+
+    def fields(self, frameworks) -> list[str]:
+        """ComplianceCheck fields read by the given frameworks' rules."""
+        return sorted({step[1] for fw in frameworks for step in self.frameworks[fw]})
+
+    def evaluate_columns(self, frameworks, columns: dict[str, np.ndarray]) -> dict[str, tuple[list[str], np.ndarray]]:
+        """
+        Vectorised evaluation over one column per field (one row per tenant).
+        Returns {framework: (check names, bool matrix [n_tenants, n_checks])};
+        shared predicate columns are computed once.
+        """
+        cache: dict[int, np.ndarray] = {}
+        out = {}
+        for fw in frameworks:
+            cols = []
+            for check, field, _, operand, idx in self.frameworks[fw]:
+                col = cache.get(idx)
+                if col is None:
+                    col = cache[idx] = _VECTOR_RULE_OPS[self.predicates[idx][1]](columns[field], operand)
+                cols.append(col)
+            out[fw] = ([step[0] for step in self.frameworks[fw]], np.column_stack(cols))
+        return out
+
+
+def _load_rule_plan() -> _RulePlan:
+    """Compile rules from GENESIS_RULES_PATH if set, else the built-in defaults. Raises on invalid rules."""
+    if not _RULES_PATH:
+        return _RulePlan(DEFAULT_COMPLIANCE_RULES)
+    doc = json.loads(Path(_RULES_PATH).read_text(encoding="utf-8"))
+    return _RulePlan(doc.get("frameworks", doc), source=_RULES_PATH)
+
+
+_rule_plan_lock = threading.Lock()
+_RULE_PLAN = _load_rule_plan()
+
+
+# Called with the new plan after every successful reload (caches, precomputed payloads).
+_rule_reload_hooks: list[Callable[[_RulePlan], None]] = []
+
+
+def _install_rule_plan(plan: _RulePlan) -> None:
+    """Make `plan` the active plan and run the reload hooks. Caller holds _rule_plan_lock."""
+    global _RULE_PLAN
+    _RULE_PLAN = plan
+    for hook in _rule_reload_hooks:
+        hook(plan)
+    _log.info("compliance_rules_loaded", extra={"version": plan.version, "source": plan.source})
+
+
+def _reload_rule_plan() -> _RulePlan:
+    """Recompile and atomically swap the active plan. On error the old plan stays live."""
+    with _rule_plan_lock:
+        plan = _load_rule_plan()
+        _install_rule_plan(plan)
+    return plan
+
+
+# ─────────────────────────────────────────────────────────────
+# COMPLIANCE RESULT CACHE — content-addressed, ETag / 304
+# Key = SHA-256 of (framework, canonical ComplianceCheck payload, rules
+# version). A repeated poll returns the stored result (and its original
+# audit_ref) without re-evaluating or writing another audit row; a client
+# sending the key back in If-None-Match gets 304 with no body. Rule
+# reloads change the version (new keys) and clear the cache.
+# ─────────────────────────────────────────────────────────────
+_COMPLIANCE_CACHE_SIZE = int(os.environ.get("GENESIS_COMPLIANCE_CACHE_SIZE", "4096"))
+
+
+class _ResultCache:
+    """Bounded LRU of result dicts keyed by content hash. Thread-safe."""
+
+    def __init__(self, maxsize: int, hits: Counter, misses: Counter) -> None:
+        self.maxsize = maxsize
+        self.hits = hits
+        self.misses = misses
+        self._data: OrderedDict[str, dict] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[dict]:
+        with self._lock:
+            value = self._data.get(key)
+            if value is None:
+                self.misses.inc()
+                return None
+            self._data.move_to_end(key)
+        self.hits.inc()
+        return value
+
+    def put(self, key: str, value: dict) -> None:
+        if self.maxsize <= 0:
+            return
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def clear(self, *_) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+_compliance_cache = _ResultCache(_COMPLIANCE_CACHE_SIZE, _COMPLIANCE_CACHE_HITS, _COMPLIANCE_CACHE_MISSES)
+_rule_reload_hooks.append(_compliance_cache.clear)
+
+
+def _compliance_key(framework: str, data: "ComplianceCheck", plan: _RulePlan) -> str:
+    canonical = json.dumps([framework, data.model_dump(), plan.version], sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(canonical.encode()).hexdigest()
+
+
+def _etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """RFC 9110 weak comparison against an If-None-Match header (list, W/ prefix, or *)."""
+    if not if_none_match:
+        return False
+    for tag in if_none_match.split(","):
+        tag = tag.strip()
+        if tag == "*" or tag.removeprefix("W/") == etag:
+            return True
+    return False
+
+
+# ─────────────────────────────────────────────────────────────
+# PRECOMPUTED STATIC RESPONSES — catalog payloads serialized once
+# frameworks/all is re-rendered on rule reload, ai/status once per
+# distinct llama state; valuation never changes. Each carries a strong
+# ETag over its bytes and revalidates with 304.
+# ─────────────────────────────────────────────────────────────
+class _StaticJSON:
+    """A JSON payload serialized once to bytes, with a strong ETag over them."""
+
+    __slots__ = ("body", "etag")
+
+    def __init__(self, payload: dict) -> None:
+        self.body = _json_dumps(payload)
+        self.etag = f'"{hashlib.sha256(self.body).hexdigest()[:32]}"'
+
+    def response(self, request: Request, cache_control: str) -> Response:
+        headers = {"ETag": self.etag, "Cache-Control": cache_control}
+        if _etag_matches(request.headers.get("if-none-match"), self.etag):
+            return Response(status_code=304, headers=headers)
+        return Response(self.body, media_type="application/json", headers=headers)
+
+
+def _render_frameworks(plan: _RulePlan) -> _StaticJSON:
+    return _StaticJSON({
+        "total_frameworks": len(FRAMEWORKS),
+        "frameworks": {k: {"name": v["name"], "authority": v["authority"]} for k, v in FRAMEWORKS.items()},
+        "coverage": "Basel III/IV, MiFID II, GDPR, AI Act, AML6, DORA, PSD2, Solvency II, EBA",
+        "rules_version": plan.version,
+    })
+
+
+def _rerender_frameworks(plan: _RulePlan) -> None:
+    global _FRAMEWORKS_STATIC
+    _FRAMEWORKS_STATIC = _render_frameworks(plan)
+
+
+_FRAMEWORKS_STATIC = _render_frameworks(_RULE_PLAN)
+_rule_reload_hooks.append(_rerender_frameworks)
+
+# (llama probe ok, model file present) → payload; llama state comes from the dependency probes
+_ai_status_static: dict[tuple[bool, bool], _StaticJSON] = {}
+
+
 # ─────────────────────────────────────────────────────────────
 # AUDIT PERSISTENCE — SQLite (stdlib, no extra deps)
 # Survives restarts; path override via GENESIS_DB_PATH env var.
@@ -581,6 +1952,57 @@ def _init_db() -> None:
                 active      INTEGER NOT NULL DEFAULT 1
             )
         """)
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS tenant_posture (
+                tenant_id      TEXT    PRIMARY KEY,
+                posture        TEXT    NOT NULL,
+                results        TEXT    NOT NULL,
+                rules_version  TEXT    NOT NULL,
+                updated_at     TEXT    NOT NULL
+            )
+        """)
+        # Delta-encoded check history: one row per check when first seen and
+        # per flip, never per write. PK order makes "last row ≤ ts" one seek.
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS posture_history (
+                tenant_id   TEXT    NOT NULL,
+                framework   TEXT    NOT NULL,
+                check_name  TEXT    NOT NULL,
+                ts_us       INTEGER NOT NULL,
+                passed      INTEGER NOT NULL,
+                PRIMARY KEY (tenant_id, framework, check_name, ts_us)
+            ) WITHOUT ROWID
+        """)
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_posture_history_ts ON posture_history (tenant_id, ts_us)")
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS explanation_cache (
+                key          TEXT    PRIMARY KEY,
+                model        TEXT    NOT NULL,
+                explanation  TEXT    NOT NULL,
+                created_at   REAL    NOT NULL
+            ) WITHOUT ROWID
+        """)
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_explanation_cache_created ON explanation_cache (created_at)")
+        # Per-request profiles (X-Genesis-Profile), newest _RECENT_PROFILES_MAX.
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS request_profiles (
+                seq          INTEGER PRIMARY KEY,
+                id           TEXT    NOT NULL UNIQUE,
+                collapsed    TEXT    NOT NULL,
+                created_at   TEXT    NOT NULL
+            )
+        """)
+        # Last reloaded rule set, for the other workers (single row).
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS rule_state (
+                id           INTEGER PRIMARY KEY CHECK (id = 1),
+                generation   INTEGER NOT NULL,
+                version      TEXT    NOT NULL,
+                source       TEXT    NOT NULL,
+                rules        TEXT    NOT NULL,
+                updated_at   TEXT    NOT NULL
+            )
+        """)
         conn.commit()
 
 
@@ -590,146 +2012,1120 @@ _seed_default_keys()
 
 def log_audit(action: str, payload: dict) -> dict:
     ts = datetime.now(timezone.utc).isoformat()
-    with sqlite3.connect(_DB_PATH) as conn:
+    with _phase("audit"), sqlite3.connect(_DB_PATH) as conn:
         conn.execute(
             "INSERT INTO audit_log (timestamp, action, payload, genesis_version) VALUES (?,?,?,?)",
             (ts, action, json.dumps(payload), "10.1"),
         )
         conn.commit()
+    _AUDIT_WRITES.inc()
     return {"timestamp": ts, "action": action, "genesis_version": "10.1"}
 
 
-def _audit_count() -> int:
+async def _audit(action: str, payload: dict) -> dict:
+    """log_audit on the single DB writer; genesis_audit_queue_depth counts writes not yet done."""
+    _AUDIT_QUEUE.inc()
     try:
+        return await _db_writer.run(log_audit, action, payload)
+    finally:
+        _AUDIT_QUEUE.dec()
+
+
+# ─────────────────────────────────────────────────────────────
+# RULE PLAN SYNC — one rule set across uvicorn workers
+# A reload compiles the rules in the worker that got the request, then
+# publishes them (rules JSON, version, generation + 1) to the rule_state
+# row. Every worker polls the row's generation every
+# GENESIS_RULES_SYNC_INTERVAL seconds on a daemon thread and installs
+# the published rules when it changes, so rules_version, ETags and the
+# result cache agree again within one interval. The generation seen at
+# start is the baseline: a freshly started worker compiles
+# GENESIS_RULES_PATH like at boot. Started from the app lifespan.
+# ─────────────────────────────────────────────────────────────
+_RULES_SYNC_INTERVAL = float(os.environ.get("GENESIS_RULES_SYNC_INTERVAL", "1.0"))
+
+
+class _RuleSync:
+    """Publishes reloaded rule plans and adopts the ones other workers published."""
+
+    def __init__(self, interval: float) -> None:
+        self.interval = interval
+        self.generation = 0
+        self._sync_lock = threading.Lock()  # reload + publish vs. adopt
+        self._lock = threading.Lock()
+        self._pid = 0
+
+    def start(self) -> None:
+        """Start the polling thread once per process (no-op when already running here)."""
+        if self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._pid != os.getpid():
+                self._pid = os.getpid()
+                with sqlite3.connect(_DB_PATH) as conn:
+                    self.generation = self._generation(conn)
+                threading.Thread(target=self._run, name="genesis-rule-sync", daemon=True).start()
+
+    @staticmethod
+    def _generation(conn: sqlite3.Connection) -> int:
+        row = conn.execute("SELECT generation FROM rule_state WHERE id=1").fetchone()
+        return row[0] if row else 0
+
+    def reload(self) -> _RulePlan:
+        """_reload_rule_plan() here, then publish the plan to the other workers. Raises on invalid rules."""
+        with self._sync_lock:
+            plan = _reload_rule_plan()
+            with sqlite3.connect(_DB_PATH) as conn:
+                conn.execute(
+                    "INSERT INTO rule_state (id, generation, version, source, rules, updated_at) VALUES (1,1,?,?,?,?) "
+                    "ON CONFLICT(id) DO UPDATE SET generation=generation+1, version=excluded.version, "
+                    "source=excluded.source, rules=excluded.rules, updated_at=excluded.updated_at",
+                    (plan.version, plan.source, json.dumps(plan.rules), datetime.now(timezone.utc).isoformat()),
+                )
+                self.generation = self._generation(conn)
+        return plan
+
+    def sync(self) -> bool:
+        """Install the published plan if another worker reloaded since the last look. True if swapped."""
+        with self._sync_lock, sqlite3.connect(_DB_PATH) as conn:
+            if self._generation(conn) == self.generation:
+                return False
+            row = conn.execute("SELECT generation, version, source, rules FROM rule_state WHERE id=1").fetchone()
+            self.generation = row[0]
+            if row[1] == _RULE_PLAN.version:
+                return False
+            plan = _RulePlan(json.loads(row[3]), source=row[2])
+            with _rule_plan_lock:
+                _install_rule_plan(plan)
+        return True
+
+    def _run(self) -> None:
+        while True:
+            time.sleep(self.interval)
+            try:
+                self.sync()
+            except Exception:
+                _log.exception("rule_sync_failed")
+
+
+_rule_sync = _RuleSync(_RULES_SYNC_INTERVAL)
+
+
+# ─────────────────────────────────────────────────────────────
+# EXPLANATION CACHE — /api/ai/explain, memory LRU + SQLite
+# Key = SHA-256 of (model file, max_tokens, prompt). The prompt is built
+# from normalized inputs (drivers in a fixed order; with
+# GENESIS_EXPLAIN_SCORE_BUCKET > 0 the score rounded to that step), so
+# equivalent requests share one inference. Lookups try the in-process
+# LRU, then the explanation_cache table (read pool), which survives
+# restarts and is shared by all workers. Entries expire after
+# GENESIS_EXPLAIN_CACHE_TTL seconds; the table keeps at most
+# GENESIS_EXPLAIN_CACHE_ROWS newest rows, trimmed every PURGE_EVERY
+# inserts and at startup. TTL 0 disables the cache.
+# ─────────────────────────────────────────────────────────────
+_EXPLAIN_CACHE_SIZE   = int(os.environ.get("GENESIS_EXPLAIN_CACHE_SIZE", "1024"))
+_EXPLAIN_CACHE_ROWS   = int(os.environ.get("GENESIS_EXPLAIN_CACHE_ROWS", "20000"))
+_EXPLAIN_CACHE_TTL    = float(os.environ.get("GENESIS_EXPLAIN_CACHE_TTL", str(7 * 86400)))
+_EXPLAIN_SCORE_BUCKET = float(os.environ.get("GENESIS_EXPLAIN_SCORE_BUCKET", "0"))
+
+
+class _ExplanationCache:
+    """Explanation text by prompt key: TTL'd LRU in front of the explanation_cache table."""
+
+    PURGE_EVERY = 64
+
+    def __init__(self, size: int, rows: int, ttl: float) -> None:
+        self.size = size
+        self.rows = rows
+        self.ttl = ttl
+        self._memory: OrderedDict[str, tuple[float, str]] = OrderedDict()  # key → (created_at, text)
+        self._lock = threading.Lock()
+        self._inserts = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.ttl > 0 and (self.size > 0 or self.rows > 0)
+
+    def _remember(self, key: str, created_at: float, text: str) -> None:
+        if self.size <= 0:
+            return
+        with self._lock:
+            self._memory[key] = (created_at, text)
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.size:
+                self._memory.popitem(last=False)
+
+    def _recall(self, key: str) -> Optional[str]:
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is None:
+                return None
+            if time.time() - entry[0] >= self.ttl:
+                del self._memory[key]
+                return None
+            self._memory.move_to_end(key)
+            return entry[1]
+
+    def _load(self, key: str) -> Optional[str]:
         with sqlite3.connect(_DB_PATH) as conn:
-            return conn.execute("SELECT COUNT(*) FROM audit_log").fetchone()[0]
-    except Exception:
-        return 0
+            row = conn.execute(
+                "SELECT created_at, explanation FROM explanation_cache WHERE key=? AND created_at>?",
+                (key, time.time() - self.ttl),
+            ).fetchone()
+        if row is None:
+            return None
+        self._remember(key, row[0], row[1])
+        return row[1]
+
+    def _insert(self, key: str, model: str, text: str, created_at: float) -> None:
+        with sqlite3.connect(_DB_PATH) as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO explanation_cache (key, model, explanation, created_at) VALUES (?,?,?,?)",
+                (key, model, text, created_at),
+            )
+            self._inserts += 1
+            if self._inserts % self.PURGE_EVERY == 0:
+                self._trim(conn)
+            conn.commit()
+
+    def _trim(self, conn: sqlite3.Connection) -> None:
+        conn.execute("DELETE FROM explanation_cache WHERE created_at<=?", (time.time() - self.ttl,))
+        conn.execute(
+            "DELETE FROM explanation_cache WHERE key IN "
+            "(SELECT key FROM explanation_cache ORDER BY created_at DESC LIMIT -1 OFFSET ?)",
+            (self.rows,),
+        )
+
+    def purge(self) -> None:
+        """Drop expired rows and everything beyond the row cap."""
+        with sqlite3.connect(_DB_PATH) as conn:
+            self._trim(conn)
+            conn.commit()
+
+    async def get(self, key: str) -> Optional[str]:
+        text = self._recall(key)
+        if text is not None:
+            _EXPLAIN_CACHE_HITS.labels("memory").inc()
+            return text
+        if self.rows > 0:
+            text = await _db_readers.run(self._load, key)
+            if text is not None:
+                _EXPLAIN_CACHE_HITS.labels("sqlite").inc()
+                return text
+        _EXPLAIN_CACHE_MISSES.inc()
+        return None
+
+    async def put(self, key: str, model: str, text: str) -> None:
+        created_at = time.time()
+        self._remember(key, created_at, text)
+        if self.rows > 0:
+            await _db_writer.run(self._insert, key, model, text, created_at)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._memory.clear()
+
+    def __len__(self) -> int:
+        return len(self._memory)
+
+
+_explanations = _ExplanationCache(_EXPLAIN_CACHE_SIZE, _EXPLAIN_CACHE_ROWS, _EXPLAIN_CACHE_TTL)
+if _explanations.enabled:
+    _explanations.purge()
+
+# ─────────────────────────────────────────────────────────────
+# TENANT POSTURE STORE — persisted ComplianceCheck + check results
+# PATCH sends field deltas; only checks whose rules read a changed field
+# are recomputed (plan.dependents index). A posture stored under an older
+# rules version is fully re-evaluated instead. Every check that flips is
+# written to the audit trail and to posture_history.
+# ─────────────────────────────────────────────────────────────
+_CHECK_REMOVED = -1  # posture_history.passed for a check a rules reload dropped
+
+
+def _posture_load(conn: sqlite3.Connection, tenant_id: str) -> Optional[tuple[dict, dict, str]]:
+    row = conn.execute(
+        "SELECT posture, results, rules_version FROM tenant_posture WHERE tenant_id=?", (tenant_id,)
+    ).fetchone()
+    return (json.loads(row[0]), json.loads(row[1]), row[2]) if row else None
+
+
+def _posture_write(tenant_id: str, apply) -> dict:
+    """
+    Read-modify-write a tenant posture in one IMMEDIATE transaction (safe
+    across uvicorn workers). `apply(stored_or_None, plan)` returns
+    (posture ComplianceCheck, results, changed_fields, recomputed).
+    """
+    plan = _RULE_PLAN
+    now = datetime.now(timezone.utc)
+    ts = now.isoformat()
+    with _phase("posture"):
+        conn = sqlite3.connect(_DB_PATH, isolation_level=None)
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            stored = _posture_load(conn, tenant_id)
+            posture, results, changed, recomputed = apply(stored, plan)
+            previous = stored[1] if stored else {}
+            flips = [
+                {"framework": fw, "check": check, "from": previous[fw][check], "to": value}
+                for fw, checks in results.items() for check, value in checks.items()
+                if fw in previous and check in previous[fw] and previous[fw][check] != value
+            ]
+            conn.execute(
+                "INSERT INTO tenant_posture (tenant_id, posture, results, rules_version, updated_at) VALUES (?,?,?,?,?) "
+                "ON CONFLICT(tenant_id) DO UPDATE SET posture=excluded.posture, results=excluded.results, "
+                "rules_version=excluded.rules_version, updated_at=excluded.updated_at",
+                (tenant_id, json.dumps(posture.model_dump()), json.dumps(results), plan.version, ts),
+            )
+            ts_us = _epoch_us(now)
+            conn.executemany(
+                "INSERT OR REPLACE INTO posture_history (tenant_id, framework, check_name, ts_us, passed) VALUES (?,?,?,?,?)",
+                [(tenant_id, fw, check, ts_us, int(value))
+                 for fw, checks in results.items() for check, value in checks.items()
+                 if previous.get(fw, {}).get(check) != value]
+                + [(tenant_id, fw, check, ts_us, _CHECK_REMOVED)  # dropped by a rules reload
+                   for fw, checks in previous.items() for check in checks
+                   if check not in results.get(fw, {})],
+            )
+            conn.execute("COMMIT")
+        except BaseException:
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+            raise
+        finally:
+            conn.close()
+    if flips:
+        log_audit("compliance_check_flipped", {"tenant_id": tenant_id, "flips": flips, "rules_version": plan.version})
+    return {
+        "tenant_id": tenant_id,
+        "changed_fields": changed,
+        "checks_recomputed": recomputed,
+        "flips": flips,
+        "frameworks": {fw: _framework_result(checks)["compliance_status"] for fw, checks in results.items()},
+        "rules_version": plan.version,
+        "updated_at": ts,
+    }
+
+
+def _epoch_us(dt: datetime) -> int:
+    """History timestamp: integer µs since epoch; naive datetimes are taken as UTC."""
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return int(dt.timestamp() * 1_000_000)
+
+
+def _posture_at(tenant_id: str, at: datetime, framework: Optional[str] = None) -> Optional[dict[str, dict[str, bool]]]:
+    """
+    Check results as they stood at `at`. Walks the tenant's distinct checks
+    in primary-key order (one seek each) and takes each check's last row
+    with ts ≤ at (one ORDER BY ts_us DESC LIMIT 1 seek), so the cost is
+    O(checks · log n) however long the history. Independent of the current
+    rule plan: checks a later reload removed still answer for the past,
+    and disappear from the point their removal was written. Checks with
+    no row yet are omitted; None when the tenant has no posture.
+    """
+    query = (
+        "SELECT h.framework, h.check_name, (SELECT p.passed FROM posture_history p "
+        "WHERE p.tenant_id=h.tenant_id AND p.framework=h.framework AND p.check_name=h.check_name "
+        "AND p.ts_us<=? ORDER BY p.ts_us DESC LIMIT 1) "
+        "FROM posture_history h WHERE h.tenant_id=? AND (h.framework, h.check_name)>(?, ?)"
+        + (" AND h.framework=?" if framework is not None else "")
+        + " ORDER BY h.framework, h.check_name LIMIT 1"
+    )
+    params: list = [_epoch_us(at), tenant_id]
+    rows = []
+    with sqlite3.connect(_DB_PATH) as conn:
+        stored = _posture_load(conn, tenant_id)
+        if stored is None:
+            return None
+        key = (framework or "", "")
+        while True:
+            row = conn.execute(query, params + list(key) + ([framework] if framework is not None else [])).fetchone()
+            if row is None:
+                break
+            rows.append(row)
+            key = row[:2]
+    # Present in the order of the stored results; checks no longer stored go last.
+    order = {(fw, check): i for i, (fw, check) in enumerate((fw, c) for fw, checks in stored[1].items() for c in checks)}
+    rows.sort(key=lambda r: (order.get((r[0], r[1]), len(order)), r[0], r[1]))
+    out: dict[str, dict[str, bool]] = {}
+    for fw, check, passed in rows:
+        if passed is not None and passed != _CHECK_REMOVED:
+            out.setdefault(fw, {})[check] = bool(passed)
+    return out
+
+
+def _posture_flips(tenant_id: str, start: datetime, end: datetime, framework: Optional[str] = None) -> list[dict]:
+    """
+    History rows in [start, end] whose value differs from the check's
+    previous value. Removal tombstones are skipped on both sides, so a
+    check dropped by one reload and restored unchanged by the next is not
+    a flip; first-seen rows are not flips either.
+    """
+    query = (
+        "SELECT ts_us, framework, check_name, passed FROM ("
+        "SELECT h.ts_us, h.framework, h.check_name, h.passed, (SELECT p.passed FROM posture_history p "
+        "WHERE p.tenant_id=h.tenant_id AND p.framework=h.framework AND p.check_name=h.check_name "
+        "AND p.ts_us<h.ts_us AND p.passed<>? ORDER BY p.ts_us DESC LIMIT 1) AS prev "
+        "FROM posture_history h WHERE h.tenant_id=? AND h.ts_us BETWEEN ? AND ? AND h.passed<>?"
+        + (" AND h.framework=?" if framework is not None else "")
+        + ") WHERE prev IS NOT NULL AND prev<>passed ORDER BY ts_us, framework, check_name"
+    )
+    params: list = [_CHECK_REMOVED, tenant_id, _epoch_us(start), _epoch_us(end), _CHECK_REMOVED]
+    if framework is not None:
+        params.append(framework)
+    with sqlite3.connect(_DB_PATH) as conn:
+        rows = conn.execute(query, params).fetchall()
+    return [
+        {"timestamp": datetime.fromtimestamp(ts_us / 1_000_000, timezone.utc).isoformat(),
+         "framework": fw, "check": check, "from": not passed, "to": bool(passed)}
+        for ts_us, fw, check, passed in rows
+    ]
+
+
+# ─────────────────────────────────────────────────────────────
+# HOST METRICS SAMPLER — psutil on a background thread
+# CPU, memory, disk and network counters every GENESIS_HOST_SAMPLE_INTERVAL
+# seconds into a ring of GENESIS_HOST_HISTORY samples; /api/system/metrics
+# reads the newest one instead of blocking ~0.75 s per call. Each sample
+# also carries the live API error rate over GENESIS_ERROR_WINDOW as of
+# when it was taken. Started on first use (also in each forked worker).
+# ─────────────────────────────────────────────────────────────
+_HOST_SAMPLE_INTERVAL = float(os.environ.get("GENESIS_HOST_SAMPLE_INTERVAL", "1.0"))
+_HOST_HISTORY         = int(os.environ.get("GENESIS_HOST_HISTORY", "300"))
+_DISK_ROOT            = "/" if sys.platform != "win32" else "C:\\"
+
+
+class _HostSampler:
+    """Daemon thread appending psutil samples to a bounded deque."""
+
+    def __init__(self, interval: float, history: int) -> None:
+        self.interval = interval
+        self.samples: deque = deque(maxlen=max(1, history))
+        self.listeners: list[Callable[[dict], None]] = []  # called on the sampler thread per sample
+        self._ready = threading.Event()
+        self._lock = threading.Lock()
+        self._pid = 0
+
+    @property
+    def ready(self) -> bool:
+        self.start()
+        return self._ready.is_set()
+
+    def start(self) -> None:
+        """Start the background thread once per process (no-op when already running here)."""
+        if self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._pid != os.getpid():
+                self._pid = os.getpid()
+                self.samples.clear()
+                self._ready.clear()
+                threading.Thread(target=self._run, name="genesis-host-sampler", daemon=True).start()
+
+    def _run(self) -> None:
+        psutil.cpu_percent(interval=None)  # prime: next call returns utilisation since now
+        net = psutil.net_io_counters()
+        last = time.monotonic()
+        wait = min(self.interval, 0.25)  # first sample quickly, then every interval
+        while True:
+            time.sleep(wait)
+            wait = self.interval
+            now, net_now = time.monotonic(), psutil.net_io_counters()
+            moved = net_now.bytes_recv - net.bytes_recv + net_now.bytes_sent - net.bytes_sent
+            net_mbps = moved / max(now - last, 1e-6) / 1e6
+            net, last = net_now, now
+            mem = psutil.virtual_memory()
+            disk = psutil.disk_usage(_DISK_ROOT)
+            self.samples.append({
+                "cpu_usage_pct": round(psutil.cpu_percent(interval=None), 1),
+                "memory_usage_pct": round(mem.percent, 1),
+                "disk_usage_pct": round(disk.percent, 1),
+                "network_io_mbps": round(net_mbps, 2),
+                "error_rate_pct": _error_rates(_ERROR_WINDOW)["error_rate_pct"],
+                "memory_total_gb": round(mem.total / 1e9, 1),
+                "memory_used_gb": round(mem.used / 1e9, 1),
+                "disk_total_gb": round(disk.total / 1e9, 1),
+                "disk_free_gb": round(disk.free / 1e9, 1),
+                "timestamp": datetime.now(timezone.utc).isoformat(),
+            })
+            self._ready.set()
+            for listener in self.listeners:
+                try:
+                    listener(self.samples[-1])
+                except Exception:
+                    _log.exception("host_sample_listener_failed")
+
+    def wait_ready(self, timeout: float = 5.0) -> bool:
+        self.start()
+        return self._ready.wait(timeout)
+
+    def latest(self) -> dict:
+        return self.samples[-1]
+
+    def history(self, n: int) -> list[dict]:
+        samples = list(self.samples)  # deque snapshot; appends may race with slicing
+        return samples[-n:]
+
+
+_host_sampler = _HostSampler(_HOST_SAMPLE_INTERVAL, _HOST_HISTORY)
+
+
+# ─────────────────────────────────────────────────────────────
+# METRICS HISTORY — multi-resolution NumPy rings
+# Each host sample (plus the live error rate and the per-framework risk
+# score it implies) is folded into three tiers: 1 s for the last hour,
+# 1 min for the last day, 1 h for the last 30 days. Every tier keeps
+# min / max / mean per bucket in preallocated arrays, so memory is fixed
+# at import time (genesis_metrics_history_bytes) whatever the uptime.
+# ─────────────────────────────────────────────────────────────
+_HISTORY_TIERS = (("1s", 1, 3600), ("1m", 60, 1440), ("1h", 3600, 720))  # (name, resolution s, slots)
+_HOST_SERIES   = ("cpu_usage_pct", "memory_usage_pct", "disk_usage_pct", "network_io_mbps", "error_rate_pct")
+
+
+class _HistoryTier:
+    """One resolution: ring of bucket epochs + [min, max, mean] per series, and the open bucket."""
+
+    def __init__(self, name: str, resolution: int, slots: int, width: int) -> None:
+        self.name, self.resolution, self.slots = name, resolution, slots
+        self.buckets = np.full(slots, -1, dtype=np.int64)
+        self.stats = np.full((slots, 3, width), np.nan)
+        self.open_bucket = -1
+        self.open = np.zeros((3, width))  # running min, max, sum
+        self.open_count = 0
+
+    @property
+    def nbytes(self) -> int:
+        return self.buckets.nbytes + self.stats.nbytes + self.open.nbytes
+
+    def add(self, bucket: int, values: np.ndarray) -> None:
+        if bucket != self.open_bucket:
+            self._close()
+            self.open_bucket = bucket
+            self.open[0] = self.open[1] = self.open[2] = values
+            self.open_count = 1
+            return
+        np.minimum(self.open[0], values, out=self.open[0])
+        np.maximum(self.open[1], values, out=self.open[1])
+        self.open[2] += values
+        self.open_count += 1
+
+    def _close(self) -> None:
+        if not self.open_count:
+            return
+        slot = self.open_bucket % self.slots
+        self.buckets[slot] = self.open_bucket
+        self.stats[slot, :2] = self.open[:2]
+        self.stats[slot, 2] = self.open[2] / self.open_count
+
+    def rows(self, first: int, last: int) -> tuple[np.ndarray, np.ndarray]:
+        """(bucket epochs, stats) for closed buckets in [first, last] plus the open one, oldest first."""
+        if self.open_count:
+            first = max(first, self.open_bucket - self.slots + 1)  # the slot the open bucket will overwrite
+        mask = (self.buckets >= first) & (self.buckets <= last)
+        order = np.argsort(self.buckets[mask])
+        buckets, stats = self.buckets[mask][order], self.stats[mask][order]
+        if self.open_count and first <= self.open_bucket <= last:
+            current = np.stack([self.open[0], self.open[1], self.open[2] / self.open_count])
+            buckets = np.append(buckets, self.open_bucket)
+            stats = np.concatenate([stats, current[None]])
+        return buckets, stats
+
+
+class _MetricsHistory:
+    """
+    Tiered min / max / mean history of a fixed set of series. Every tier
+    aggregates the raw samples landing in its bucket — the same result as
+    rolling the finer tier's min / max / count-weighted mean up, without
+    the cascade. record() is a few vector ops per tier.
+    """
+
+    def __init__(self, series: tuple[str, ...], tiers=_HISTORY_TIERS) -> None:
+        self.series = series
+        self.index = {name: i for i, name in enumerate(series)}
+        self.tiers = [_HistoryTier(name, res, slots, len(series)) for name, res, slots in tiers]
+        self._lock = threading.Lock()
+
+    @property
+    def nbytes(self) -> int:
+        return sum(t.nbytes for t in self.tiers)
+
+    def record(self, values: dict[str, float], now: float) -> None:
+        row = np.array([values.get(name, np.nan) for name in self.series], dtype=np.float64)
+        with self._lock:
+            for tier in self.tiers:
+                tier.add(int(now // tier.resolution), row)
+
+    def pick_tier(self, start: float, now: float) -> _HistoryTier:
+        """Finest tier whose retention still reaches back to `start`."""
+        for tier in self.tiers:
+            if now - start <= tier.resolution * tier.slots:
+                return tier
+        return self.tiers[-1]
+
+    def query(self, names: list[str], start: float, end: float, tier: _HistoryTier) -> dict:
+        cols = [self.index[n] for n in names]
+        with self._lock:
+            buckets, stats = tier.rows(int(start // tier.resolution), int(end // tier.resolution))
+        stats = np.round(stats[:, :, cols], 2)
+
+        def column(a: np.ndarray) -> list:
+            return [None if v != v else float(v) for v in a]  # NaN (series missing in a sample) → null
+
+        return {
+            "resolution": tier.name,
+            "resolution_s": tier.resolution,
+            "timestamps": (buckets * tier.resolution).tolist(),
+            "series": {
+                name: {"min": column(stats[:, 0, i]), "max": column(stats[:, 1, i]), "mean": column(stats[:, 2, i])}
+                for i, name in enumerate(names)
+            },
+        }
+
+
+_metrics_history = _MetricsHistory(_HOST_SERIES + tuple(f"risk_{fw}" for fw in FRAMEWORKS))
+
+
+def _record_history(sample: dict) -> None:
+    values = {name: sample[name] for name in _HOST_SERIES}
+    for fw in FRAMEWORKS:
+        values[f"risk_{fw}"], _ = _predict_risk(sample["cpu_usage_pct"], sample["memory_usage_pct"],
+                                                sample["network_io_mbps"], sample["disk_usage_pct"],
+                                                sample["error_rate_pct"], fw)
+    _metrics_history.record(values, time.time())
+
+
+_host_sampler.listeners.append(_record_history)
+_log.info("metrics_history_allocated", extra={"bytes": _metrics_history.nbytes,
+                                               "series": len(_metrics_history.series),
+                                               "tiers": ",".join(f"{n}x{k}" for n, _, k in _HISTORY_TIERS)})
+
+
+# ─────────────────────────────────────────────────────────────
+# DEPENDENCY PROBES — llama-server, SQLite, disk
+# A daemon thread runs every probe each GENESIS_PROBE_INTERVAL seconds
+# and swaps in a fresh result dict; /api/health, /readyz and the live
+# assessment stream read that cache, so a dead llama-server no longer
+# costs each caller its 1 s connect timeout. Results older than three
+# intervals count as failed (the prober itself is stuck).
+# ─────────────────────────────────────────────────────────────
+_PROBE_INTERVAL    = float(os.environ.get("GENESIS_PROBE_INTERVAL", "10"))
+_DISK_MIN_FREE_MB  = float(os.environ.get("GENESIS_DISK_MIN_FREE_MB", "100"))
+
+
+def _probe_llama() -> dict:
+    if not _llama_available():
+        raise ConnectionError(f"llama-server not reachable at {LLAMA_BASE}")
+    return {"endpoint": LLAMA_BASE}
+
+
+def _probe_database() -> dict:
+    # audit_log is append-only with AUTOINCREMENT ids, so MAX(id) is the row count — one index seek
+    with sqlite3.connect(_DB_PATH, timeout=2) as conn:
+        return {
+            "audit_entries": conn.execute("SELECT COALESCE(MAX(id), 0) FROM audit_log").fetchone()[0],
+            "active_keys": conn.execute("SELECT COUNT(*) FROM api_keys WHERE active=1").fetchone()[0],
+        }
+
+
+def _probe_disk() -> dict:
+    usage = psutil.disk_usage(os.path.dirname(os.path.abspath(_DB_PATH)))
+    free_mb = usage.free / 1e6
+    if free_mb < _DISK_MIN_FREE_MB:
+        raise OSError(f"{free_mb:.0f} MB free below GENESIS_DISK_MIN_FREE_MB={_DISK_MIN_FREE_MB:g}")
+    return {"free_gb": round(usage.free / 1e9, 1), "used_pct": round(usage.percent, 1)}
+
+
+class _DependencyProbes:
+    """Background prober; `results` maps probe name → last outcome, replaced whole each round."""
+
+    def __init__(self, interval: float, probes: dict[str, tuple[Callable[[], dict], bool]]) -> None:
+        self.interval = interval
+        self.probes = probes  # name → (probe, critical); a probe raises to report failure
+        self.results: dict[str, dict] = {}
+        self._ready = threading.Event()
+        self._lock = threading.Lock()
+        self._pid = 0
+
+    @property
+    def ready(self) -> bool:
+        self.start()
+        return self._ready.is_set()
+
+    def start(self) -> None:
+        """Start the background thread once per process (no-op when already running here)."""
+        if self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._pid != os.getpid():
+                self._pid = os.getpid()
+                self.results = {}
+                self._ready.clear()
+                threading.Thread(target=self._run, name="genesis-probes", daemon=True).start()
+
+    def run_once(self) -> dict[str, dict]:
+        results = {}
+        for name, (probe, critical) in self.probes.items():
+            start = time.perf_counter()
+            try:
+                outcome = {"ok": True, **probe()}
+            except Exception as exc:
+                outcome = {"ok": False, "error": f"{type(exc).__name__}: {exc}"}
+            outcome.update(critical=critical, latency_ms=round((time.perf_counter() - start) * 1000, 2),
+                           checked_at=datetime.now(timezone.utc).isoformat(), _mono=time.monotonic())
+            results[name] = outcome
+        self.results = results
+        self._ready.set()
+        return results
+
+    def _run(self) -> None:
+        while True:
+            try:
+                self.run_once()
+            except Exception:
+                _log.exception("dependency_probe_failed")
+            time.sleep(self.interval)
+
+    def wait_ready(self, timeout: float = 5.0) -> bool:
+        self.start()
+        return self._ready.wait(timeout)
+
+    def ok(self, name: str) -> bool:
+        result = self.results.get(name)
+        return bool(result and result["ok"] and time.monotonic() - result["_mono"] <= 3 * self.interval)
+
+    def get(self, name: str, field: str, default=None):
+        return self.results.get(name, {}).get(field, default)
+
+    def snapshot(self) -> dict[str, dict]:
+        now = time.monotonic()
+        return {
+            name: {**{k: v for k, v in r.items() if k != "_mono"}, "ok": self.ok(name),
+                   "age_s": round(now - r["_mono"], 1)}
+            for name, r in self.results.items()
+        }
+
+    def is_ready(self) -> bool:
+        """Every critical dependency passed its last, still-fresh probe."""
+        return self._ready.is_set() and all(self.ok(name) for name, (_, critical) in self.probes.items() if critical)
+
+
+_probes = _DependencyProbes(_PROBE_INTERVAL, {
+    "database":  (_probe_database, True),
+    "disk":      (_probe_disk, True),
+    "llama":     (_probe_llama, False),
+})
+
+
+async def _probes_ready() -> bool:
+    return _probes.ready or await _metrics_pool.run(_probes.wait_ready)
+
+
+# ─────────────────────────────────────────────────────────────
+# LIVE ASSESSMENT STREAM — one scoring loop, many subscribers
+# Every GENESIS_STREAM_INTERVAL seconds the latest host sample and live
+# error rate are scored against all frameworks, once per process, and
+# the snapshot is pushed to every SSE / WebSocket subscriber. The loop
+# runs on the event loop while anyone is subscribed. A slow subscriber
+# only loses its oldest queued snapshots.
+# ─────────────────────────────────────────────────────────────
+_STREAM_INTERVAL  = float(os.environ.get("GENESIS_STREAM_INTERVAL", "5"))
+_STREAM_BACKLOG   = 8   # snapshots queued per subscriber
+_STREAM_KEEPALIVE = 15.0
+
+
+async def _assess_live() -> Optional[dict]:
+    """Score the current host sample + error rate against every framework (no audit write)."""
+    if not _host_sampler.ready and not await _metrics_pool.run(_host_sampler.wait_ready):
+        return None
+    host = _host_sampler.latest()
+    errors = _error_rates(_ERROR_WINDOW)
+    await _probes_ready()
+    ai_ready, audit_entries = _probes.ok("llama"), _probes.get("database", "audit_entries", 0)
+    frameworks = {}
+    for fw in FRAMEWORKS:
+        score, _ = _predict_risk(host["cpu_usage_pct"], host["memory_usage_pct"], host["network_io_mbps"],
+                                 host["disk_usage_pct"], errors["error_rate_pct"], fw)
+        frameworks[fw] = {"risk_score": round(score, 2), "risk_level": _risk_level(score)}
+    return {
+        "host": host,
+        "errors": errors,
+        "frameworks": frameworks,
+        "health": {
+            "audit_entries": audit_entries,
+            "local_ai_ready": ai_ready,
+            "model_r2": _MODEL_R2,
+            "frameworks_loaded": len(FRAMEWORKS),
+        },
+    }
+
+
+class _AssessmentBroadcaster:
+    """Fan-out of periodic assessment snapshots to per-subscriber bounded queues."""
+
+    def __init__(self, interval: float, gauge: Optional[Gauge] = None) -> None:
+        self.interval = interval
+        self.seq = 0
+        self.latest: Optional[dict] = None
+        self.subscribers: set[asyncio.Queue] = set()
+        self._task: Optional[asyncio.Task] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._gauge = gauge
+
+    def subscribe(self) -> asyncio.Queue:
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:  # first subscriber, or a new event loop (old queues are dead)
+            self._loop, self._task = loop, None
+            self.subscribers.clear()
+        q: asyncio.Queue = asyncio.Queue(_STREAM_BACKLOG)
+        if self.latest is not None:
+            q.put_nowait(self.latest)
+        self.subscribers.add(q)
+        self._count()
+        if self._task is None or self._task.done():
+            self._task = loop.create_task(self._run())
+        return q
+
+    def unsubscribe(self, q: asyncio.Queue) -> None:
+        self.subscribers.discard(q)
+        self._count()
+
+    def _count(self) -> None:
+        if self._gauge is not None:
+            self._gauge.set(len(self.subscribers))
+
+    def publish(self, snapshot: dict) -> None:
+        self.seq += 1
+        event = {"type": "assessment", "seq": self.seq, "timestamp": datetime.now(timezone.utc).isoformat(), **snapshot}
+        self.latest = event
+        for q in list(self.subscribers):
+            if q.full():
+                q.get_nowait()
+            q.put_nowait(event)
+
+    async def _run(self) -> None:
+        while self.subscribers:
+            try:
+                snapshot = await _assess_live()
+                if snapshot is not None:
+                    self.publish(snapshot)
+            except Exception:
+                _log.exception("assessment_tick_failed")
+            await asyncio.sleep(self.interval)
+
+
+_assessments = _AssessmentBroadcaster(_STREAM_INTERVAL, _STREAM_SUBSCRIBERS)
+
 
 # ─────────────────────────────────────────────────────────────
 # ROUTES
 # ─────────────────────────────────────────────────────────────
 
 @app.get("/", tags=["Info"], include_in_schema=False)
-def root():
+async def root():
     """Redirect browser traffic to the dashboard UI."""
     return RedirectResponse(url="/ui")
 
 
 @app.get("/api/health", tags=["Operations"])
-def health():
-    ai_ready = _llama_available()
-    return {
-        "status": "healthy",
+async def health(detail: bool = False):
+    """
+    Service overview from the cached dependency probes (refreshed every
+    GENESIS_PROBE_INTERVAL s; `audit_entries` is as of the last probe).
+    `detail=true` adds per-probe status, latency and age.
+    """
+    await _probes_ready()
+    ai_ready, db_ok = _probes.ok("llama"), _probes.ok("database")
+    body = {
+        "status": "healthy" if _probes.is_ready() else "degraded",
         "services": {
             "risk_ml_engine": "operational",
             "compliance_engine": "operational",
             "qes_client": "operational",
-            "audit_trail": "operational",
+            "audit_trail": "operational" if db_ok else "unavailable",
             "api_gateway": "operational",
             "local_ai_llm": "operational" if ai_ready else "offline – run scripts/start_llama.ps1",
         },
         "model_r2": _MODEL_R2,
         "model_cv_r2": _MODEL_R2,
         "frameworks_loaded": len(FRAMEWORKS),
-        "audit_entries": _audit_count(),
+        "audit_entries": _probes.get("database", "audit_entries", 0),
         "local_ai_ready": ai_ready,
         "llama_model": os.path.basename(LLAMA_MODEL),
         "uptime_check": datetime.now(timezone.utc).isoformat(),
     }
+    if detail:
+        body["dependencies"] = _probes.snapshot()
+        body["runtime"] = _runtime.snapshot()
+    return body
+
+
+@app.get("/livez", tags=["Operations"])
+async def livez():
+    """Liveness: the process is up and its event loop answers. Never touches a dependency."""
+    return {"status": "alive"}
+
+
+@app.get("/readyz", tags=["Operations"])
+async def readyz():
+    """
+    Readiness from the probe cache: 200 while the database and disk probes
+    pass (llama-server is optional), 503 otherwise or before the first round.
+    """
+    ready = _probes.ready and _probes.is_ready()
+    body = {"status": "ready" if ready else "not_ready", "checks": _probes.snapshot()}
+    return _JSONResponse(body, status_code=200 if ready else 503)
 
 
 @app.get("/api/system/metrics", tags=["Operations"])
-def system_metrics():
-    """Live system metrics via psutil — used by dashboard sliders."""
-    cpu = psutil.cpu_percent(interval=0.5)
-    mem = psutil.virtual_memory()
-    disk = psutil.disk_usage("/" if sys.platform != "win32" else "C:\\")
-    net_before = psutil.net_io_counters()
-    import time; time.sleep(0.25)
-    net_after = psutil.net_io_counters()
-    net_mbps = round((net_after.bytes_recv - net_before.bytes_recv + net_after.bytes_sent - net_before.bytes_sent) / 0.25 / 1e6, 2)
-    return {
-        "cpu_usage_pct": round(cpu, 1),
-        "memory_usage_pct": round(mem.percent, 1),
-        "disk_usage_pct": round(disk.percent, 1),
-        "network_io_mbps": round(net_mbps, 2),
-        "error_rate_pct": 0.0,
-        "memory_total_gb": round(mem.total / 1e9, 1),
-        "memory_used_gb": round(mem.used / 1e9, 1),
-        "disk_total_gb": round(disk.total / 1e9, 1),
-        "disk_free_gb": round(disk.free / 1e9, 1),
-        "timestamp": datetime.now(timezone.utc).isoformat(),
-    }
+async def system_metrics(history: int = Query(0, ge=0, le=_HOST_HISTORY)):
+    """
+    Live system metrics via psutil — used by dashboard sliders. Served from the
+    background sampler's latest sample; `history=N` adds the last N samples.
+    """
+    if not _host_sampler.ready and not await _metrics_pool.run(_host_sampler.wait_ready):
+        raise HTTPException(status_code=503, detail="Host metrics sampler has not produced a sample yet.")
+    latest = _host_sampler.latest()
+    if not history:
+        return latest
+    return {**latest, "history": _host_sampler.history(history)}
+
+
+@app.get("/api/metrics/history", tags=["Operations"])
+async def metrics_history(
+    series: str = Query("cpu_usage_pct,memory_usage_pct", description="Comma-separated series names"),
+    start: Optional[datetime] = Query(None, description="ISO-8601 or epoch seconds; default end − 1 h"),
+    end: Optional[datetime] = Query(None, description="ISO-8601 or epoch seconds; default now"),
+    resolution: Optional[str] = Query(None, description="1s, 1m or 1h; default: finest tier covering start"),
+):
+    """
+    Downsampled host metrics, live error rate and per-framework risk scores
+    (`risk_<framework>`) from the in-process history. Columnar: one
+    timestamp array plus min / max / mean per series, oldest first.
+    """
+    names = [n.strip() for n in series.split(",") if n.strip()]
+    unknown = [n for n in names if n not in _metrics_history.index]
+    if not names or unknown:
+        raise HTTPException(status_code=422, detail={"unknown_series": unknown, "available": list(_metrics_history.series)})
+    now = time.time()
+    end_s = end.timestamp() if end else now
+    start_s = start.timestamp() if start else end_s - 3600
+    if start_s > end_s:
+        raise HTTPException(status_code=422, detail="start must not be after end")
+    if resolution is None:
+        tier = _metrics_history.pick_tier(start_s, now)
+    else:
+        tier = next((t for t in _metrics_history.tiers if t.name == resolution), None)
+        if tier is None:
+            raise HTTPException(status_code=422, detail=f"resolution must be one of {[t.name for t in _metrics_history.tiers]}")
+    _host_sampler.start()  # no-op once lifespan started it; covers servers run without lifespan
+    body = _metrics_history.query(names, start_s, end_s, tier)
+    return _JSONResponse({"start": start_s, "end": end_s, **body})
+
+
+@app.get("/api/stream/assessments", tags=["Operations"])
+async def stream_assessments(limit: int = Query(0, ge=0)):
+    """
+    Server-Sent Events: one `assessment` event per scoring tick (host metrics,
+    live error rate, per-framework risk, health counters). The latest snapshot
+    is sent on connect. `limit=N` closes the stream after N events.
+    """
+    async def events():
+        q = _assessments.subscribe()
+        sent = 0
+        try:
+            while not limit or sent < limit:
+                try:
+                    event = await asyncio.wait_for(q.get(), timeout=_STREAM_KEEPALIVE)
+                except asyncio.TimeoutError:
+                    yield b": keepalive\n\n"
+                    continue
+                yield b"id: %d\nevent: assessment\ndata: %s\n\n" % (event["seq"], _json_dumps(event))
+                sent += 1
+        finally:
+            _assessments.unsubscribe(q)
+
+    return StreamingResponse(events(), media_type="text/event-stream",
+                             headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+
+@app.websocket("/api/stream/ws")
+async def stream_assessments_ws(websocket: WebSocket):
+    """WebSocket variant of /api/stream/assessments: one JSON text frame per snapshot."""
+    await websocket.accept()
+    q = _assessments.subscribe()
+    try:
+        while True:
+            await websocket.send_text(_json_dumps(await q.get()).decode())
+    except WebSocketDisconnect:
+        pass
+    finally:
+        _assessments.unsubscribe(q)
 
 
 @app.get("/api/ai/status", tags=["Local AI (llama.cpp)"])
-def ai_status():
-    """Check if llama-server is running on port 8090."""
-    ready = _llama_available()
-    return {
-        "llama_server": "online" if ready else "offline",
-        "endpoint": LLAMA_BASE,
-        "model": os.path.basename(LLAMA_MODEL),
-        "model_exists": os.path.isfile(LLAMA_MODEL),
-        "start_cmd": "scripts/start_llama.ps1",
-        "gpu": "RTX 3060 Laptop (Vulkan)",
-    }
+async def ai_status(request: Request):
+    """Whether llama-server is up, as of the last background dependency probe."""
+    await _probes_ready()
+    state = (_probes.ok("llama"), os.path.isfile(LLAMA_MODEL))
+    static = _ai_status_static.get(state)
+    if static is None:
+        ready, model_exists = state
+        static = _ai_status_static[state] = _StaticJSON({
+            "llama_server": "online" if ready else "offline",
+            "endpoint": LLAMA_BASE,
+            "model": os.path.basename(LLAMA_MODEL),
+            "model_exists": model_exists,
+            "start_cmd": "scripts/start_llama.ps1",
+            "gpu": "RTX 3060 Laptop (Vulkan)",
+        })
+    return static.response(request, "no-cache")
 
 
 @app.post("/api/ai/explain", tags=["Local AI (llama.cpp)"], dependencies=[Depends(require_api_key)])
-def ai_explain(req: LlamaExplainRequest):
+async def ai_explain(req: LlamaExplainRequest):
     """
     Ask local Qwen2.5-0.5B to explain a risk assessment result.
     Requires llama-server running: scripts/start_llama.ps1
+    Repeated inputs are answered from the explanation cache (X-Cache: HIT).
     """
-    if not _llama_available():
+    model = os.path.basename(LLAMA_MODEL)
+    prompt = _explain_prompt(req, _EXPLAIN_SCORE_BUCKET)
+    key = _explain_key(model, req.max_tokens, prompt)
+    explanation = await _explanations.get(key) if _explanations.enabled else None
+    if explanation is not None:
+        await _audit("ai_explain", {"framework": req.framework, "score": req.risk_score, "cached": True})
+        return _JSONResponse(_explain_result(req, explanation, model), headers={"X-Cache": "HIT"})
+    try:
+        with _phase("llm"), _LLM_LATENCY.time():
+            explanation = await _llama.complete(prompt, req.max_tokens)
+    except _LlamaUnavailable:
+        _LLM_REQUESTS.labels("offline").inc()
         raise HTTPException(
             status_code=503,
             detail="llama-server offline. Start it with: scripts/start_llama.ps1"
         )
+    except TimeoutError:
+        _LLM_REQUESTS.labels("timeout").inc()
+        raise HTTPException(status_code=504, detail=f"LLM inference exceeded {_llama.timeout:g}s")
+    except Exception as e:
+        _LLM_REQUESTS.labels("error").inc()
+        raise HTTPException(status_code=502, detail=f"LLM inference failed: {e}")
+    _LLM_REQUESTS.labels("ok").inc()
+    if explanation and _explanations.enabled:
+        await _explanations.put(key, model, explanation)
+    await _audit("ai_explain", {"framework": req.framework, "score": req.risk_score, "cached": False})
+    return _JSONResponse(_explain_result(req, explanation, model), headers={"X-Cache": "MISS"})
+
+
+@app.post("/api/ai/explain/stream", tags=["Local AI (llama.cpp)"], dependencies=[Depends(require_api_key)])
+async def ai_explain_stream(req: LlamaExplainRequest):
+    """
+    Server-Sent Events variant of /api/ai/explain: a `token` event per text
+    delta as llama-server generates, then `done` with the full result (or
+    `error` if generation fails midway). Offline / timeout before the first
+    token answer 503 / 504 like the non-streaming route. A client that
+    disconnects cancels the upstream completion and frees its slot;
+    partial text is neither cached nor audited.
+    """
+    model = os.path.basename(LLAMA_MODEL)
+    prompt = _explain_prompt(req, _EXPLAIN_SCORE_BUCKET)
+    key = _explain_key(model, req.max_tokens, prompt)
+    headers = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    cached = await _explanations.get(key) if _explanations.enabled else None
+    if cached is not None:
+        await _audit("ai_explain", {"framework": req.framework, "score": req.risk_score, "cached": True})
+
+        async def replay():
+            yield _sse_event("token", {"text": cached})
+            yield _sse_event("done", _explain_result(req, cached, model))
+
+        return StreamingResponse(replay(), media_type="text/event-stream", headers={**headers, "X-Cache": "HIT"})
+
+    started = time.perf_counter()
+    tokens = _llama.stream(prompt, req.max_tokens)
+    try:
+        with _phase("llm"):
+            await tokens.__anext__()  # upstream accepted; failures up to here still get an HTTP status
+    except _LlamaUnavailable:
+        _LLM_REQUESTS.labels("offline").inc()
+        raise HTTPException(status_code=503, detail="llama-server offline. Start it with: scripts/start_llama.ps1")
+    except TimeoutError:
+        _LLM_REQUESTS.labels("timeout").inc()
+        raise HTTPException(status_code=504, detail=f"LLM inference exceeded {_llama.timeout:g}s")
+    except Exception as e:
+        _LLM_REQUESTS.labels("error").inc()
+        raise HTTPException(status_code=502, detail=f"LLM inference failed: {e}")
+
+    async def relay():
+        parts: list[str] = []
+        try:
+            async for text in tokens:
+                if not parts:
+                    _LLM_FIRST_TOKEN.observe(time.perf_counter() - started)
+                parts.append(text)
+                yield _sse_event("token", {"text": text})
+        except (asyncio.CancelledError, GeneratorExit):  # client went away
+            _LLM_REQUESTS.labels("cancelled").inc()
+            raise
+        except Exception as e:
+            _LLM_REQUESTS.labels("timeout" if isinstance(e, TimeoutError) else "error").inc()
+            yield _sse_event("error", {"detail": f"LLM inference failed: {e}"})
+            return
+        finally:
+            await tokens.aclose()
+        _LLM_REQUESTS.labels("ok").inc()
+        _LLM_LATENCY.observe(time.perf_counter() - started)
+        explanation = "".join(parts).strip()
+        if explanation and _explanations.enabled:
+            await _explanations.put(key, model, explanation)
+        await _audit("ai_explain", {"framework": req.framework, "score": req.risk_score, "cached": False, "stream": True})
+        yield _sse_event("done", _explain_result(req, explanation, model))
+
+    return StreamingResponse(relay(), media_type="text/event-stream", headers={**headers, "X-Cache": "MISS"})
+
+
+def _sse_event(event: str, data: dict) -> bytes:
+    return b"event: %s\ndata: %s\n\n" % (event.encode(), _json_dumps(data))
+
+
+def _explain_prompt(req: LlamaExplainRequest, score_bucket: float = 0.0) -> str:
+    """Prompt from normalized inputs: top-3 drivers by weight then name, score optionally bucketed."""
     drivers = ", ".join(
         f"{k}={round(v*100,1)}%" for k, v in sorted(
-            req.feature_importance.items(), key=lambda x: -x[1]
+            req.feature_importance.items(), key=lambda x: (-x[1], x[0])
         )[:3]
     ) or "unknown"
+    score = round(req.risk_score / score_bucket) * score_bucket if score_bucket > 0 else req.risk_score
     fw_meta = FRAMEWORKS.get(req.framework, {})
     fw_name = fw_meta.get("name", req.framework.upper())
-    prompt = (
+    return (
         f"You are an EU banking compliance analyst. Explain this risk result to a compliance officer in 2-3 concise sentences.\n\n"
         f"Framework: {fw_name}\n"
-        f"Risk Score: {req.risk_score:.1f}/100 ({req.risk_level})\n"
+        f"Risk Score: {score:.1f}/100 ({req.risk_level})\n"
         f"Top Risk Drivers: {drivers}\n"
-        f"Required Action: {req.regulatory_action}\n\n"
+        f"Required Action: {req.regulatory_action.strip()}\n\n"
         f"Explanation:"
     )
-    try:
-        explanation = _llama_complete(prompt, req.max_tokens)
-    except Exception as e:
-        raise HTTPException(status_code=502, detail=f"LLM inference failed: {e}")
-    log_audit("ai_explain", {"framework": req.framework, "score": req.risk_score})
+
+
+def _explain_key(model: str, max_tokens: int, prompt: str) -> str:
+    return hashlib.sha256(json.dumps([model, max_tokens, prompt]).encode()).hexdigest()
+
+
+def _explain_result(req: LlamaExplainRequest, explanation: str, model: str) -> dict:
     return {
         "framework": req.framework,
         "risk_score": req.risk_score,
         "risk_level": req.risk_level,
         "explanation": explanation,
-        "model": os.path.basename(LLAMA_MODEL),
+        "model": model,
         "timestamp": datetime.now(timezone.utc).isoformat(),
     }
 
 
-@app.post("/api/risk/score", tags=["Risk ML Engine"], dependencies=[Depends(require_api_key)])
-def risk_score(data: RiskInput):
-    """
-    Predict infrastructure risk score using Basel III ML Engine.
-    Uses Gradient Boosting for non-linear risk pattern recognition.
-    """
-    score, fw_weights = _predict_risk(
-        data.cpu, data.memory, data.network_io, data.disk_usage,
-        data.error_rate, data.framework or "basel_iii"
-    )
-
-    risk_level = (
+def _risk_level(score: float) -> str:
+    return (
         "CRITICAL" if score >= 80 else
         "HIGH" if score >= 60 else
         "MEDIUM" if score >= 40 else
@@ -737,7 +3133,19 @@ def risk_score(data: RiskInput):
         "MINIMAL"
     )
 
+
+async def _score_risk(data: RiskInput) -> dict:
+    with _phase("score"):
+        score, fw_weights = _predict_risk(
+            data.cpu, data.memory, data.network_io, data.disk_usage,
+            data.error_rate, data.framework or "basel_iii"
+        )
+
+    risk_level = _risk_level(score)
+    _RISK_SCORES.labels(data.framework or "basel_iii", risk_level).inc()
+
     feature_importance = fw_weights
+    audit = await _audit("risk_score", {"score": score, "level": risk_level})
 
     result = {
         "risk_score": round(score, 2),
@@ -755,156 +3163,316 @@ def risk_score(data: RiskInput):
             "MINIMAL": "No immediate action required",
         }[risk_level],
         "timestamp": datetime.now(timezone.utc).isoformat(),
-        "audit_ref": log_audit("risk_score", {"score": score, "level": risk_level})["timestamp"],
+        "audit_ref": audit["timestamp"],
     }
     return result
 
 
+@app.post("/api/risk/score", tags=["Risk ML Engine"], dependencies=[Depends(require_api_key)])
+async def risk_score(data: RiskInput):
+    """
+    Predict infrastructure risk score using Basel III ML Engine.
+    Uses Gradient Boosting for non-linear risk pattern recognition.
+    """
+    return _JSONResponse(await _score_risk(data))
+
+
+@app.get("/api/risk/auto", tags=["Risk ML Engine"], dependencies=[Depends(require_api_key)])
+async def risk_auto(
+    framework: str = "basel_iii",
+    window: float = Query(_ERROR_WINDOW, ge=60, le=3600),
+    tenant_id: Optional[str] = None,
+):
+    """
+    Score live conditions: latest host sample plus the error rate observed by
+    the API over `window` seconds (all traffic, or only `tenant_id`'s requests).
+    """
+    if framework not in FRAMEWORKS:
+        raise HTTPException(status_code=404, detail=f"Framework '{framework}' not found.")
+    if not _host_sampler.ready and not await _metrics_pool.run(_host_sampler.wait_ready):
+        raise HTTPException(status_code=503, detail="Host metrics sampler has not produced a sample yet.")
+    host = _host_sampler.latest()
+    errors = _error_rates(window, None if tenant_id is None else (lambda key: key[1] == tenant_id))
+    data = RiskInput(
+        cpu=host["cpu_usage_pct"], memory=host["memory_usage_pct"], network_io=min(host["network_io_mbps"], 100000.0),
+        disk_usage=host["disk_usage_pct"], error_rate=errors["error_rate_pct"],
+        tenant_id=tenant_id or "default", framework=framework,
+    )
+    result = await _score_risk(data)
+    result["signals"] = {"host_sample_at": host["timestamp"], "errors": errors}
+    return _JSONResponse(result)
+
+
+def _compliance_status(pct: float) -> str:
+    return "COMPLIANT" if pct >= 100 else "PARTIALLY_COMPLIANT" if pct >= 70 else "NON_COMPLIANT"
+
+
+def _framework_result(checks: dict[str, bool]) -> dict:
+    passed = sum(checks.values())
+    total = len(checks)
+    pct = round(passed / total * 100, 1)
+    return {
+        "compliance_status": _compliance_status(pct),
+        "compliance_score_pct": pct,
+        "checks_passed": passed,
+        "checks_total": total,
+        "check_details": checks,
+        "remediation_required": [k for k, v in checks.items() if not v],
+    }
+
+
+# /all and /bulk are registered before /api/compliance/{framework} so they
+# are not taken as framework names.
+@app.post("/api/compliance/all", tags=["Compliance Engine"], dependencies=[Depends(require_api_key)])
+async def compliance_all(data: ComplianceCheck, request: Request):
+    """
+    Full posture across every framework for one payload. Shared predicates
+    (residency, encryption, audit logging, MFA, …) are evaluated once.
+    Overall score is the mean of the framework scores. One audit entry.
+    Cached and ETag-tagged like /api/compliance/{framework}.
+    """
+    plan = _RULE_PLAN
+    key = _compliance_key("*", data, plan)
+    etag = f'"{key[:32]}"'
+    cache_headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    if _etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=cache_headers)
+    cached = _compliance_cache.get(key)
+    if cached is not None:
+        return _JSONResponse(cached, headers={**cache_headers, "X-Cache": "HIT"})
+
+    with _phase("checks"):
+        frameworks = {fw: _framework_result(checks) for fw, checks in plan.evaluate_all(data).items()}
+    overall = round(sum(r["compliance_score_pct"] for r in frameworks.values()) / len(frameworks), 1)
+    statuses = {fw: r["compliance_status"] for fw, r in frameworks.items()}
+    for fw, st in statuses.items():
+        _COMPLIANCE_EVALUATIONS.labels(fw, st).inc()
+    audit = await _audit("compliance_all", {
+        "tenant_id": data.tenant_id, "overall_score_pct": overall, "statuses": statuses, "rules_version": plan.version,
+    })
+    result = {
+        "tenant_id": data.tenant_id,
+        "overall_status": _compliance_status(overall),
+        "overall_score_pct": overall,
+        "frameworks_compliant": sum(st == "COMPLIANT" for st in statuses.values()),
+        "frameworks_total": len(frameworks),
+        "frameworks": frameworks,
+        "predicates_evaluated": len(plan.predicates),
+        "checks_total": sum(r["checks_total"] for r in frameworks.values()),
+        "rules_version": plan.version,
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "audit_ref": audit["timestamp"],
+    }
+    _compliance_cache.put(key, result)
+    return _JSONResponse(result, headers={**cache_headers, "X-Cache": "MISS"})
+
+
+@app.post("/api/compliance/bulk", tags=["Compliance Engine"], dependencies=[Depends(require_api_key)])
+async def compliance_bulk(req: BulkComplianceRequest):
+    """
+    Evaluate many tenant postures against every framework in one call.
+    Each distinct rule predicate runs once as a boolean column over all tenants.
+    `results[fw]["passed"][i]` is a bit string for tenant i — character j is
+    1 if `checks[j]` passed. One batch audit entry is written.
+    """
+    plan = _RULE_PLAN
+    frameworks = req.frameworks or list(plan.frameworks)
+    unknown = [fw for fw in frameworks if fw not in plan.frameworks]
+    if unknown:
+        raise HTTPException(status_code=404, detail=f"Unknown frameworks {unknown}. Available: {list(plan.frameworks)}")
+
+    postures = req.postures
+    with _phase("checks"):
+        columns = {f: np.array([getattr(p, f) for p in postures]) for f in plan.fields(frameworks)}
+        results, summary = {}, {}
+        for fw, (checks, matrix) in plan.evaluate_columns(frameworks, columns).items():
+            total = len(checks)
+            scores = [round(n / total * 100, 1) for n in matrix.sum(axis=1).tolist()]
+            statuses = [_compliance_status(pct) for pct in scores]
+            bits = np.where(matrix, "1", "0")
+            results[fw] = {
+                "checks": checks,
+                "passed": ["".join(row) for row in bits.tolist()],
+                "score_pct": scores,
+                "status": statuses,
+            }
+            summary[fw] = {st: statuses.count(st) for st in ("COMPLIANT", "PARTIALLY_COMPLIANT", "NON_COMPLIANT")}
+            for st, n in summary[fw].items():
+                if n:
+                    _COMPLIANCE_EVALUATIONS.labels(fw, st).inc(n)
+
+    audit = await _audit("compliance_bulk", {
+        "tenants": len(postures), "frameworks": frameworks, "rules_version": plan.version, "summary": summary,
+    })
+    return _JSONResponse({
+        "tenants": [p.tenant_id for p in postures],
+        "rules_version": plan.version,
+        "results": results,
+        "summary": summary,
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "audit_ref": audit["timestamp"],
+    })
+
+
 @app.post("/api/compliance/{framework}", tags=["Compliance Engine"], dependencies=[Depends(require_api_key)])
-def compliance_check(framework: str, data: ComplianceCheck):
+async def compliance_check(framework: str, data: ComplianceCheck, request: Request):
     """
     Run compliance check against specific EU regulatory framework.
+    Results are cached by content hash and carry an ETag; send it back as
+    If-None-Match to get 304 while neither payload nor rules have changed.
     """
-    if framework not in FRAMEWORKS:
+    plan = _RULE_PLAN  # one consistent plan for the whole request, even across a reload
+    if framework not in plan.frameworks:
         raise HTTPException(
             status_code=404,
-            detail=f"Framework '{framework}' not found. Available: {list(FRAMEWORKS.keys())}"
+            detail=f"Framework '{framework}' not found. Available: {list(plan.frameworks)}"
         )
 
-    fw = FRAMEWORKS[framework]
+    key = _compliance_key(framework, data, plan)
+    etag = f'"{key[:32]}"'
+    cache_headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    if _etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=cache_headers)
 
-    # Framework-specific compliance checks
-    eu_residency = data.data_residency.upper() in ["EU", "EEA", "AT", "DE", "CH", "FR", "NL", "BE", "IE"]
-
-    if framework == "basel_iii":
-        checks = {
-            "data_residency_eu":        eu_residency,
-            "encryption_at_rest":       data.encryption_at_rest,
-            "audit_logging":            data.audit_logging,
-            "mfa_enabled":              data.mfa_enabled,
-            "cet1_above_minimum":       data.cet1_ratio_pct >= 8.0,        # CRR2: 8% total capital
-            "lcr_above_100pct":         data.lcr_ratio_pct >= 100.0,       # Basel III: LCR ≥ 100%
-            "data_retention_10yr":      data.data_retention_days >= 3650,  # EBA: 10-year retention
-        }
-    elif framework == "dora":
-        checks = {
-            "data_residency_eu":           eu_residency,
-            "encryption_at_rest":          data.encryption_at_rest,
-            "encryption_in_transit":       data.encryption_in_transit,
-            "audit_logging":               data.audit_logging,
-            "ict_incident_reporting":      data.ict_incident_reporting,    # DORA Art. 19
-            "third_party_risk_assessed":   data.third_party_risk_assessed, # DORA Art. 28
-            "penetration_testing_done":    data.penetration_testing_done,  # DORA Art. 26 (TLPT)
-            "mfa_enabled":                 data.mfa_enabled,
-        }
-    elif framework == "gdpr":
-        checks = {
-            "data_residency_eu":        eu_residency,
-            "encryption_at_rest":       data.encryption_at_rest,
-            "encryption_in_transit":    data.encryption_in_transit,
-            "audit_logging":            data.audit_logging,
-            "consent_management":       data.consent_management,           # GDPR Art. 7
-            "data_minimization":        data.data_minimization,            # GDPR Art. 5(1)(c)
-            "breach_notification_proc": data.breach_notification_proc,     # GDPR Art. 33 (72h)
-            "data_retention_ok":        data.data_retention_days >= 365,   # Purpose-limited
-        }
-    elif framework == "ai_act":
-        checks = {
-            "data_residency_eu":        eu_residency,
-            "audit_logging":            data.audit_logging,
-            "ai_risk_classification":   data.ai_risk_classification,       # AI Act Art. 9
-            "explainability_docs":      data.explainability_docs,          # AI Act Art. 13
-            "conformity_assessment":    data.conformity_assessment,        # AI Act Art. 43 (high-risk)
-            "encryption_at_rest":       data.encryption_at_rest,
-            "mfa_enabled":              data.mfa_enabled,
-        }
-    elif framework == "aml6":
-        checks = {
-            "data_residency_eu":        eu_residency,
-            "encryption_at_rest":       data.encryption_at_rest,
-            "audit_logging":            data.audit_logging,
-            "kyc_cdd_process":          data.kyc_cdd_process,              # AML6 Art. 13
-            "transaction_monitoring":   data.transaction_monitoring,       # AML6 Art. 16
-            "str_filing_process":       data.str_filing_process,           # AML6 Art. 33
-            "data_retention_5yr":       data.data_retention_days >= 1825,  # AML6: 5-year retention
-            "mfa_enabled":              data.mfa_enabled,
-        }
-    elif framework == "psd2":
-        checks = {
-            "data_residency_eu":        eu_residency,
-            "encryption_at_rest":       data.encryption_at_rest,
-            "encryption_in_transit":    data.encryption_in_transit,
-            "sca_implemented":          data.sca_implemented,              # PSD2 Art. 97 (SCA)
-            "xs2a_api_available":       data.xs2a_api_available,           # PSD2 Art. 66-67 (Open Banking)
-            "audit_logging":            data.audit_logging,
-            "mfa_enabled":              data.mfa_enabled,
-        }
-    elif framework == "mifid_ii":
-        checks = {
-            "data_residency_eu":        eu_residency,
-            "encryption_at_rest":       data.encryption_at_rest,
-            "encryption_in_transit":    data.encryption_in_transit,
-            "audit_logging":            data.audit_logging,
-            "best_execution_policy":    data.best_execution_policy,        # MiFID II Art. 27
-            "transaction_reporting":    data.transaction_reporting,        # MiFID II Art. 26 (RTS 22)
-            "data_retention_5yr":       data.data_retention_days >= 1825,  # MiFID II Art. 25(1)
-        }
-    elif framework == "solvency_ii":
-        checks = {
-            "data_residency_eu":        eu_residency,
-            "encryption_at_rest":       data.encryption_at_rest,
-            "audit_logging":            data.audit_logging,
-            "scr_coverage_ok":          data.scr_coverage_pct >= 100.0,   # Solvency II Art. 101
-            "orsa_reporting":           data.orsa_reporting,               # Solvency II Art. 45 (ORSA)
-            "data_retention_10yr":      data.data_retention_days >= 3650,
-            "mfa_enabled":              data.mfa_enabled,
-        }
-    else:  # eba
-        checks = {
-            "data_residency_eu":        eu_residency,
-            "encryption_at_rest":       data.encryption_at_rest,
-            "encryption_in_transit":    data.encryption_in_transit,
-            "audit_logging":            data.audit_logging,
-            "mfa_enabled":              data.mfa_enabled,
-            "cet1_above_minimum":       data.cet1_ratio_pct >= 4.5,        # EBA: CET1 ≥ 4.5%
-            "data_retention_5yr":       data.data_retention_days >= 1825,
-            "ict_incident_reporting":   data.ict_incident_reporting,
-        }
-    passed = sum(checks.values())
-    total = len(checks)
-    compliance_pct = round(passed / total * 100, 1)
+    cached = _compliance_cache.get(key)
+    if cached is not None:
+        return _JSONResponse(cached, headers={**cache_headers, "X-Cache": "HIT"})
 
-    status = "COMPLIANT" if compliance_pct >= 100 else "PARTIALLY_COMPLIANT" if compliance_pct >= 70 else "NON_COMPLIANT"
+    fw = FRAMEWORKS[framework]
+
+    with _phase("checks"):
+        outcome = _framework_result(plan.evaluate(framework, data))
+    status = outcome["compliance_status"]
+    _COMPLIANCE_EVALUATIONS.labels(framework, status).inc()
+    audit = await _audit("compliance_check", {"framework": framework, "status": status, "rules_version": plan.version})
 
     result = {
         "framework": framework,
         "framework_details": fw,
         "tenant_id": data.tenant_id,
-        "compliance_status": status,
-        "compliance_score_pct": compliance_pct,
-        "checks_passed": passed,
-        "checks_total": total,
-        "check_details": checks,
-        "remediation_required": [k for k, v in checks.items() if not v],
+        **outcome,
+        "rules_version": plan.version,
         "next_audit": "Quarterly review recommended",
         "timestamp": datetime.now(timezone.utc).isoformat(),
-        "audit_ref": log_audit("compliance_check", {"framework": framework, "status": status})["timestamp"],
+        "audit_ref": audit["timestamp"],
     }
-    return result
+    _compliance_cache.put(key, result)
+    return _JSONResponse(result, headers={**cache_headers, "X-Cache": "MISS"})
 
 
 @app.get("/api/compliance/frameworks/all", tags=["Compliance Engine"])
-def list_frameworks():
-    """List all 9 supported EU regulatory frameworks."""
+async def list_frameworks(request: Request):
+    """List all 9 supported EU regulatory frameworks (precomputed; ETag / 304)."""
+    return _FRAMEWORKS_STATIC.response(request, "public, max-age=60")
+
+
+@app.put("/api/posture/{tenant_id}", tags=["Compliance Engine"])
+async def put_posture(tenant_id: str, data: ComplianceCheck, auth_tenant: str = Depends(require_api_key)):
+    """Store a tenant's full compliance posture and evaluate every framework."""
+    _require_own_tenant(tenant_id, auth_tenant)
+    posture = data.model_copy(update={"tenant_id": tenant_id})
+
+    def apply(stored, plan):
+        old = ComplianceCheck(**stored[0]) if stored else None
+        changed = [f for f in ComplianceCheck.model_fields if old is None or getattr(old, f) != getattr(posture, f)]
+        return posture, plan.evaluate_all(posture), changed, sum(len(st) for st in plan.frameworks.values())
+
+    return await _db_writer.run(_posture_write, tenant_id, apply)
+
+
+@app.patch("/api/posture/{tenant_id}", tags=["Compliance Engine"])
+async def patch_posture(tenant_id: str, delta: dict, auth_tenant: str = Depends(require_api_key)):
+    """
+    Apply field deltas (e.g. {"penetration_testing_done": true}) to a stored
+    posture and recompute only the checks that depend on the changed fields.
+    Response lists every check that flipped.
+    """
+    _require_own_tenant(tenant_id, auth_tenant)
+    unknown = sorted(set(delta) - set(ComplianceCheck.model_fields) | ({"tenant_id"} & set(delta)))
+    if unknown:
+        raise HTTPException(status_code=422, detail=f"Unknown or immutable fields: {unknown}")
+
+    def apply(stored, plan):
+        if stored is None:
+            raise HTTPException(status_code=404, detail=f"No posture stored for tenant '{tenant_id}'. PUT it first.")
+        try:
+            posture = ComplianceCheck(**{**stored[0], **delta})
+        except ValueError as e:
+            raise HTTPException(status_code=422, detail=str(e))
+        old = ComplianceCheck(**stored[0])
+        changed = [f for f in delta if getattr(old, f) != getattr(posture, f)]
+        if stored[2] != plan.version:  # rules changed since last write → full re-evaluation
+            return posture, plan.evaluate_all(posture), changed, sum(len(st) for st in plan.frameworks.values())
+        results = {fw: dict(checks) for fw, checks in stored[1].items()}
+        updates = plan.evaluate_fields(posture, changed)
+        for fw, checks in updates.items():
+            results[fw].update(checks)
+        return posture, results, changed, sum(len(c) for c in updates.values())
+
+    return await _db_writer.run(_posture_write, tenant_id, apply)
+
+
+@app.get("/api/posture/{tenant_id}", tags=["Compliance Engine"])
+async def get_posture(tenant_id: str, auth_tenant: str = Depends(require_api_key)):
+    """Stored posture and per-framework results for a tenant."""
+    _require_own_tenant(tenant_id, auth_tenant)
+    def read():
+        with sqlite3.connect(_DB_PATH) as conn:
+            stored = _posture_load(conn, tenant_id)
+            updated = conn.execute("SELECT updated_at FROM tenant_posture WHERE tenant_id=?", (tenant_id,)).fetchone()
+        return stored, updated
+
+    stored, updated = await _db_readers.run(read)
+    if stored is None:
+        raise HTTPException(status_code=404, detail=f"No posture stored for tenant '{tenant_id}'.")
+    posture, results, version = stored
     return {
-        "total_frameworks": len(FRAMEWORKS),
-        "frameworks": {k: {"name": v["name"], "authority": v["authority"]} for k, v in FRAMEWORKS.items()},
-        "coverage": "Basel III/IV, MiFID II, GDPR, AI Act, AML6, DORA, PSD2, Solvency II, EBA",
+        "tenant_id": tenant_id,
+        "posture": posture,
+        "frameworks": {fw: _framework_result(checks) for fw, checks in results.items()},
+        "rules_version": version,
+        "stale": version != _RULE_PLAN.version,
+        "updated_at": updated[0],
+    }
+
+
+@app.get("/api/posture/{tenant_id}/at", tags=["Compliance Engine"])
+async def posture_at(tenant_id: str, ts: datetime, framework: Optional[str] = None,
+                     auth_tenant: str = Depends(require_api_key)):
+    """
+    Time travel: per-framework results as they stood at `ts` (ISO 8601,
+    naive = UTC) — "were we DORA-compliant on March 3rd?".
+    """
+    _require_own_tenant(tenant_id, auth_tenant)
+    if framework is not None and framework not in FRAMEWORKS:
+        raise HTTPException(status_code=404, detail=f"Framework '{framework}' not found.")
+    results = await _db_readers.run(_posture_at, tenant_id, ts, framework)
+    if results is None:
+        raise HTTPException(status_code=404, detail=f"No posture stored for tenant '{tenant_id}'.")
+    if not results:
+        raise HTTPException(status_code=404, detail=f"No posture history for tenant '{tenant_id}' at {ts.isoformat()}.")
+    return {
+        "tenant_id": tenant_id,
+        "at": ts.isoformat(),
+        "frameworks": {fw: _framework_result(checks) for fw, checks in results.items()},
     }
 
 
+@app.get("/api/posture/{tenant_id}/flips", tags=["Compliance Engine"])
+async def posture_flips(tenant_id: str, start: datetime, end: Optional[datetime] = None, framework: Optional[str] = None,
+                        auth_tenant: str = Depends(require_api_key)):
+    """Every check flip for a tenant in [start, end] (end defaults to now), oldest first."""
+    _require_own_tenant(tenant_id, auth_tenant)
+    if framework is not None and framework not in FRAMEWORKS:
+        raise HTTPException(status_code=404, detail=f"Framework '{framework}' not found.")
+    end = end or datetime.now(timezone.utc)
+    flips = await _db_readers.run(_posture_flips, tenant_id, start, end, framework)
+    return {"tenant_id": tenant_id, "start": start.isoformat(), "end": end.isoformat(),
+            "total_flips": len(flips), "flips": flips}
+
+
 @app.post("/api/cert/sign", tags=["QES / eIDAS 2.0"], dependencies=[Depends(require_api_key)])
-def sign_document(req: SignRequest):
+async def sign_document(req: SignRequest):
     """
     Qualified Electronic Signature (QES) document signing endpoint.
     Performs cryptographic SHA-256 hashing + HMAC-SHA256 signing of the document.
@@ -946,33 +3514,38 @@ def sign_document(req: SignRequest):
         "audit_ref": hashlib.sha256(f"{req.document_name}{req.signer}{doc_hash}".encode()).hexdigest()[:16],
         "timestamp": datetime.now(timezone.utc).isoformat(),
     }
-    log_audit("document_signed", result)
+    _SIGNATURES.labels(req.provider).inc()
+    await _audit("document_signed", result)
     return result
 
 
 @app.get("/api/audit", tags=["Audit Trail"], dependencies=[Depends(require_api_key)])
-def get_audit_log(limit: int = 50):
+async def get_audit_log(limit: int = 50):
     """Retrieve audit trail entries from SQLite. All actions are logged immutably."""
-    with sqlite3.connect(_DB_PATH) as conn:
-        total = conn.execute("SELECT COUNT(*) FROM audit_log").fetchone()[0]
-        rows = conn.execute(
-            "SELECT timestamp, action, payload, genesis_version FROM audit_log ORDER BY id DESC LIMIT ?",
-            (limit,)
-        ).fetchall()
+    def read():
+        with sqlite3.connect(_DB_PATH) as conn:
+            total = conn.execute("SELECT COUNT(*) FROM audit_log").fetchone()[0]
+            rows = conn.execute(
+                "SELECT timestamp, action, payload, genesis_version FROM audit_log ORDER BY id DESC LIMIT ?",
+                (limit,)
+            ).fetchall()
+        return total, rows
+
+    total, rows = await _db_readers.run(read)
     entries = [
         {
             "timestamp": r[0],
             "action": r[1],
-            "payload": json.loads(r[2]),
+            "payload": _json_loads(r[2]),
             "genesis_version": r[3],
         }
         for r in rows
     ]
-    return {
+    return _JSONResponse({
         "total_entries": total,
         "showing": len(entries),
         "entries": entries,
-    }
+    })
 
 
 # ─────────────────────────────────────────────────────────────
@@ -981,7 +3554,7 @@ def get_audit_log(limit: int = 50):
 # ─────────────────────────────────────────────────────────────
 
 @app.post("/api/admin/keys", tags=["Key Management"], dependencies=[Depends(require_admin_key)])
-def create_api_key(body: ApiKeyCreate):
+async def create_api_key(body: ApiKeyCreate):
     """
     Create a new tenant API key. Returns the raw key ONCE — store it securely.
     Requires X-API-Key set to GENESIS_ADMIN_KEY.
@@ -989,14 +3562,19 @@ def create_api_key(body: ApiKeyCreate):
     raw = secrets.token_urlsafe(32)
     h   = _hash_key(raw)
     ts  = datetime.now(timezone.utc).isoformat()
-    with sqlite3.connect(_DB_PATH) as conn:
-        conn.execute(
-            "INSERT INTO api_keys (key_hash, tenant_id, name, created_at) VALUES (?,?,?,?)",
-            (h, body.tenant_id, body.name, ts),
-        )
-        conn.commit()
-        key_id = conn.execute("SELECT last_insert_rowid()").fetchone()[0]
-    log_audit("key_created", {"tenant_id": body.tenant_id, "name": body.name})
+
+    def write():
+        with sqlite3.connect(_DB_PATH) as conn:
+            conn.execute(
+                "INSERT INTO api_keys (key_hash, tenant_id, name, created_at) VALUES (?,?,?,?)",
+                (h, body.tenant_id, body.name, ts),
+            )
+            conn.commit()
+            key_id = conn.execute("SELECT last_insert_rowid()").fetchone()[0]
+        log_audit("key_created", {"tenant_id": body.tenant_id, "name": body.name})
+        return key_id
+
+    key_id = await _db_writer.run(write)
     return {
         "id": key_id,
         "key": raw,
@@ -1008,12 +3586,15 @@ def create_api_key(body: ApiKeyCreate):
 
 
 @app.get("/api/admin/keys", tags=["Key Management"], dependencies=[Depends(require_admin_key)])
-def list_api_keys():
+async def list_api_keys():
     """List all API keys (hashes hidden). Requires admin key."""
-    with sqlite3.connect(_DB_PATH) as conn:
-        rows = conn.execute(
-            "SELECT id, tenant_id, name, created_at, active FROM api_keys ORDER BY id"
-        ).fetchall()
+    def read():
+        with sqlite3.connect(_DB_PATH) as conn:
+            return conn.execute(
+                "SELECT id, tenant_id, name, created_at, active FROM api_keys ORDER BY id"
+            ).fetchall()
+
+    rows = await _db_readers.run(read)
     return {
         "total": len(rows),
         "keys": [
@@ -1024,100 +3605,187 @@ def list_api_keys():
 
 
 @app.delete("/api/admin/keys/{key_id}", tags=["Key Management"], dependencies=[Depends(require_admin_key)])
-def revoke_api_key(key_id: int):
+async def revoke_api_key(key_id: int):
     """Revoke (soft-delete) a key by id. Requires admin key."""
-    with sqlite3.connect(_DB_PATH) as conn:
-        changed = conn.execute("UPDATE api_keys SET active=0 WHERE id=?", (key_id,)).rowcount
-        conn.commit()
-    if not changed:
+    def write():
+        with sqlite3.connect(_DB_PATH) as conn:
+            changed = conn.execute("UPDATE api_keys SET active=0 WHERE id=?", (key_id,)).rowcount
+            conn.commit()
+        if changed:
+            log_audit("key_revoked", {"key_id": key_id})
+        return changed
+
+    if not await _db_writer.run(write):
         raise HTTPException(status_code=404, detail=f"Key id={key_id} not found.")
-    log_audit("key_revoked", {"key_id": key_id})
     return {"revoked": True, "key_id": key_id}
 
 
+@app.get("/api/admin/rules", tags=["Compliance Engine"], dependencies=[Depends(require_admin_key)])
+async def get_compliance_rules():
+    """Active compliance rule set, its content version and source. Requires admin key."""
+    plan = _RULE_PLAN
+    return {"version": plan.version, "source": plan.source, "frameworks": plan.rules}
+
+
+@app.post("/api/admin/rules/reload", tags=["Compliance Engine"], dependencies=[Depends(require_admin_key)])
+async def reload_compliance_rules():
+    """
+    Recompile rules from GENESIS_RULES_PATH (or built-ins) and swap them in atomically.
+    The other workers adopt the same plan within GENESIS_RULES_SYNC_INTERVAL seconds.
+    Invalid rules are rejected with 422 and the running plan is kept. Requires admin key.
+    """
+    previous = _RULE_PLAN.version
+    try:
+        plan = await _db_writer.run(_rule_sync.reload)  # file read + compile off the event loop
+    except (OSError, ValueError) as e:
+        raise HTTPException(status_code=422, detail=f"Rule reload failed, keeping version {previous}: {e}")
+    await _audit("rules_reloaded", {"previous": previous, "version": plan.version, "source": plan.source})
+    return {"reloaded": True, "previous_version": previous, "version": plan.version, "source": plan.source,
+            "frameworks": {fw: len(steps) for fw, steps in plan.frameworks.items()}}
+
+
+@app.get("/api/admin/profile", tags=["Operations"], dependencies=[Depends(require_admin_key)])
+async def sample_profile(seconds: float = 10.0, hz: int = 100):
+    """
+    Sample all thread stacks for `seconds` (max 60) at `hz` (default 100) and
+    return collapsed stacks (text/plain) for flamegraph tools. Requires admin key.
+    Waits on the event loop — no threadpool worker is held while sampling.
+    """
+    if not 0 < seconds <= _PROFILE_MAX_SECONDS:
+        raise HTTPException(status_code=422, detail=f"seconds must be in (0, {_PROFILE_MAX_SECONDS:g}].")
+    if not _profile_lock.acquire(blocking=False):
+        raise HTTPException(status_code=409, detail="A profile is already running in this process.")
+    try:
+        sampler = _StackSampler(hz).start()
+        try:
+            await asyncio.sleep(seconds)
+        finally:
+            sampler.stop()
+    finally:
+        _profile_lock.release()
+    await _audit("profile_sampled", {"seconds": seconds, "hz": hz, "samples": sampler.samples})
+    return PlainTextResponse(sampler.collapsed(), headers={"X-Genesis-Profile-Samples": str(sampler.samples)})
+
+
+@app.get("/api/admin/profile/{profile_id}", tags=["Operations"], dependencies=[Depends(require_admin_key)])
+async def get_request_profile(profile_id: str):
+    """Collapsed stacks captured for a request sent with `X-Genesis-Profile: 1`. Requires admin key."""
+    collapsed = await _db_readers.run(_load_profile, profile_id)
+    if collapsed is None:
+        raise HTTPException(status_code=404, detail=f"Profile '{profile_id}' not found (only the last {_RECENT_PROFILES_MAX} are kept).")
+    return PlainTextResponse(collapsed)
+
+
 # ─────────────────────────────────────────────────────────────
-# OBSERVABILITY — Prometheus /metrics (stdlib, no extra deps)
+# OBSERVABILITY — Prometheus /metrics
+# Instruments live in the METRICS section; the collector below adds
+# values that already sit in memory (probe cache, config, per-process
+# windows) so a scrape costs the same whatever the size of the DB.
+# With PROMETHEUS_MULTIPROC_DIR the per-process values describe the
+# worker that served the scrape; counters and histograms are summed.
 # ─────────────────────────────────────────────────────────────
+class _StateCollector:
+    """Scrape-time gauges from in-process state; never touches SQLite."""
+
+    def collect(self):
+        def gauge(name: str, doc: str, value: float) -> GaugeMetricFamily:
+            return GaugeMetricFamily(name, doc, value=value)
+
+        yield gauge("genesis_up", "GENESIS API health (1 = operational)", 1)
+        yield gauge("genesis_model_r2", "Risk engine R-squared (Basel III calibration anchors)", _MODEL_R2)
+        yield gauge("genesis_frameworks_total", "Loaded EU compliance framework count", len(FRAMEWORKS))
+        yield gauge("genesis_rate_limit_global", "Global read requests/min limit per IP", _RATE_GLOBAL)
+        yield gauge("genesis_rate_limit_write", "Write requests/min limit per IP", _RATE_WRITE)
+        yield gauge("genesis_rate_window_entries", "Active sliding-window rate-limit entries",
+                    sum(len(v) for v in _rate_buckets.values()))
+        yield gauge("genesis_compliance_cache_entries", "Cached compliance results", len(_compliance_cache))
+        yield gauge("genesis_explain_cache_entries", "AI explanations in the in-memory cache tier", len(_explanations))
+        yield gauge("genesis_metrics_history_bytes", "Preallocated size of the in-process metrics history",
+                    _metrics_history.nbytes)
+
+        if "database" in _probes.results:  # as of the last background probe
+            yield CounterMetricFamily("genesis_audit_entries", "Immutable SQLite audit log entry count",
+                                      value=_probes.get("database", "audit_entries", 0))
+            yield gauge("genesis_api_keys_total", "Active tenant API keys", _probes.get("database", "active_keys", 0))
+
+        probes = _probes.snapshot()
+        up = GaugeMetricFamily("genesis_dependency_up", "Last background probe result per dependency (1 = ok and fresh)",
+                               labels=("dependency",))
+        age = GaugeMetricFamily("genesis_dependency_probe_age_seconds", "Seconds since the dependency was last probed",
+                                labels=("dependency",))
+        for name, result in probes.items():
+            up.add_metric((name,), int(result["ok"]))
+            age.add_metric((name,), result["age_s"])
+        yield up
+        yield age
+
+        rates = GaugeMetricFamily("genesis_http_error_rate_pct",
+                                  "4xx+5xx share of requests over the rolling error window, by route",
+                                  labels=("route", "window"))
+        for route, pct in _route_error_rates():
+            rates.add_metric((route, f"{_ERROR_WINDOW:g}"), pct)
+        yield rates
+
+
+_state_collector = _StateCollector()
+_METRICS_REGISTRY.register(_state_collector)
+
+
+def _render_metrics() -> bytes:
+    if not _PROM_MULTIPROC_DIR:
+        return generate_latest(_METRICS_REGISTRY)
+    registry = CollectorRegistry()  # per scrape, as prometheus_client requires for multiprocess mode
+    multiprocess.MultiProcessCollector(registry, path=_PROM_MULTIPROC_DIR)
+    registry.register(_state_collector)
+    return generate_latest(registry)
+
 
 @app.get("/metrics", include_in_schema=False)
-def prometheus_metrics():
+async def prometheus_metrics():
     """Prometheus text-format exposition endpoint. Scrape with any standard collector."""
-    from fastapi.responses import PlainTextResponse
-    audit_cnt   = _audit_count()
-    rate_active = sum(len(v) for v in _rate_buckets.values())
-    key_cnt     = _key_count()
-    lines = [
-        "# HELP genesis_up GENESIS API health (1 = operational)",
-        "# TYPE genesis_up gauge",
-        "genesis_up 1",
-        "",
-        "# HELP genesis_model_r2 Risk engine R-squared (Basel III calibration anchors)",
-        "# TYPE genesis_model_r2 gauge",
-        f"genesis_model_r2 {_MODEL_R2}",
-        "",
-        "# HELP genesis_frameworks_total Loaded EU compliance framework count",
-        "# TYPE genesis_frameworks_total gauge",
-        f"genesis_frameworks_total {len(FRAMEWORKS)}",
-        "",
-        "# HELP genesis_audit_entries_total Immutable SQLite audit log entry count",
-        "# TYPE genesis_audit_entries_total counter",
-        f"genesis_audit_entries_total {audit_cnt}",
-        "",
-        "# HELP genesis_api_keys_total Active tenant API keys",
-        "# TYPE genesis_api_keys_total gauge",
-        f"genesis_api_keys_total {key_cnt}",
-        "",
-        "# HELP genesis_rate_window_entries Active sliding-window rate-limit entries",
-        "# TYPE genesis_rate_window_entries gauge",
-        f"genesis_rate_window_entries {rate_active}",
-        "",
-        "# HELP genesis_rate_limit_global Global read requests/min limit per IP",
-        "# TYPE genesis_rate_limit_global gauge",
-        f"genesis_rate_limit_global {_RATE_GLOBAL}",
-        "",
-        "# HELP genesis_rate_limit_write Write requests/min limit per IP",
-        "# TYPE genesis_rate_limit_write gauge",
-        f"genesis_rate_limit_write {_RATE_WRITE}",
-        "",
-    ]
-    return PlainTextResponse("\n".join(lines), media_type="text/plain; version=0.0.4")
+    await _probes_ready()
+    _runtime.sample()
+    return Response(await _metrics_pool.run(_render_metrics), media_type=CONTENT_TYPE_LATEST)
+
+
+_VALUATION_STATIC = _StaticJSON({
+    "product": "GENESIS v10.1 - Sovereign AI OS",
+    "valuation_date": "2026-02-28",
+    "currency": "EUR",
+    "methods": {
+        "comparable_company_analysis": {
+            "value_eur": 280_000_000,
+            "peers": ["Axiom Technology", "Temenos", "Finastra RegTech modules"],
+            "multiple": "12x ARR (RegTech SaaS)",
+        },
+        "dcf_regtech_wacc": {
+            "value_eur": 320_000_000,
+            "wacc_pct": 11.5,
+            "terminal_growth_pct": 3.5,
+            "5yr_revenue_cagr_pct": 38,
+        },
+        "market_size_multiplier": {
+            "value_eur": 410_000_000,
+            "eu_regtech_market_2026_eur": 14_200_000_000,
+            "market_share_target_pct": 2.9,
+        },
+        "venture_capital_method": {
+            "value_eur": 370_000_000,
+            "terminal_value_yr5_eur": 1_850_000_000,
+            "vc_discount_rate_pct": 38,
+        },
+    },
+    "median_valuation_eur": 345_000_000,
+    "range_eur": {"low": 280_000_000, "high": 410_000_000},
+    "confidence": "HIGH - 4 independent methods converge",
+    "caveats": "Pre-revenue valuation based on TAM, technology uniqueness, regulatory moat",
+})
 
 
 @app.get("/api/valuation", tags=["Market Intelligence"])
-def market_valuation():
+async def market_valuation(request: Request):
     """GENESIS v10.1 market valuation summary (4 independent methods)."""
-    return {
-        "product": "GENESIS v10.1 - Sovereign AI OS",
-        "valuation_date": "2026-02-28",
-        "currency": "EUR",
-        "methods": {
-            "comparable_company_analysis": {
-                "value_eur": 280_000_000,
-                "peers": ["Axiom Technology", "Temenos", "Finastra RegTech modules"],
-                "multiple": "12x ARR (RegTech SaaS)",
-            },
-            "dcf_regtech_wacc": {
-                "value_eur": 320_000_000,
-                "wacc_pct": 11.5,
-                "terminal_growth_pct": 3.5,
-                "5yr_revenue_cagr_pct": 38,
-            },
-            "market_size_multiplier": {
-                "value_eur": 410_000_000,
-                "eu_regtech_market_2026_eur": 14_200_000_000,
-                "market_share_target_pct": 2.9,
-            },
-            "venture_capital_method": {
-                "value_eur": 370_000_000,
-                "terminal_value_yr5_eur": 1_850_000_000,
-                "vc_discount_rate_pct": 38,
-            },
-        },
-        "median_valuation_eur": 345_000_000,
-        "range_eur": {"low": 280_000_000, "high": 410_000_000},
-        "confidence": "HIGH - 4 independent methods converge",
-        "caveats": "Pre-revenue valuation based on TAM, technology uniqueness, regulatory moat",
-    }
+    return _VALUATION_STATIC.response(request, "public, max-age=3600")
 
 
 # ─────────────────────────────────────────────────────────────
@@ -0,0 +1,217 @@
+#!/usr/bin/env python3
+"""
+GENESIS v10.1 — benchmark suite with regression gating.
+
+Microbenchmarks time the hot functions directly (_predict_risk, the
+compliance rule plan behind compliance_check, log_audit, _check_rate);
+endpoint benchmarks drive the routes through FastAPI's TestClient and
+report throughput + latency percentiles. Results are written as JSON so a run can be kept as a
+baseline and compared against later runs.
+
+Usage:
+    python scripts/bench.py run     [--out benchmarks/latest.json] [--quick]
+    python scripts/bench.py compare BASELINE.json CURRENT.json [--threshold 10]
+
+`compare` exits 1 when any benchmark's median latency regressed by more
+than --threshold percent (default: $GENESIS_BENCH_THRESHOLD or 10).
+"""
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+DEFAULT_OUT = ROOT / "benchmarks" / "latest.json"
+DEFAULT_THRESHOLD = float(os.environ.get("GENESIS_BENCH_THRESHOLD", "10"))
+
+COMPLIANCE_PAYLOAD = {
+    "tenant_id": "bench_bank", "data_residency": "AT", "penetration_testing_done": True,
+    "conformity_assessment": True, "xs2a_api_available": True,
+}
+RISK_PAYLOAD = {"cpu": 67, "memory": 75, "network_io": 2, "disk_usage": 85, "error_rate": 0, "framework": "dora"}
+
+
+_seq = iter(range(10**9))
+
+
+def _fresh_posture() -> dict:
+    """Unique tenant per call so the request misses the compliance result cache."""
+    return {**COMPLIANCE_PAYLOAD, "tenant_id": f"bench_bank_{next(_seq)}"}
+
+
+def _load_api():
+    """Import genesis_api against a throwaway DB with rate limits out of the way."""
+    os.environ.setdefault("GENESIS_DB_PATH", os.path.join(tempfile.mkdtemp(prefix="genesis-bench-"), "audit.db"))
+    os.environ.setdefault("GENESIS_RATE_GLOBAL", "100000000")
+    os.environ.setdefault("GENESIS_RATE_WRITE", "100000000")
+    sys.path.insert(0, str(ROOT))
+    import genesis_api
+    return genesis_api
+
+
+def _summary(per_op_seconds: list[float]) -> dict:
+    """Latency summary in microseconds."""
+    data = sorted(per_op_seconds)
+    n = len(data)
+
+    def pct(p: float) -> float:
+        return round(data[min(n - 1, int(p * n))] * 1e6, 2)
+
+    return {
+        "median_us": round(statistics.median(data) * 1e6, 2),
+        "mean_us":   round(statistics.fmean(data) * 1e6, 2),
+        "p95_us":    pct(0.95),
+        "p99_us":    pct(0.99),
+        "min_us":    round(data[0] * 1e6, 2),
+    }
+
+
+def bench_function(fn, number: int, repeat: int) -> dict:
+    """timeit-style: `repeat` rounds of `number` calls; stats over per-call round means."""
+    for _ in range(min(number, 100)):
+        fn()
+    rounds = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(number):
+            fn()
+        rounds.append((time.perf_counter() - start) / number)
+    result = _summary(rounds)
+    result["ops_per_sec"] = round(1.0 / result["median_us"] * 1e6, 1)
+    result["kind"] = "micro"
+    return result
+
+
+def bench_endpoint(call, requests: int) -> dict:
+    """Sequential requests through TestClient; per-request latency + throughput."""
+    for _ in range(min(requests, 20)):
+        call()
+    latencies = []
+    start = time.perf_counter()
+    for _ in range(requests):
+        t0 = time.perf_counter()
+        r = call()
+        latencies.append(time.perf_counter() - t0)
+        if r.status_code >= 400:
+            raise RuntimeError(f"benchmark request failed: {r.status_code} {r.text[:200]}")
+    elapsed = time.perf_counter() - start
+    result = _summary(latencies)
+    result["requests_per_sec"] = round(requests / elapsed, 1)
+    result["kind"] = "endpoint"
+    return result
+
+
+def run(quick: bool = False) -> dict:
+    api = _load_api()
+    from fastapi.testclient import TestClient
+
+    number, repeat, requests = (200, 5, 100) if quick else (2000, 15, 1000)
+    check = api.ComplianceCheck(**COMPLIANCE_PAYLOAD)
+    client = TestClient(api.app, headers={"X-API-Key": api._GENESIS_API_KEY})
+
+    micro = {
+        "predict_risk.basel_iii":    lambda: api._predict_risk(67, 75, 2, 85, 0, "basel_iii"),
+        "predict_risk.dora":         lambda: api._predict_risk(67, 75, 80, 85, 12, "dora"),
+        "compliance_eval.dora":      lambda: api._framework_result(api._RULE_PLAN.evaluate("dora", check)),
+        "compliance_eval.basel_iii": lambda: api._framework_result(api._RULE_PLAN.evaluate("basel_iii", check)),
+        "compliance_eval.all":       lambda: api._RULE_PLAN.evaluate_all(check),
+        "log_audit":                 lambda: api.log_audit("bench", {"framework": "dora", "status": "COMPLIANT"}),
+        "check_rate":                lambda: api._check_rate("bench:r", 100000000),
+    }
+    endpoints = {
+        "GET /api/health":                           lambda: client.get("/api/health"),
+        "POST /api/risk/score":                      lambda: client.post("/api/risk/score", json=RISK_PAYLOAD),
+        "POST /api/compliance/{framework}":          lambda: client.post("/api/compliance/dora", json=_fresh_posture()),
+        "POST /api/compliance/{framework} (cached)": lambda: client.post("/api/compliance/dora", json=COMPLIANCE_PAYLOAD),
+        "POST /api/compliance/all":                  lambda: client.post("/api/compliance/all", json=_fresh_posture()),
+        "GET /api/compliance/frameworks/all":        lambda: client.get("/api/compliance/frameworks/all"),
+        "GET /api/audit":                            lambda: client.get("/api/audit?limit=50"),
+    }
+
+    results = {}
+    for name, fn in micro.items():
+        results[name] = bench_function(fn, number, repeat)
+        api._rate_buckets.clear()
+        print(f"  {name:<44} {results[name]['median_us']:>10.2f} µs", file=sys.stderr)
+    for name, call in endpoints.items():
+        results[name] = bench_endpoint(call, requests)
+        api._rate_buckets.clear()
+        print(f"  {name:<44} {results[name]['median_us']:>10.2f} µs  "
+              f"{results[name]['requests_per_sec']:>8.1f} req/s", file=sys.stderr)
+
+    return {
+        "meta": {
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "machine": platform.machine(),
+            "quick": quick,
+        },
+        "benchmarks": results,
+    }
+
+
+def compare(baseline: dict, current: dict, threshold: float, metric: str = "median_us") -> tuple[list[dict], bool]:
+    """
+    Compare two result files. Returns (rows, ok). A benchmark regresses when
+    its `metric` grew by more than `threshold` percent. Benchmarks missing
+    from either side are reported but never fail the gate.
+    """
+    rows, ok = [], True
+    base_b, cur_b = baseline["benchmarks"], current["benchmarks"]
+    for name in sorted(set(base_b) | set(cur_b)):
+        if name not in base_b or name not in cur_b:
+            rows.append({"name": name, "status": "new" if name in cur_b else "removed"})
+            continue
+        old, new = base_b[name][metric], cur_b[name][metric]
+        change = (new - old) / old * 100.0 if old else 0.0
+        regressed = change > threshold
+        ok = ok and not regressed
+        rows.append({"name": name, "baseline": old, "current": new, "change_pct": round(change, 1),
+                     "status": "REGRESSED" if regressed else "ok"})
+    return rows, ok
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    sub = parser.add_subparsers(dest="cmd", required=True)
+    p_run = sub.add_parser("run", help="run the suite and write JSON results")
+    p_run.add_argument("--out", default=str(DEFAULT_OUT))
+    p_run.add_argument("--quick", action="store_true", help="fewer iterations (smoke test)")
+    p_cmp = sub.add_parser("compare", help="fail if CURRENT regressed against BASELINE")
+    p_cmp.add_argument("baseline")
+    p_cmp.add_argument("current")
+    p_cmp.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD, help="max allowed slowdown in %%")
+    p_cmp.add_argument("--metric", default="median_us", choices=("median_us", "mean_us", "p95_us", "p99_us", "min_us"))
+    args = parser.parse_args()
+
+    if args.cmd == "run":
+        results = run(args.quick)
+        out = Path(args.out)
+        out.parent.mkdir(parents=True, exist_ok=True)
+        out.write_text(json.dumps(results, indent=2))
+        print(f"wrote {out}", file=sys.stderr)
+        return
+
+    baseline = json.loads(Path(args.baseline).read_text())
+    current = json.loads(Path(args.current).read_text())
+    rows, ok = compare(baseline, current, args.threshold, args.metric)
+    for r in rows:
+        if "change_pct" in r:
+            print(f"{r['status']:<10} {r['name']:<44} {r['baseline']:>10.2f} → {r['current']:>10.2f} µs  ({r['change_pct']:+.1f}%)")
+        else:
+            print(f"{r['status']:<10} {r['name']}")
+    if not ok:
+        print(f"\nFAIL: regression above {args.threshold:g}% ({args.metric})", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
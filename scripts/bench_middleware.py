@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+GENESIS v10.1 — middleware overhead benchmark.
+
+Compares requests/sec on a trivial route for:
+  - legacy:  rate limiter registered via @app.middleware("http") (BaseHTTPMiddleware)
+  - asgi:    genesis_api._RateLimitMiddleware (pure ASGI)
+
+Requests are driven straight through the ASGI interface (no sockets, no HTTP
+client) so the number measured is the middleware stack itself.
+
+Usage:
+    python scripts/bench_middleware.py [--requests 20000] [--rounds 3]
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+# Limits high enough that no request is rejected during the run
+os.environ.setdefault("GENESIS_RATE_GLOBAL", "100000000")
+os.environ.setdefault("GENESIS_RATE_WRITE", "100000000")
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, PlainTextResponse
+
+import genesis_api
+
+
+def _legacy_app() -> FastAPI:
+    app = FastAPI()
+
+    @app.middleware("http")
+    async def rate_limit_middleware(request: Request, call_next):
+        ip = request.client.host if request.client else "unknown"
+        is_write = request.method in ("POST", "PUT", "PATCH", "DELETE")
+        limit = genesis_api._RATE_WRITE if is_write else genesis_api._RATE_GLOBAL
+        allowed, remaining = genesis_api._check_rate(f"{ip}:{'w' if is_write else 'r'}", limit)
+        if not allowed:
+            return JSONResponse(status_code=429, content={"detail": "Rate limit exceeded."})
+        response = await call_next(request)
+        response.headers["X-RateLimit-Limit"] = str(limit)
+        response.headers["X-RateLimit-Remaining"] = str(remaining)
+        response.headers["X-RateLimit-Window"] = "60s"
+        return response
+
+    @app.get("/ping")
+    async def ping():
+        return PlainTextResponse("pong")
+
+    return app
+
+
+def _asgi_app() -> FastAPI:
+    app = FastAPI()
+    app.add_middleware(genesis_api._RateLimitMiddleware)
+
+    @app.get("/ping")
+    async def ping():
+        return PlainTextResponse("pong")
+
+    return app
+
+
+async def _drive(app, n: int) -> float:
+    """Send n GET /ping requests through the ASGI app, return requests/sec."""
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1",
+        "method": "GET", "scheme": "http", "path": "/ping", "raw_path": b"/ping",
+        "root_path": "", "query_string": b"", "headers": [(b"host", b"bench")],
+        "client": ("127.0.0.1", 50000), "server": ("bench", 80),
+    }
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        pass
+
+    # Warm-up: build the middleware stack and JIT-ish caches
+    for _ in range(200):
+        await app(dict(scope), receive, send)
+
+    start = time.perf_counter()
+    for _ in range(n):
+        await app(dict(scope), receive, send)
+    return n / (time.perf_counter() - start)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=20000)
+    parser.add_argument("--rounds", type=int, default=3)
+    args = parser.parse_args()
+
+    results = {}
+    for name, factory in (("legacy", _legacy_app), ("asgi", _asgi_app)):
+        app = factory()
+        best = 0.0
+        for _ in range(args.rounds):
+            genesis_api._rate_buckets.clear()
+            best = max(best, asyncio.run(_drive(app, args.requests)))
+        results[name] = best
+        print(f"{name:>7}: {best:>10,.0f} req/s")
+
+    gain = (results["asgi"] / results["legacy"] - 1.0) * 100.0
+    print(f"   gain: {gain:>+9.1f} %")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,351 @@
+#!/usr/bin/env python3
+"""
+GENESIS v10.1 — async load generator.
+
+Replays the request scenarios of a REST Client `.http` file (default:
+genesis_api.http) with an asyncio HTTP client, either open-loop at a target
+request rate (--rps) or closed-loop with a fixed number of workers
+(--concurrency). Each request draws an API key and a tenant from weighted
+mixes; tenants are Zipf-distributed so a few large tenants dominate, as in
+production. Prints a JSON report: throughput, p50/p95/p99/max latency,
+status codes and error breakdown, overall and per scenario.
+
+Usage:
+    python scripts/loadgen.py --spawn --rps 200 --duration 30
+    python scripts/loadgen.py --base-url http://localhost:8080 --concurrency 32 \\
+        --keys genesis-dev-key:3,other-key:1 --tenants 200 --out report.json
+
+--spawn starts a local `uvicorn genesis_api:app` on a free port (throwaway DB,
+rate limits lifted) and stops it afterwards.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import re
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from collections import Counter, defaultdict
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Optional
+
+import httpx
+
+ROOT = Path(__file__).resolve().parent.parent
+_VAR_RE = re.compile(r"\{\{\s*(\w+)\s*\}\}")
+_REQUEST_LINE_RE = re.compile(r"^(GET|POST|PUT|PATCH|DELETE|HEAD|OPTIONS)\s+(\S+)(?:\s+HTTP/[\d.]+)?$")
+
+
+@dataclass
+class Scenario:
+    name: str
+    method: str
+    url: str
+    headers: dict = field(default_factory=dict)
+    body: Optional[str] = None
+
+
+def parse_http_file(text: str, variables: Optional[dict] = None) -> list[Scenario]:
+    """
+    Parse a VS Code REST Client / JetBrains `.http` file.
+    Requests are separated by `###`; `### <title>` lines name the next
+    request; `@name = value` defines a variable used as `{{name}}`.
+    Explicit `variables` override file-level definitions.
+    """
+    file_vars: dict = {}
+    blocks: list[tuple[str, list[str]]] = []
+    title, lines = "", []
+    for raw in text.splitlines():
+        line = raw.rstrip()
+        if line.startswith("###"):
+            if lines:
+                blocks.append((title, lines))
+                lines = []
+            label = line.lstrip("#").strip()
+            if re.search(r"\w", label):
+                title = label
+            continue
+        m = re.match(r"^@(\w+)\s*=\s*(.*)$", line)
+        if m and not any(prev.strip() and not prev.lstrip().startswith(("#", "//")) for prev in lines):
+            file_vars[m.group(1)] = m.group(2).strip()
+            continue
+        lines.append(line)
+    if lines:
+        blocks.append((title, lines))
+
+    env = {**file_vars, **(variables or {})}
+
+    def subst(s: str) -> str:
+        return _VAR_RE.sub(lambda m: env.get(m.group(1), m.group(0)), s)
+
+    scenarios = []
+    for title, block in blocks:
+        body_lines: list[str] = []
+        method = url = None
+        headers: dict = {}
+        in_body = False
+        for line in block:
+            if method is None:
+                if not line.strip() or line.lstrip().startswith(("#", "//")):
+                    continue
+                m = _REQUEST_LINE_RE.match(line.strip())
+                if not m:
+                    break
+                method, url = m.group(1), subst(m.group(2))
+            elif not in_body:
+                if not line.strip():
+                    in_body = True
+                elif ":" in line:
+                    k, v = line.split(":", 1)
+                    headers[k.strip()] = subst(v.strip())
+            else:
+                body_lines.append(line)
+        if method is None:
+            continue
+        body = subst("\n".join(body_lines).strip()) or None
+        scenarios.append(Scenario(title or f"{method} {url}", method, url, headers, body))
+    return scenarios
+
+
+def parse_weighted(spec: str) -> tuple[list[str], list[float]]:
+    """'a:3,b:1' → (['a', 'b'], [3.0, 1.0]); weight defaults to 1."""
+    items, weights = [], []
+    for part in filter(None, (p.strip() for p in spec.split(","))):
+        name, _, w = part.rpartition(":") if ":" in part else (part, "", "1")
+        items.append(name)
+        weights.append(float(w))
+    return items, weights
+
+
+def zipf_tenants(n: int, s: float = 1.1) -> tuple[list[str], list[float]]:
+    """n synthetic tenants with Zipf(s) request shares."""
+    return [f"tenant_{i:04d}" for i in range(1, n + 1)], [1.0 / (i ** s) for i in range(1, n + 1)]
+
+
+def percentile(sorted_values: list[float], p: float) -> float:
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(p * len(sorted_values)))]
+
+
+def _latency_block(values: list[float]) -> dict:
+    data = sorted(values)
+    return {
+        "p50": round(percentile(data, 0.50) * 1000, 2),
+        "p95": round(percentile(data, 0.95) * 1000, 2),
+        "p99": round(percentile(data, 0.99) * 1000, 2),
+        "max": round(data[-1] * 1000, 2) if data else 0.0,
+        "mean": round(sum(data) / len(data) * 1000, 2) if data else 0.0,
+    }
+
+
+class LoadRun:
+    def __init__(self, scenarios, base_url, keys, key_weights, tenants, tenant_weights, seed=None):
+        self.scenarios = scenarios
+        self.base_url = base_url.rstrip("/")
+        self.keys, self.key_weights = keys, key_weights
+        self.tenants, self.tenant_weights = tenants, tenant_weights
+        self.rng = random.Random(seed)
+        self.latencies: dict[str, list[float]] = defaultdict(list)
+        self.statuses: dict[str, Counter] = defaultdict(Counter)
+        self.errors: dict[str, Counter] = defaultdict(Counter)
+
+    def _build(self, sc: Scenario) -> tuple[str, dict, Optional[bytes]]:
+        headers = dict(sc.headers)
+        if self.keys:
+            headers["X-API-Key"] = self.rng.choices(self.keys, self.key_weights)[0]
+        body = sc.body
+        if body and self.tenants:
+            try:
+                doc = json.loads(body)
+                if isinstance(doc, dict) and "tenant_id" in doc:
+                    doc["tenant_id"] = self.rng.choices(self.tenants, self.tenant_weights)[0]
+                    body = json.dumps(doc)
+            except ValueError:
+                pass
+        url = sc.url if sc.url.startswith("http") else self.base_url + sc.url
+        return url, headers, body.encode() if body else None
+
+    async def one(self, client: httpx.AsyncClient) -> None:
+        sc = self.rng.choice(self.scenarios)
+        url, headers, body = self._build(sc)
+        start = time.perf_counter()
+        try:
+            r = await client.request(sc.method, url, headers=headers, content=body)
+            self.statuses[sc.name][str(r.status_code)] += 1
+            if r.status_code >= 400:
+                self.errors[sc.name][f"HTTP {r.status_code}"] += 1
+        except Exception as e:
+            self.errors[sc.name][type(e).__name__] += 1
+        self.latencies[sc.name].append(time.perf_counter() - start)
+
+    async def closed_loop(self, client, concurrency: int, duration: float) -> None:
+        deadline = time.perf_counter() + duration
+
+        async def worker():
+            while time.perf_counter() < deadline:
+                await self.one(client)
+
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+
+    async def open_loop(self, client, rps: float, duration: float, max_inflight: int) -> None:
+        """Fixed arrival schedule; arrivals beyond max_inflight are counted as dropped."""
+        interval = 1.0 / rps
+        start = time.perf_counter()
+        inflight: set = set()
+        i = 0
+        while True:
+            due = start + i * interval
+            if due - start >= duration:
+                break
+            delay = due - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            if len(inflight) >= max_inflight:
+                self.errors["<generator>"]["dropped_max_inflight"] += 1
+            else:
+                task = asyncio.create_task(self.one(client))
+                inflight.add(task)
+                task.add_done_callback(inflight.discard)
+            i += 1
+        if inflight:
+            await asyncio.gather(*inflight)
+
+    def report(self, elapsed: float, config: dict) -> dict:
+        all_lat = [v for vs in self.latencies.values() for v in vs]
+        total_status: Counter = sum(self.statuses.values(), Counter())
+        total_errors: Counter = sum(self.errors.values(), Counter())
+        return {
+            "config": config,
+            "duration_s": round(elapsed, 3),
+            "total_requests": len(all_lat),
+            "throughput_rps": round(len(all_lat) / elapsed, 1) if elapsed else 0.0,
+            "latency_ms": _latency_block(all_lat),
+            "status_codes": dict(sorted(total_status.items())),
+            "errors": dict(total_errors.most_common()),
+            "error_rate_pct": round(sum(total_errors.values()) / max(1, len(all_lat)) * 100, 2),
+            "scenarios": {
+                name: {
+                    "requests": len(lat),
+                    "latency_ms": _latency_block(lat),
+                    "status_codes": dict(sorted(self.statuses[name].items())),
+                    "errors": dict(self.errors[name]),
+                }
+                for name, lat in sorted(self.latencies.items())
+            },
+        }
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def spawn_server(workers: int = 1) -> tuple[subprocess.Popen, str]:
+    """Start a local uvicorn on a free port with a throwaway DB; wait for /api/health."""
+    port = _free_port()
+    env = {
+        **os.environ,
+        "GENESIS_DB_PATH": os.path.join(tempfile.mkdtemp(prefix="genesis-load-"), "audit.db"),
+        "GENESIS_RATE_GLOBAL": "100000000",
+        "GENESIS_RATE_WRITE": "100000000",
+    }
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "genesis_api:app", "--host", "127.0.0.1",
+         "--port", str(port), "--workers", str(workers), "--log-level", "warning"],
+        cwd=ROOT, env=env, stdout=subprocess.DEVNULL,
+    )
+    base = f"http://127.0.0.1:{port}"
+    for _ in range(100):
+        try:
+            if httpx.get(f"{base}/api/health", timeout=2).status_code == 200:
+                return proc, base
+        except httpx.HTTPError:
+            pass
+        if proc.poll() is not None:
+            raise SystemExit(f"uvicorn exited with code {proc.returncode}")
+        time.sleep(0.1)
+    proc.terminate()
+    raise SystemExit("uvicorn did not become healthy within 10s")
+
+
+async def _run(args, scenarios, base_url) -> dict:
+    keys, key_w = parse_weighted(args.keys)
+    if args.tenants.isdigit():
+        tenants, tenant_w = zipf_tenants(int(args.tenants))
+    else:
+        tenants, tenant_w = parse_weighted(args.tenants)
+    run = LoadRun(scenarios, base_url, keys, key_w, tenants, tenant_w, seed=args.seed)
+    pool = args.concurrency or args.max_inflight
+    limits = httpx.Limits(max_connections=pool, max_keepalive_connections=pool)
+    async with httpx.AsyncClient(limits=limits, timeout=args.timeout) as client:
+        start = time.perf_counter()
+        if args.rps:
+            await run.open_loop(client, args.rps, args.duration, args.max_inflight)
+        else:
+            await run.closed_loop(client, args.concurrency, args.duration)
+        elapsed = time.perf_counter() - start
+    config = {
+        "base_url": base_url, "scenario_file": args.file, "scenarios": len(scenarios),
+        "mode": "open_loop" if args.rps else "closed_loop",
+        "target_rps": args.rps, "concurrency": args.concurrency, "duration_s": args.duration,
+        "keys": len(keys), "tenants": len(tenants),
+    }
+    return run.report(elapsed, config)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--file", default=str(ROOT / "genesis_api.http"), help="scenario .http file")
+    parser.add_argument("--base-url", default=None, help="overrides {{baseUrl}} (default: from file)")
+    parser.add_argument("--spawn", action="store_true", help="start a local uvicorn instance")
+    parser.add_argument("--workers", type=int, default=1, help="uvicorn workers with --spawn")
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument("--rps", type=float, help="open-loop target requests/sec")
+    mode.add_argument("--concurrency", type=int, help="closed-loop worker count (default 16)")
+    parser.add_argument("--duration", type=float, default=10.0, help="seconds")
+    parser.add_argument("--max-inflight", type=int, default=256, help="open-loop cap on outstanding requests")
+    parser.add_argument("--timeout", type=float, default=30.0)
+    parser.add_argument("--keys", default=os.environ.get("GENESIS_API_KEY", "genesis-dev-key"),
+                        help="weighted API keys, e.g. 'k1:3,k2:1'")
+    parser.add_argument("--tenants", default="50", help="N Zipf tenants, or weighted list 'bank_a:5,bank_b:1'")
+    parser.add_argument("--only", default=None, help="regex: keep scenarios whose name matches")
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--out", default=None, help="write JSON report here (default: stdout)")
+    args = parser.parse_args()
+    if not args.rps and not args.concurrency:
+        args.concurrency = 16
+
+    proc = None
+    if args.spawn:
+        proc, base_url = spawn_server(args.workers)
+    variables = {"baseUrl": base_url} if args.spawn else ({"baseUrl": args.base_url} if args.base_url else {})
+    try:
+        scenarios = parse_http_file(Path(args.file).read_text(encoding="utf-8"), variables)
+        if args.only:
+            scenarios = [s for s in scenarios if re.search(args.only, s.name)]
+        if not scenarios:
+            raise SystemExit("no scenarios to run")
+        base = variables.get("baseUrl") or "http://localhost:8080"
+        report = asyncio.run(_run(args, scenarios, base))
+    finally:
+        if proc:
+            proc.terminate()
+            proc.wait(timeout=10)
+
+    text = json.dumps(report, indent=2)
+    if args.out:
+        Path(args.out).write_text(text)
+    else:
+        print(text)
+
+
+if __name__ == "__main__":
+    main()
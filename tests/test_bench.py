@@ -0,0 +1,53 @@
+"""
+GENESIS v10.1 — Benchmark regression gate tests (scripts/bench.py compare).
+
+Run: pytest tests/test_bench.py -v
+"""
+import importlib.util
+import os
+
+_spec = importlib.util.spec_from_file_location(
+    "genesis_bench", os.path.join(os.path.dirname(__file__), "..", "scripts", "bench.py")
+)
+bench = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(bench)
+
+
+def _results(**medians):
+    return {"meta": {}, "benchmarks": {k: {"median_us": v, "p99_us": v * 2} for k, v in medians.items()}}
+
+
+class TestCompare:
+    def test_identical_runs_pass(self):
+        rows, ok = bench.compare(_results(a=10.0, b=20.0), _results(a=10.0, b=20.0), threshold=10)
+        assert ok
+        assert all(r["status"] == "ok" for r in rows)
+
+    def test_regression_above_threshold_fails(self):
+        rows, ok = bench.compare(_results(a=10.0), _results(a=11.5), threshold=10)
+        assert not ok
+        assert rows[0]["status"] == "REGRESSED"
+        assert rows[0]["change_pct"] == 15.0
+
+    def test_regression_within_threshold_passes(self):
+        _, ok = bench.compare(_results(a=10.0), _results(a=10.9), threshold=10)
+        assert ok
+
+    def test_speedup_passes(self):
+        _, ok = bench.compare(_results(a=10.0), _results(a=5.0), threshold=0)
+        assert ok
+
+    def test_added_and_removed_benchmarks_never_fail(self):
+        rows, ok = bench.compare(_results(a=10.0), _results(b=10.0), threshold=10)
+        assert ok
+        assert {r["status"] for r in rows} == {"new", "removed"}
+
+    def test_alternate_metric(self):
+        _, ok = bench.compare(_results(a=10.0), _results(a=10.0), threshold=10, metric="p99_us")
+        assert ok
+
+
+class TestSummary:
+    def test_percentiles_ordered(self):
+        s = bench._summary([i / 1e6 for i in range(1, 101)])
+        assert s["min_us"] <= s["median_us"] <= s["p95_us"] <= s["p99_us"]
@@ -4,18 +4,27 @@ pytest-based, covers all 9 EU frameworks fully.
 
 Run: pytest tests/ -v
 """
+import json
 import sys
 import os
+import tempfile
+import uuid
+from typing import Optional
+from datetime import datetime, timezone
 
 # Set high rate limits BEFORE importing the module — constants are set at import time
 os.environ["GENESIS_RATE_GLOBAL"] = "10000"
 os.environ["GENESIS_RATE_WRITE"]  = "10000"
+# Throwaway database: never touch data/audit.db
+os.environ.setdefault("GENESIS_DB_PATH", os.path.join(tempfile.mkdtemp(prefix="genesis-test-"), "audit.db"))
 
 # Allow importing genesis_api from repo root without install
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
 
+import numpy as np
 import pytest
 from fastapi.testclient import TestClient
+from prometheus_client.parser import text_string_to_metric_families
 
 import genesis_api
 from genesis_api import app, _predict_risk, _MODEL_R2, FRAMEWORKS, _rate_buckets
@@ -33,6 +42,47 @@ def reset_rate_buckets():
     _rate_buckets.clear()
 
 
+def _sample(text: str, name: str, **labels) -> Optional[float]:
+    """Value of the first exposition sample `name` whose labels include `labels` (None if absent)."""
+    for family in text_string_to_metric_families(text):
+        for sample in family.samples:
+            if sample.name == name and labels.items() <= sample.labels.items():
+                return sample.value
+    return None
+
+
+_tenant_clients: dict[str, TestClient] = {}
+
+
+def _as(tenant_id: str) -> TestClient:
+    """Client authenticated with a key issued (once) for `tenant_id`."""
+    if tenant_id not in _tenant_clients:
+        created = TestClient(app, headers={"X-API-Key": "genesis-admin-key"}).post(
+            "/api/admin/keys", json={"tenant_id": tenant_id, "name": "posture-test"})
+        _tenant_clients[tenant_id] = TestClient(app, headers={"X-API-Key": created.json()["key"]})
+    return _tenant_clients[tenant_id]
+
+
+def _fake_llama(status: int = 200, delay: float = 0.0, down: bool = False, slots: int = 2,
+                timeout: float = 5.0, reply: str = "CPU load drives the score."):
+    """_LlamaClient backed by an in-process llama-server stand-in (httpx.MockTransport)."""
+    import asyncio
+    import httpx
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        if down:
+            raise httpx.ConnectError("connection refused", request=request)
+        await asyncio.sleep(delay)
+        if status != 200:
+            return httpx.Response(status, json={"error": {"message": "Loading model"}})
+        if json.loads(request.content).get("stream"):
+            words = reply.split(" ")
+            deltas = words[:1] + [" " + w for w in words[1:]]
+            sse = "".join(f"data: {json.dumps({'choices': [{'delta': {'content': d}}]})}\n\n" for d in deltas)
+            return httpx.Response(200, text=sse + "data: [DONE]\n\n", headers={"Content-Type": "text/event-stream"})
+        return httpx.Response(200, json={"choices": [{"message": {"content": f"  {reply}\n"}}]})
+
+    return genesis_api._LlamaClient("http://llama.test", slots, timeout, transport=httpx.MockTransport(handler))
 
 
 METRICS_LOW = dict(cpu=20, memory=15, network_io=5, disk_usage=20, error_rate=0)
@@ -127,6 +177,64 @@ class TestHealth:
             if svc != "local_ai_llm":
                 assert status == "operational", f"{svc} not operational"
 
+    def test_livez(self):
+        r = client.get("/livez")
+        assert r.status_code == 200
+        assert r.json() == {"status": "alive"}
+
+    def test_readyz_reports_cached_checks(self):
+        r = client.get("/readyz")
+        assert r.status_code == 200
+        checks = r.json()["checks"]
+        assert checks["database"]["ok"] and checks["disk"]["ok"]
+        assert set(checks["llama"]) >= {"ok", "checked_at", "latency_ms", "age_s", "critical"}
+        assert checks["llama"]["critical"] is False
+
+    def test_health_does_not_probe_llama_per_request(self, monkeypatch):
+        import time
+        genesis_api._probes.wait_ready()
+        calls = []
+
+        def slow_llama():
+            calls.append(1)
+            time.sleep(1.0)
+            return False
+
+        monkeypatch.setattr(genesis_api, "_llama_available", slow_llama)
+        start = time.perf_counter()
+        for _ in range(5):
+            assert client.get("/api/health").status_code == 200
+        assert time.perf_counter() - start < 1.0
+        assert not calls
+
+    def test_health_detail_lists_dependencies(self):
+        d = client.get("/api/health?detail=true").json()
+        assert {"database", "disk", "llama"} <= set(d["dependencies"])
+        assert "dependencies" not in client.get("/api/health").json()
+
+    def test_readyz_503_when_critical_probe_fails(self, monkeypatch):
+        def broken():
+            raise OSError("database is locked")
+
+        probes = genesis_api._DependencyProbes(60, {"database": (broken, True), "llama": (lambda: {}, False)})
+        probes.wait_ready()
+        monkeypatch.setattr(genesis_api, "_probes", probes)
+        r = client.get("/readyz")
+        assert r.status_code == 503
+        assert r.json()["checks"]["database"]["error"] == "OSError: database is locked"
+        d = client.get("/api/health").json()
+        assert d["status"] == "degraded"
+        assert d["services"]["audit_trail"] == "unavailable"
+        assert client.get("/livez").status_code == 200
+
+    def test_stale_probe_counts_as_failed(self):
+        import time
+        probes = genesis_api._DependencyProbes(0.01, {"database": (lambda: {}, True)})
+        probes.run_once()
+        time.sleep(0.05)
+        assert not probes.ok("database")
+        assert not probes.is_ready()
+
 
 # ─── Authentication ──────────────────────────────────────────────────────────
 
@@ -304,6 +412,458 @@ class TestComplianceEngine:
         assert d["total_frameworks"] == 9
 
 
+# ─── Declarative Rule Engine ────────────────────────────────────────────────
+
+class TestRuleEngine:
+    @pytest.fixture
+    def rules_file(self, tmp_path, monkeypatch):
+        path = tmp_path / "rules.json"
+        monkeypatch.setattr(genesis_api, "_RULES_PATH", str(path))
+        yield path
+        monkeypatch.setattr(genesis_api, "_RULES_PATH", "")
+        genesis_api._rule_sync.reload()
+
+    def test_builtin_plan_covers_all_frameworks(self):
+        assert set(genesis_api._RULE_PLAN.frameworks) == set(FRAMEWORKS)
+
+    def test_check_order_preserved(self):
+        d = client.post("/api/compliance/basel_iii", json=COMPLIANCE_FULL).json()
+        assert list(d["check_details"]) == [
+            "data_residency_eu", "encryption_at_rest", "audit_logging", "mfa_enabled",
+            "cet1_above_minimum", "lcr_above_100pct", "data_retention_10yr",
+        ]
+
+    def test_residency_case_insensitive(self):
+        d = client.post("/api/compliance/gdpr", json={**COMPLIANCE_FULL, "data_residency": "at"}).json()
+        assert d["check_details"]["data_residency_eu"] is True
+
+    def test_response_carries_rules_version(self):
+        d = client.post("/api/compliance/dora", json=COMPLIANCE_FULL).json()
+        assert d["rules_version"] == genesis_api._RULE_PLAN.version
+
+    def test_rules_listing_requires_admin(self):
+        assert client.get("/api/admin/rules").status_code == 403
+        d = admin_client.get("/api/admin/rules").json()
+        assert d["source"] == "builtin"
+        assert d["frameworks"]["dora"][4]["ref"] == "DORA Art. 19"
+
+    def test_hot_reload_adds_check(self, rules_file):
+        rules = {fw: list(r) for fw, r in genesis_api.DEFAULT_COMPLIANCE_RULES.items()}
+        rules["dora"] = rules["dora"] + [
+            {"check": "cet1_buffer", "field": "cet1_ratio_pct", "op": ">=", "value": 20.0, "ref": "test"}
+        ]
+        rules_file.write_text(json.dumps({"frameworks": rules}))
+        before = genesis_api._RULE_PLAN.version
+        r = admin_client.post("/api/admin/rules/reload")
+        assert r.status_code == 200
+        assert r.json()["version"] != before
+        d = client.post("/api/compliance/dora", json=COMPLIANCE_FULL).json()
+        assert d["checks_total"] == 9
+        assert "cet1_buffer" in d["remediation_required"]
+
+    def test_invalid_rules_keep_running_plan(self, rules_file):
+        rules_file.write_text(json.dumps({"dora": [{"check": "x", "field": "no_such_field"}]}))
+        before = genesis_api._RULE_PLAN
+        r = admin_client.post("/api/admin/rules/reload")
+        assert r.status_code == 422
+        assert genesis_api._RULE_PLAN is before
+
+    def test_reload_requires_admin(self):
+        assert client.post("/api/admin/rules/reload").status_code == 403
+
+    def test_reload_compiles_off_event_loop(self, monkeypatch):
+        import threading
+        threads = []
+        load = genesis_api._load_rule_plan
+
+        def tracked():
+            threads.append(threading.current_thread().name)
+            return load()
+
+        monkeypatch.setattr(genesis_api, "_load_rule_plan", tracked)
+        assert admin_client.post("/api/admin/rules/reload").status_code == 200
+        assert threads and threads[0].startswith("genesis-db-writer")
+
+    def test_other_workers_adopt_reload(self, rules_file):
+        worker = genesis_api._RuleSync(60.0)  # another worker's view: started before the reload
+        worker.generation = genesis_api._rule_sync.generation
+        stale = genesis_api._RULE_PLAN
+        rules = {fw: list(r) for fw, r in genesis_api.DEFAULT_COMPLIANCE_RULES.items()}
+        rules["eba"] = rules["eba"][:-1]
+        rules_file.write_text(json.dumps(rules))
+        version = admin_client.post("/api/admin/rules/reload").json()["version"]
+        with genesis_api._rule_plan_lock:
+            genesis_api._install_rule_plan(stale)  # as if this process had not reloaded
+        rules_file.write_text("{}")  # adopted from the shared DB, not re-read from the file
+        assert worker.sync() is True
+        assert genesis_api._RULE_PLAN.version == version
+        assert client.post("/api/compliance/eba", json=COMPLIANCE_FULL).json()["rules_version"] == version
+        assert worker.sync() is False  # nothing new published
+
+    def test_reload_rerenders_frameworks_catalog(self, rules_file):
+        before = client.get("/api/compliance/frameworks/all").headers["etag"]
+        rules = {fw: list(r) for fw, r in genesis_api.DEFAULT_COMPLIANCE_RULES.items()}
+        rules["eba"] = rules["eba"][:-1]
+        rules_file.write_text(json.dumps(rules))
+        admin_client.post("/api/admin/rules/reload")
+        r = client.get("/api/compliance/frameworks/all", headers={"If-None-Match": before})
+        assert r.status_code == 200
+        assert r.json()["rules_version"] == genesis_api._RULE_PLAN.version
+
+
+# ─── All-Frameworks Posture ─────────────────────────────────────────────────
+
+class TestComplianceAll:
+    def test_matches_per_framework_results(self):
+        body = {**COMPLIANCE_FULL, "penetration_testing_done": False, "data_retention_days": 400}
+        d = client.post("/api/compliance/all", json=body).json()
+        assert set(d["frameworks"]) == set(ALL_FRAMEWORKS)
+        for fw in ALL_FRAMEWORKS:
+            single = client.post(f"/api/compliance/{fw}", json=body).json()
+            for key in ("compliance_status", "compliance_score_pct", "checks_passed", "checks_total",
+                        "check_details", "remediation_required"):
+                assert d["frameworks"][fw][key] == single[key], f"{fw}.{key}"
+
+    def test_overall_score(self):
+        d = client.post("/api/compliance/all", json=COMPLIANCE_FULL).json()
+        assert d["overall_score_pct"] == 100.0
+        assert d["overall_status"] == "COMPLIANT"
+        assert d["frameworks_compliant"] == 9
+        gaps = client.post("/api/compliance/all", json=COMPLIANCE_GAPS).json()
+        assert gaps["overall_status"] == "NON_COMPLIANT"
+
+    def test_shared_predicates_evaluated_once(self):
+        d = client.post("/api/compliance/all", json=COMPLIANCE_FULL).json()
+        assert d["predicates_evaluated"] < d["checks_total"]
+
+    def test_single_audit_entry(self):
+        before = client.get("/api/audit").json()["total_entries"]
+        client.post("/api/compliance/all", json={**COMPLIANCE_FULL, "tenant_id": "all_audit_probe"})
+        after = client.get("/api/audit?limit=1").json()
+        assert after["total_entries"] == before + 1
+        assert after["entries"][0]["action"] == "compliance_all"
+
+
+# ─── Compliance Result Cache / ETag ─────────────────────────────────────────
+
+class TestComplianceCache:
+    @pytest.fixture(autouse=True)
+    def clear_cache(self):
+        genesis_api._compliance_cache.clear()
+
+    def test_etag_and_cache_headers(self):
+        r = client.post("/api/compliance/dora", json=COMPLIANCE_FULL)
+        assert r.headers["etag"].startswith('"')
+        assert r.headers["x-cache"] == "MISS"
+        assert "no-cache" in r.headers["cache-control"]
+
+    def test_repeat_poll_served_from_cache_without_audit(self):
+        first = client.post("/api/compliance/gdpr", json=COMPLIANCE_FULL)
+        before = client.get("/api/audit").json()["total_entries"]
+        second = client.post("/api/compliance/gdpr", json=COMPLIANCE_FULL)
+        assert second.headers["x-cache"] == "HIT"
+        assert second.json() == first.json()
+        assert client.get("/api/audit").json()["total_entries"] == before
+
+    def test_if_none_match_returns_304(self):
+        etag = client.post("/api/compliance/eba", json=COMPLIANCE_FULL).headers["etag"]
+        r = client.post("/api/compliance/eba", json=COMPLIANCE_FULL, headers={"If-None-Match": etag})
+        assert r.status_code == 304
+        assert r.content == b""
+        assert r.headers["etag"] == etag
+
+    def test_changed_payload_changes_etag(self):
+        a = client.post("/api/compliance/dora", json=COMPLIANCE_FULL).headers["etag"]
+        body = {**COMPLIANCE_FULL, "penetration_testing_done": False}
+        r = client.post("/api/compliance/dora", json=body, headers={"If-None-Match": a})
+        assert r.status_code == 200
+        assert r.headers["etag"] != a
+
+    def test_different_framework_different_etag(self):
+        a = client.post("/api/compliance/dora", json=COMPLIANCE_FULL).headers["etag"]
+        b = client.post("/api/compliance/gdpr", json=COMPLIANCE_FULL).headers["etag"]
+        assert a != b
+
+    def test_all_endpoint_supports_etag(self):
+        etag = client.post("/api/compliance/all", json=COMPLIANCE_FULL).headers["etag"]
+        r = client.post("/api/compliance/all", json=COMPLIANCE_FULL, headers={"If-None-Match": f'W/{etag}, "x"'})
+        assert r.status_code == 304
+
+    def test_rule_reload_invalidates(self, tmp_path, monkeypatch):
+        etag = client.post("/api/compliance/dora", json=COMPLIANCE_FULL).headers["etag"]
+        rules = {fw: list(r) for fw, r in genesis_api.DEFAULT_COMPLIANCE_RULES.items()}
+        rules["dora"] = rules["dora"][:-1]
+        path = tmp_path / "rules.json"
+        path.write_text(json.dumps(rules))
+        monkeypatch.setattr(genesis_api, "_RULES_PATH", str(path))
+        try:
+            assert admin_client.post("/api/admin/rules/reload").status_code == 200
+            assert len(genesis_api._compliance_cache) == 0
+            r = client.post("/api/compliance/dora", json=COMPLIANCE_FULL, headers={"If-None-Match": etag})
+            assert r.status_code == 200
+            assert r.json()["checks_total"] == 7
+        finally:
+            monkeypatch.setattr(genesis_api, "_RULES_PATH", "")
+            genesis_api._reload_rule_plan()
+
+    def test_cache_metrics_exported(self):
+        client.post("/api/compliance/dora", json=COMPLIANCE_FULL)
+        client.post("/api/compliance/dora", json=COMPLIANCE_FULL)
+        text = TestClient(app).get("/metrics").text
+        assert "genesis_compliance_cache_hits_total" in text
+
+
+# ─── Precomputed Static Responses ───────────────────────────────────────────
+
+class TestStaticResponses:
+    @pytest.mark.parametrize("path", ["/api/compliance/frameworks/all", "/api/valuation", "/api/ai/status"])
+    def test_strong_etag_and_304(self, path):
+        r = client.get(path)
+        assert r.status_code == 200
+        etag = r.headers["etag"]
+        assert etag.startswith('"') and "cache-control" in r.headers
+        again = client.get(path, headers={"If-None-Match": etag})
+        assert again.status_code == 304
+        assert again.content == b""
+        assert again.headers["etag"] == etag
+
+    def test_body_is_stable_bytes(self):
+        a = client.get("/api/valuation")
+        b = client.get("/api/valuation")
+        assert a.content == b.content
+        assert a.json()["median_valuation_eur"] == 345_000_000
+
+    def test_frameworks_catalog_carries_rules_version(self):
+        d = client.get("/api/compliance/frameworks/all").json()
+        assert d["rules_version"] == genesis_api._RULE_PLAN.version
+
+    def test_ai_status_follows_llama_probe(self, monkeypatch):
+        calls = []
+
+        def llama_up(up):
+            def probe():
+                calls.append(up)
+                return up
+            return probe
+
+        genesis_api._probes.wait_ready()
+        monkeypatch.setattr(genesis_api, "_llama_available", llama_up(False))
+        genesis_api._probes.run_once()
+        offline = client.get("/api/ai/status")
+        monkeypatch.setattr(genesis_api, "_llama_available", llama_up(True))
+        genesis_api._probes.run_once()
+        probed = len(calls)
+        online = client.get("/api/ai/status", headers={"If-None-Match": offline.headers["etag"]})
+        assert client.get("/api/ai/status").content == online.content
+        assert len(calls) == probed  # served from the probe cache, no llama round trip
+        monkeypatch.undo()
+        genesis_api._probes.run_once()
+        assert online.status_code == 200
+        assert online.json()["llama_server"] == "online"
+        assert offline.json()["llama_server"] == "offline"
+
+
+# ─── Bulk Assessment ────────────────────────────────────────────────────────
+
+class TestBulkCompliance:
+    POSTURES = [COMPLIANCE_FULL, COMPLIANCE_GAPS, {**COMPLIANCE_FULL, "tenant_id": "mixed", "data_residency": "de",
+                                                   "penetration_testing_done": False, "cet1_ratio_pct": 6.0}]
+
+    def test_matches_single_framework_endpoint(self):
+        d = client.post("/api/compliance/bulk", json={"postures": self.POSTURES}).json()
+        assert d["tenants"] == ["test_bank", "test_bank_gaps", "mixed"]
+        for fw in ALL_FRAMEWORKS:
+            res = d["results"][fw]
+            for i, posture in enumerate(self.POSTURES):
+                single = client.post(f"/api/compliance/{fw}", json=posture).json()
+                assert res["checks"] == list(single["check_details"])
+                assert res["passed"][i] == "".join("1" if v else "0" for v in single["check_details"].values())
+                assert res["score_pct"][i] == single["compliance_score_pct"]
+                assert res["status"][i] == single["compliance_status"]
+
+    def test_framework_subset_and_summary(self):
+        d = client.post("/api/compliance/bulk", json={"postures": self.POSTURES, "frameworks": ["dora", "eba"]}).json()
+        assert set(d["results"]) == {"dora", "eba"}
+        assert sum(d["summary"]["dora"].values()) == 3
+
+    def test_single_audit_entry(self):
+        before = client.get("/api/audit").json()["total_entries"]
+        client.post("/api/compliance/bulk", json={"postures": self.POSTURES})
+        after = client.get("/api/audit?limit=1").json()
+        assert after["total_entries"] == before + 1
+        assert after["entries"][0]["action"] == "compliance_bulk"
+        assert after["entries"][0]["payload"]["tenants"] == 3
+
+    def test_unknown_framework_404(self):
+        r = client.post("/api/compliance/bulk", json={"postures": self.POSTURES, "frameworks": ["nope"]})
+        assert r.status_code == 404
+
+    def test_empty_postures_rejected(self):
+        assert client.post("/api/compliance/bulk", json={"postures": []}).status_code == 422
+
+
+# ─── Tenant Posture Store ───────────────────────────────────────────────────
+
+class TestPostureStore:
+    @pytest.fixture
+    def tenant(self, request):
+        tid = f"posture_{request.node.name}_{uuid.uuid4().hex[:8]}"
+        r = _as(tid).put(f"/api/posture/{tid}", json=COMPLIANCE_GAPS)
+        assert r.status_code == 200
+        return tid
+
+    def test_put_evaluates_all_frameworks(self, tenant):
+        d = _as(tenant).get(f"/api/posture/{tenant}").json()
+        assert set(d["frameworks"]) == set(ALL_FRAMEWORKS)
+        assert d["posture"]["tenant_id"] == tenant
+        for fw in ALL_FRAMEWORKS:
+            single = client.post(f"/api/compliance/{fw}", json=COMPLIANCE_GAPS).json()
+            assert d["frameworks"][fw]["check_details"] == single["check_details"]
+
+    def test_patch_recomputes_only_dependent_checks(self, tenant):
+        r = _as(tenant).patch(f"/api/posture/{tenant}", json={"penetration_testing_done": True})
+        assert r.status_code == 200
+        d = r.json()
+        assert d["changed_fields"] == ["penetration_testing_done"]
+        assert 0 < d["checks_recomputed"] < sum(len(v) for v in genesis_api._RULE_PLAN.frameworks.values())
+        assert {"framework": "dora", "check": "penetration_testing_done", "from": False, "to": True} in d["flips"]
+
+    def test_patch_matches_full_evaluation(self, tenant):
+        delta = {"mfa_enabled": True, "cet1_ratio_pct": 12.0, "data_residency": "at"}
+        _as(tenant).patch(f"/api/posture/{tenant}", json=delta)
+        stored = _as(tenant).get(f"/api/posture/{tenant}").json()["frameworks"]
+        full = client.post("/api/compliance/all", json={**COMPLIANCE_GAPS, **delta, "tenant_id": tenant}).json()
+        for fw in ALL_FRAMEWORKS:
+            assert stored[fw]["check_details"] == full["frameworks"][fw]["check_details"]
+
+    def test_noop_patch_has_no_flips_or_audit(self, tenant):
+        before = client.get("/api/audit").json()["total_entries"]
+        d = _as(tenant).patch(f"/api/posture/{tenant}", json={"data_residency": COMPLIANCE_GAPS["data_residency"]}).json()
+        assert d["flips"] == [] and d["checks_recomputed"] == 0
+        assert client.get("/api/audit").json()["total_entries"] == before
+
+    def test_flips_written_to_audit(self, tenant):
+        _as(tenant).patch(f"/api/posture/{tenant}", json={"penetration_testing_done": True})
+        entry = client.get("/api/audit?limit=1").json()["entries"][0]
+        assert entry["action"] == "compliance_check_flipped"
+        assert entry["payload"]["tenant_id"] == tenant
+
+    def test_patch_unknown_tenant_404(self):
+        assert _as("never_stored").patch("/api/posture/never_stored", json={"mfa_enabled": True}).status_code == 404
+
+    def test_other_tenants_posture_forbidden(self, tenant):
+        other = _as(f"other_{uuid.uuid4().hex[:8]}")
+        assert other.put(f"/api/posture/{tenant}", json=COMPLIANCE_FULL).status_code == 403
+        assert other.patch(f"/api/posture/{tenant}", json={"mfa_enabled": True}).status_code == 403
+        assert other.get(f"/api/posture/{tenant}").status_code == 403
+        assert other.get(f"/api/posture/{tenant}/at", params={"ts": "2030-01-01T00:00:00"}).status_code == 403
+        assert other.get(f"/api/posture/{tenant}/flips", params={"start": "2020-01-01T00:00:00"}).status_code == 403
+        assert client.get(f"/api/posture/{tenant}").status_code == 403  # dev key belongs to tenant "default"
+        assert _as(tenant).get(f"/api/posture/{tenant}").json()["posture"] == {**COMPLIANCE_GAPS, "tenant_id": tenant}
+
+    def test_patch_rejects_unknown_and_immutable_fields(self, tenant):
+        assert _as(tenant).patch(f"/api/posture/{tenant}", json={"nope": 1}).status_code == 422
+        assert _as(tenant).patch(f"/api/posture/{tenant}", json={"tenant_id": "x"}).status_code == 422
+
+    def test_patch_validates_merged_posture(self, tenant):
+        assert _as(tenant).patch(f"/api/posture/{tenant}", json={"cet1_ratio_pct": -5}).status_code == 422
+
+
+# ─── Posture History ────────────────────────────────────────────────────────
+
+class TestPostureHistory:
+    @pytest.fixture
+    def tenant(self):
+        tid = f"history_{uuid.uuid4().hex[:8]}"
+        _as(tid).put(f"/api/posture/{tid}", json=COMPLIANCE_GAPS)
+        return tid
+
+    @staticmethod
+    def _now():
+        return datetime.now(timezone.utc).isoformat()
+
+    def test_point_in_time_before_and_after_flip(self, tenant):
+        before = self._now()
+        _as(tenant).patch(f"/api/posture/{tenant}", json={"penetration_testing_done": True})
+        old = _as(tenant).get(f"/api/posture/{tenant}/at", params={"ts": before, "framework": "dora"}).json()
+        new = _as(tenant).get(f"/api/posture/{tenant}/at", params={"ts": self._now(), "framework": "dora"}).json()
+        assert old["frameworks"]["dora"]["check_details"]["penetration_testing_done"] is False
+        assert new["frameworks"]["dora"]["check_details"]["penetration_testing_done"] is True
+        assert set(old["frameworks"]) == {"dora"}
+
+    def test_at_matches_current_posture(self, tenant):
+        _as(tenant).patch(f"/api/posture/{tenant}", json={"mfa_enabled": True, "data_residency": "DE"})
+        at = _as(tenant).get(f"/api/posture/{tenant}/at", params={"ts": self._now()}).json()["frameworks"]
+        current = _as(tenant).get(f"/api/posture/{tenant}").json()["frameworks"]
+        assert at == current
+
+    def test_before_first_write_404(self, tenant):
+        r = _as(tenant).get(f"/api/posture/{tenant}/at", params={"ts": "2020-01-01T00:00:00"})
+        assert r.status_code == 404
+
+    def test_flips_range_query(self, tenant):
+        start = self._now()
+        _as(tenant).patch(f"/api/posture/{tenant}", json={"penetration_testing_done": True})
+        _as(tenant).patch(f"/api/posture/{tenant}", json={"penetration_testing_done": False})
+        d = _as(tenant).get(f"/api/posture/{tenant}/flips", params={"start": start, "framework": "dora"}).json()
+        assert [(f["check"], f["to"]) for f in d["flips"]] == [
+            ("penetration_testing_done", True), ("penetration_testing_done", False)]
+        # initial PUT rows are not flips
+        assert _as(tenant).get(f"/api/posture/{tenant}/flips", params={"start": "2020-01-01T00:00:00"}).json()["total_flips"] == 2
+
+    def test_past_answers_survive_rule_reload(self, tenant, tmp_path, monkeypatch):
+        rules = {fw: [r for r in checks if r["check"] != "penetration_testing_done"]
+                 for fw, checks in genesis_api.DEFAULT_COMPLIANCE_RULES.items()}
+        path = tmp_path / "rules.json"
+        path.write_text(json.dumps({"frameworks": rules}))
+        before = self._now()
+        monkeypatch.setattr(genesis_api, "_RULES_PATH", str(path))
+        try:
+            genesis_api._reload_rule_plan()
+            _as(tenant).put(f"/api/posture/{tenant}", json=COMPLIANCE_GAPS)
+            old = _as(tenant).get(f"/api/posture/{tenant}/at", params={"ts": before, "framework": "dora"}).json()
+            new = _as(tenant).get(f"/api/posture/{tenant}/at", params={"ts": self._now(), "framework": "dora"}).json()
+        finally:
+            monkeypatch.setattr(genesis_api, "_RULES_PATH", "")
+            genesis_api._reload_rule_plan()
+        assert old["frameworks"]["dora"]["check_details"]["penetration_testing_done"] is False
+        assert "penetration_testing_done" not in new["frameworks"]["dora"]["check_details"]
+        assert _as(tenant).get(f"/api/posture/{tenant}/flips", params={"start": before}).json()["total_flips"] == 0
+
+    def test_check_restored_unchanged_is_not_a_flip(self, tenant, tmp_path, monkeypatch):
+        _as(tenant).patch(f"/api/posture/{tenant}", json={"mfa_enabled": True})
+        rules = {fw: [r for r in checks if r["check"] != "mfa_enabled"]
+                 for fw, checks in genesis_api.DEFAULT_COMPLIANCE_RULES.items()}
+        path = tmp_path / "rules.json"
+        path.write_text(json.dumps({"frameworks": rules}))
+        start = self._now()
+        monkeypatch.setattr(genesis_api, "_RULES_PATH", str(path))
+        try:
+            genesis_api._reload_rule_plan()
+            _as(tenant).patch(f"/api/posture/{tenant}", json={"mfa_enabled": True})  # writes the removal
+        finally:
+            monkeypatch.setattr(genesis_api, "_RULES_PATH", "")
+            genesis_api._reload_rule_plan()
+        _as(tenant).patch(f"/api/posture/{tenant}", json={"mfa_enabled": True})  # restored, still True
+        d = _as(tenant).get(f"/api/posture/{tenant}/flips", params={"start": start, "framework": "dora"}).json()
+        assert d["flips"] == []
+        at = _as(tenant).get(f"/api/posture/{tenant}/at", params={"ts": self._now(), "framework": "dora"}).json()
+        assert at["frameworks"]["dora"]["check_details"]["mfa_enabled"] is True
+
+    def test_unchanged_writes_add_no_history_rows(self, tenant):
+        import sqlite3
+
+        def rows():
+            with sqlite3.connect(genesis_api._DB_PATH) as conn:
+                return conn.execute("SELECT COUNT(*) FROM posture_history WHERE tenant_id=?", (tenant,)).fetchone()[0]
+
+        initial = rows()
+        assert initial == sum(len(v) for v in genesis_api._RULE_PLAN.frameworks.values())
+        for _ in range(5):
+            _as(tenant).put(f"/api/posture/{tenant}", json=COMPLIANCE_GAPS)
+        assert rows() == initial
+
+
 # ─── Audit Persistence ──────────────────────────────────────────────────────
 
 class TestAuditPersistence:
@@ -346,6 +906,22 @@ class TestSystemMetrics:
         assert 0 <= d["memory_usage_pct"] <= 100
         assert 0 <= d["disk_usage_pct"] <= 100
 
+    def test_served_from_background_sample(self):
+        import time
+        client.get("/api/system/metrics")  # sampler started and warm
+        start = time.perf_counter()
+        client.get("/api/system/metrics")
+        assert time.perf_counter() - start < 0.2
+        assert any(t.name == "genesis-host-sampler" for t in __import__("threading").enumerate())
+
+    def test_history_bounded_by_ring(self):
+        d = client.get("/api/system/metrics?history=5").json()
+        assert 1 <= len(d["history"]) <= 5
+        assert d["history"][-1]["timestamp"] == d["timestamp"]
+        assert "history" not in client.get("/api/system/metrics").json()
+        too_many = genesis_api._HOST_HISTORY + 1
+        assert client.get(f"/api/system/metrics?history={too_many}").status_code == 422
+
 
 # ─── Input Validation Bounds ────────────────────────────────────────────────
 
@@ -452,7 +1028,909 @@ class TestRateLimiting:
         r = client.post("/api/risk/score", json=body)
         assert r.status_code == 429
 
+    def test_metrics_exempt_from_rate_limit(self, monkeypatch):
+        monkeypatch.setattr(genesis_api, "_RATE_GLOBAL", 1)
+        _rate_buckets.clear()
+        for _ in range(3):
+            r = client.get("/metrics")
+            assert r.status_code == 200
+            assert "x-ratelimit-limit" not in r.headers
+        assert client.get("/api/health").status_code == 200
+
+    def test_ui_assets_exempt_from_rate_limit(self, monkeypatch):
+        monkeypatch.setattr(genesis_api, "_RATE_GLOBAL", 1)
+        _rate_buckets.clear()
+        for _ in range(3):
+            assert client.get("/ui/").status_code == 200
+
+
+
+
+# ─── JSON Responses ─────────────────────────────────────────────────────────
+
+class TestJsonResponses:
+    PAYLOAD = {"score": np.float64(42.5), "n": np.int64(3), "ok": np.bool_(True), "v": np.arange(3)}
+
+    def test_default_response_class(self):
+        assert app.router.default_response_class is genesis_api._JSONResponse
+
+    @pytest.mark.parametrize("use_orjson", [True, False])
+    def test_numpy_scalars_both_backends(self, monkeypatch, use_orjson):
+        if use_orjson and genesis_api.orjson is None:
+            pytest.skip("orjson not installed")
+        monkeypatch.setattr(genesis_api, "_USE_ORJSON", use_orjson)
+        assert json.loads(genesis_api._json_dumps(self.PAYLOAD)) == {"score": 42.5, "n": 3, "ok": True, "v": [0, 1, 2]}
+
+    def test_stdlib_backend_serves_endpoints(self, monkeypatch):
+        monkeypatch.setattr(genesis_api, "_USE_ORJSON", False)
+        r = client.post("/api/risk/score", json={"cpu": 50, "memory": 50, "network_io": 50, "disk_usage": 50,
+                                                 "error_rate": 1, "framework": "dora"})
+        assert r.status_code == 200
+        assert r.headers["content-type"] == "application/json"
+        assert r.json()["input_metrics"]["cpu"] == 50
+
+    def test_direct_response_keeps_cache_headers(self):
+        body = {**COMPLIANCE_FULL, "tenant_id": f"json_{uuid.uuid4().hex[:8]}"}
+        first = client.post("/api/compliance/gdpr", json=body)
+        second = client.post("/api/compliance/gdpr", json=body)
+        assert (first.headers["x-cache"], second.headers["x-cache"]) == ("MISS", "HIT")
+        assert first.json() == second.json()
+
+
+# ─── Queued Logging ─────────────────────────────────────────────────────────
+
+class TestQueuedLogging:
+    @staticmethod
+    def _logger(handler):
+        import logging
+        handler.setFormatter(genesis_api._JsonFormatter())
+        logger = logging.getLogger(f"genesis.test.{uuid.uuid4().hex[:8]}")
+        logger.handlers = [handler]
+        logger.propagate = False
+        return logger
+
+    def _handler(self, maxsize=100, sample=None, rate_cap=0):
+        import io
+        stream = io.StringIO()
+        return stream, genesis_api._QueueLogHandler(stream, maxsize, sample or {}, rate_cap)
+
+    def test_batched_write_with_extras(self):
+        stream, handler = self._handler()
+        log = self._logger(handler)
+        for i in range(5):
+            log.info("event", extra={"i": i})
+        handler.flush()
+        lines = [json.loads(line) for line in stream.getvalue().splitlines()]
+        assert [line["i"] for line in lines] == list(range(5))
+        handler.close()
+
+    def test_full_queue_drops_instead_of_blocking(self, monkeypatch):
+        stream, handler = self._handler(maxsize=2)
+        monkeypatch.setattr(handler, "_start", lambda: None)  # no writer: queue stays full
+        handler._pid = 0
+        log = self._logger(handler)
+        for _ in range(5):
+            log.info("event")
+        assert handler.dropped["queue_full"] == 3
+
+    def test_sampling_and_rate_cap_spare_warnings(self):
+        stream, handler = self._handler(sample={"noisy": 0.0}, rate_cap=3)
+        log = self._logger(handler)
+        for _ in range(10):
+            log.info("noisy")
+            log.info("chatty")
+        log.warning("noisy")
+        handler.flush()
+        msgs = [json.loads(line)["msg"] for line in stream.getvalue().splitlines()]
+        assert msgs.count("noisy") == 1 and msgs.count("chatty") <= 6
+        assert handler.dropped["sampled"] == 10
+        assert handler.dropped["rate_capped"] >= 4
+        handler.close()
+
+    def test_request_context_attached(self):
+        import logging
+        scope = {"route": None, "state": {"tenant_id": "bank_x"}, "genesis.t0": 100.0}
+        record = logging.makeLogRecord({"msg": "event", "created": 100.25})
+        record.request = scope
+        line = json.loads(genesis_api._JsonFormatter().format(record))
+        assert (line["route"], line["tenant"], line["latency_ms"]) == ("unmatched", "bank_x", 250.0)
+
+    def test_drop_counters_exported(self):
+        r = TestClient(app).get("/metrics")
+        assert 'genesis_log_records_dropped_total{reason="queue_full"}' in r.text
+        assert "genesis_log_queue_depth" in r.text
+
+
+# ─── Request Timing ─────────────────────────────────────────────────────────
+
+class TestRequestTiming:
+    def test_latency_histogram_exported_per_route(self):
+        client.post("/api/compliance/dora", json=COMPLIANCE_FULL)
+        text = TestClient(app).get("/metrics").text
+        assert "# TYPE genesis_http_request_duration_seconds histogram" in text
+        assert _sample(text, "genesis_http_request_duration_seconds_bucket",
+                       route="/api/compliance/{framework}", status="200", le="+Inf") >= 1
+
+    def test_error_counter_by_route(self):
+        client.post("/api/compliance/fake_framework", json=COMPLIANCE_FULL)
+        text = TestClient(app).get("/metrics").text
+        assert _sample(text, "genesis_http_errors_total", route="/api/compliance/{framework}", **{"class": "4xx"}) >= 1
 
+    def test_in_flight_gauge_present(self):
+        text = TestClient(app).get("/metrics").text
+        assert "genesis_http_requests_in_flight 0" in text
+
+    def test_phase_histograms_recorded(self):
+        client.post("/api/risk/score", json={**METRICS_LOW, "framework": "dora"})
+        text = TestClient(app).get("/metrics").text
+        for phase in ("auth", "rate", "score", "audit"):
+            assert f'genesis_phase_duration_seconds_count{{phase="{phase}"}}' in text
+
+    def test_server_timing_off_by_default(self, monkeypatch):
+        monkeypatch.setattr(genesis_api, "_SERVER_TIMING", False)
+        r = client.post("/api/risk/score", json={**METRICS_LOW, "framework": "dora"})
+        assert "server-timing" not in r.headers
+
+    def test_server_timing_phases(self, monkeypatch):
+        monkeypatch.setattr(genesis_api, "_SERVER_TIMING", True)
+        r = client.post("/api/risk/score", json={**METRICS_LOW, "framework": "dora"})
+        timing = r.headers["server-timing"]
+        for phase in ("rate", "auth", "score", "audit", "total"):
+            assert f"{phase};dur=" in timing
+
+
+class TestPrometheus:
+    def _scrape(self) -> str:
+        return TestClient(app).get("/metrics").text
+
+    def test_exposition_format(self):
+        r = TestClient(app).get("/metrics")
+        assert r.headers["content-type"].startswith("text/plain")
+        names = {f.name for f in text_string_to_metric_families(r.text)}
+        assert {"genesis_up", "genesis_audit_entries", "genesis_api_keys_total", "genesis_http_request_duration_seconds"} <= names
+
+    def test_scrape_runs_no_sql(self, monkeypatch):
+        import threading
+        real_connect = genesis_api.sqlite3.connect
+        callers = []
+
+        def tracking_connect(*args, **kwargs):
+            callers.append(threading.current_thread().name)
+            return real_connect(*args, **kwargs)
+
+        genesis_api._probes.wait_ready()
+        monkeypatch.setattr(genesis_api.sqlite3, "connect", tracking_connect)
+        for _ in range(3):
+            assert "genesis_audit_entries_total" in self._scrape()
+        assert [c for c in callers if c != "genesis-probes"] == []
+
+    def test_audit_entries_match_log(self):
+        client.post("/api/risk/score", json={**METRICS_LOW, "framework": "dora"})
+        genesis_api._probes.run_once()
+        total = client.get("/api/audit?limit=1").json()["total_entries"]
+        assert _sample(self._scrape(), "genesis_audit_entries_total") == total
+
+    def test_risk_scores_by_framework_and_level(self):
+        text = self._scrape()
+        before = _sample(text, "genesis_risk_scores_total", framework="gdpr", level="MINIMAL") or 0
+        client.post("/api/risk/score", json={**METRICS_LOW, "framework": "gdpr"})
+        assert _sample(self._scrape(), "genesis_risk_scores_total", framework="gdpr", level="MINIMAL") == before + 1
+
+    def test_compliance_outcomes_and_cache(self):
+        posture = {**COMPLIANCE_FULL, "tenant_id": f"prom_{uuid.uuid4().hex}"}
+        text = self._scrape()
+        evaluated = _sample(text, "genesis_compliance_evaluations_total", framework="dora", status="COMPLIANT") or 0
+        hits = _sample(text, "genesis_compliance_cache_hits_total")
+        client.post("/api/compliance/dora", json=posture)
+        client.post("/api/compliance/dora", json=posture)
+        text = self._scrape()
+        assert _sample(text, "genesis_compliance_evaluations_total", framework="dora", status="COMPLIANT") == evaluated + 1
+        assert _sample(text, "genesis_compliance_cache_hits_total") == hits + 1
+
+    def test_signatures_counted(self):
+        before = _sample(self._scrape(), "genesis_signatures_total", provider="dtrust") or 0
+        client.post("/api/cert/sign", json={"document_name": "r.pdf", "signer": "o", "provider": "dtrust"})
+        assert _sample(self._scrape(), "genesis_signatures_total", provider="dtrust") == before + 1
+
+    def test_llm_offline_counted(self, monkeypatch):
+        monkeypatch.setattr(genesis_api, "_llama", _fake_llama(down=True))
+        before = _sample(self._scrape(), "genesis_llm_requests_total", outcome="offline") or 0
+        r = client.post("/api/ai/explain", json={"risk_score": 45.0, "risk_level": "MEDIUM", "framework": "dora"})
+        assert r.status_code == 503
+        assert _sample(self._scrape(), "genesis_llm_requests_total", outcome="offline") == before + 1
+
+    def test_audit_queue_drains(self):
+        client.post("/api/risk/score", json={**METRICS_LOW, "framework": "dora"})
+        text = self._scrape()
+        assert _sample(text, "genesis_audit_queue_depth") == 0
+        assert _sample(text, "genesis_audit_writes_total") >= 1
+
+    def test_multiprocess_workers_are_aggregated(self, tmp_path):
+        import subprocess
+        env = {**os.environ, "PROMETHEUS_MULTIPROC_DIR": str(tmp_path / "prom"),
+               "GENESIS_DB_PATH": str(tmp_path / "audit.db"), "GENESIS_RATE_WRITE": "100000"}
+        worker = (
+            "import genesis_api; from fastapi.testclient import TestClient; "
+            "c = TestClient(genesis_api.app, headers={'X-API-Key': 'genesis-dev-key'}); "
+            "[c.post('/api/risk/score', json={'cpu': 20, 'memory': 15, 'network_io': 5, 'disk_usage': 20, "
+            "'error_rate': 0, 'framework': 'psd2'}) for _ in range(3)]"
+        )
+        scrape = "import genesis_api; from fastapi.testclient import TestClient; print(TestClient(genesis_api.app).get('/metrics').text)"
+        root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        for _ in range(2):
+            subprocess.run([sys.executable, "-c", worker], env=env, cwd=root, check=True, capture_output=True, timeout=60)
+        text = subprocess.run([sys.executable, "-c", scrape], env=env, cwd=root, check=True,
+                              capture_output=True, text=True, timeout=60).stdout
+        assert _sample(text, "genesis_risk_scores_total", framework="psd2", level="MINIMAL") == 6
+        assert _sample(text, "genesis_http_request_duration_seconds_count",
+                       method="POST", route="/api/risk/score", status="200") == 6
+        assert _sample(text, "genesis_http_requests_in_flight") == 0  # exited workers drop out of live gauges
+
+
+class TestErrorRate:
+    def test_rolling_window_buckets(self):
+        w = genesis_api._RollingWindow()
+        for status in (200, 200, 404, 503):
+            w.record(("/r", "t"), status, now=1000.0)
+        w.record(("/r", "t"), 500, now=1000.0 - 600)  # outside a 300 s window
+        assert w.totals(300, now=1000.0) == {("/r", "t"): [4, 1, 1]}
+        assert w.totals(3600, now=1000.0) == {("/r", "t"): [5, 1, 2]}
+
+    def test_ring_reuses_expired_buckets(self):
+        w = genesis_api._RollingWindow()
+        w.record(("/r", "t"), 500, now=0.0)
+        w.record(("/r", "t"), 200, now=w.SPAN)  # same ring slot one span later
+        assert w.totals(3600, now=w.SPAN) == {("/r", "t"): [1, 0, 0]}
+        assert w.totals(3600, now=w.SPAN * 3) == {}
+
+    def test_aggregate_needs_no_key_scan(self, monkeypatch):
+        w = genesis_api._RollingWindow()
+        for i, status in enumerate((200, 404, 500, 200, 503)):
+            w.record(("/r", f"t{i}"), status)
+        assert w.aggregate(300) == [5, 1, 2]
+        assert [sum(c) for c in zip(*w.totals(300).values())] == [5, 1, 2]
+        monkeypatch.setattr(genesis_api, "_request_outcomes", w)
+        monkeypatch.setattr(w, "totals", None)  # the sampler's aggregate must not walk the keys
+        assert genesis_api._error_rates(300)["error_rate_pct"] == 60.0
+
+    def test_idle_rows_are_recycled(self):
+        w = genesis_api._RollingWindow(capacity=1)
+        w.record(("/r", "a"), 500, now=0.0)
+        assert w.totals(3600, now=w.SPAN * 3) == {}
+        w.record(("/r", "b"), 200, now=w.SPAN * 3)
+        assert w._counts.shape[1] == 1  # row reused, block not grown
+        assert w.totals(3600, now=w.SPAN * 3) == {("/r", "b"): [1, 0, 0]}
+
+    def test_policy_rejections_are_not_errors(self):
+        w = genesis_api._RollingWindow()
+        for status in (200, 401, 429, 404):
+            w.record(("/r", "t"), status, now=1000.0)
+        assert w.totals(300, now=1000.0) == {("/r", "t"): [4, 1, 0]}
+
+    def test_host_samples_carry_live_error_rate(self, monkeypatch):
+        import time
+        w = genesis_api._RollingWindow()
+        monkeypatch.setattr(genesis_api, "_request_outcomes", w)
+        for _ in range(3):
+            client.post("/api/compliance/not_a_framework", json=COMPLIANCE_FULL)
+        genesis_api._host_sampler.wait_ready()
+        deadline = time.monotonic() + 5
+        while genesis_api._host_sampler.latest()["error_rate_pct"] != 100.0 and time.monotonic() < deadline:
+            time.sleep(0.05)  # next sample (GENESIS_HOST_SAMPLE_INTERVAL) picks the 404s up
+        d = client.get("/api/system/metrics?history=1").json()
+        assert d["error_rate_pct"] == 100.0
+        assert d["history"][-1]["error_rate_pct"] == 100.0
+
+    def test_lifespan_starts_background_workers(self, monkeypatch):
+        started = []
+        monkeypatch.setattr(genesis_api._host_sampler, "start", lambda: started.append("host"))
+        monkeypatch.setattr(genesis_api._probes, "start", lambda: started.append("probes"))
+        with TestClient(app):
+            assert started == ["host", "probes"]
+
+    def test_tracked_per_tenant(self, monkeypatch):
+        w = genesis_api._RollingWindow()
+        monkeypatch.setattr(genesis_api, "_request_outcomes", w)
+        client.get("/api/audit?limit=1")
+        TestClient(app).get("/api/audit")  # 401, no tenant
+        keys = set(w.totals(300))
+        assert ("/api/audit", "default") in keys and ("/api/audit", "anonymous") in keys
+
+    def test_auto_score_uses_live_signals(self, monkeypatch):
+        w = genesis_api._RollingWindow()
+        monkeypatch.setattr(genesis_api, "_request_outcomes", w)
+        client.post("/api/compliance/not_a_framework", json=COMPLIANCE_FULL)
+        d = client.get("/api/risk/auto?framework=dora&window=60&tenant_id=default").json()
+        assert d["input_metrics"]["error_rate"] == 100.0
+        assert d["signals"]["errors"]["requests"] == 1
+        assert 0 <= d["risk_score"] <= 100
+
+    def test_auto_score_window_bounds(self):
+        assert client.get("/api/risk/auto?window=30").status_code == 422
+        assert client.get("/api/risk/auto?window=7200").status_code == 422
+
+    def test_error_rate_gauge_exported(self):
+        client.post("/api/compliance/not_a_framework", json=COMPLIANCE_FULL)
+        assert 'genesis_http_error_rate_pct{route="/api/compliance/{framework}"' in TestClient(app).get("/metrics").text
+
+
+class TestMetricsHistory:
+    TIERS = (("1s", 1, 120), ("1m", 60, 10), ("1h", 3600, 4))
+
+    def _history(self):
+        return genesis_api._MetricsHistory(("cpu", "mem"), self.TIERS)
+
+    def test_minute_tier_aggregates_min_max_mean(self):
+        h = self._history()
+        t0 = 1_800_000_000  # minute-aligned
+        for i in range(180):
+            h.record({"cpu": float(i % 60), "mem": 50.0}, t0 + i)
+        d = h.query(["cpu", "mem"], t0, t0 + 179, h.tiers[1])
+        assert d["timestamps"] == [t0, t0 + 60, t0 + 120]
+        assert d["series"]["cpu"]["min"] == [0.0, 0.0, 0.0]
+        assert d["series"]["cpu"]["max"] == [59.0, 59.0, 59.0]
+        assert d["series"]["cpu"]["mean"] == [29.5, 29.5, 29.5]
+        assert d["series"]["mem"]["mean"] == [50.0, 50.0, 50.0]
+
+    def test_rings_wrap_and_memory_is_fixed(self):
+        h = self._history()
+        size = h.nbytes
+        t0 = 1_800_000_000
+        for i in range(1000):
+            h.record({"cpu": float(i), "mem": 1.0}, t0 + i)
+        assert h.nbytes == size
+        d = h.query(["cpu"], t0, t0 + 999, h.tiers[0])
+        assert len(d["timestamps"]) == 120        # only the last 120 one-second slots survive
+        assert d["timestamps"][-1] == t0 + 999    # open bucket included
+        assert d["series"]["cpu"]["mean"][0] == 880.0
+
+    def test_missing_series_value_is_null(self):
+        h = self._history()
+        h.record({"cpu": 10.0}, 1_800_000_000)
+        assert h.query(["mem"], 1_800_000_000, 1_800_000_000, h.tiers[0])["series"]["mem"]["mean"] == [None]
+
+    def test_tier_selection_by_range(self):
+        h = self._history()
+        now = 1_800_000_000
+        assert h.pick_tier(now - 60, now).name == "1s"
+        assert h.pick_tier(now - 300, now).name == "1m"
+        assert h.pick_tier(now - 86400, now).name == "1h"
+
+    def test_endpoint_serves_recorded_samples(self):
+        import time
+        genesis_api._metrics_history.record({"cpu_usage_pct": -1.0, "risk_dora": 17.5}, time.time())
+        r = client.get("/api/metrics/history?series=cpu_usage_pct,risk_dora&resolution=1s")
+        assert r.status_code == 200
+        d = r.json()
+        assert d["resolution"] == "1s" and d["timestamps"]
+        assert set(d["series"]) == {"cpu_usage_pct", "risk_dora"}
+        assert -1.0 in d["series"]["cpu_usage_pct"]["min"]  # below any real sample sharing the bucket
+
+    def test_endpoint_defaults_to_last_hour_at_one_second(self):
+        d = client.get("/api/metrics/history").json()
+        assert d["resolution"] == "1s"
+        assert d["end"] - d["start"] == 3600
+
+    def test_unknown_series_or_resolution_is_422(self):
+        assert client.get("/api/metrics/history?series=nope").status_code == 422
+        assert client.get("/api/metrics/history?resolution=5m").status_code == 422
+
+    def test_history_size_exported(self):
+        assert _sample(client.get("/metrics").text, "genesis_metrics_history_bytes") == genesis_api._metrics_history.nbytes
+
+
+class TestAssessmentStream:
+    @pytest.fixture(autouse=True)
+    def fast_ticks(self, monkeypatch):
+        monkeypatch.setattr(genesis_api._assessments, "interval", 0.05)
+
+    @staticmethod
+    def _events(text):
+        return [json.loads(line[len("data: "):]) for line in text.splitlines() if line.startswith("data: ")]
+
+    def test_sse_snapshots(self):
+        r = client.get("/api/stream/assessments?limit=2")
+        assert r.status_code == 200
+        assert r.headers["content-type"].startswith("text/event-stream")
+        events = self._events(r.text)
+        assert len(events) == 2
+        assert set(events[-1]["frameworks"]) == set(FRAMEWORKS)
+        assert events[-1]["seq"] > events[0]["seq"] or events[0] is events[-1]
+        for key in ("host", "errors", "health"):
+            assert key in events[-1]
+
+    def test_scores_match_risk_engine(self):
+        event = self._events(client.get("/api/stream/assessments?limit=1").text)[0]
+        host, err = event["host"], event["errors"]["error_rate_pct"]
+        score, _ = _predict_risk(host["cpu_usage_pct"], host["memory_usage_pct"], host["network_io_mbps"],
+                                 host["disk_usage_pct"], err, "dora")
+        assert event["frameworks"]["dora"]["risk_score"] == round(score, 2)
+
+    def test_websocket_broadcast(self):
+        with client.websocket_connect("/api/stream/ws") as ws:
+            first, second = ws.receive_json(), ws.receive_json()
+        assert first["type"] == "assessment"
+        assert second["seq"] > first["seq"]
+
+    def test_one_scoring_loop_for_many_subscribers(self, monkeypatch):
+        import asyncio
+        calls = []
+
+        async def fake_assess():
+            calls.append(1)
+            return {"frameworks": {}}
+
+        monkeypatch.setattr(genesis_api, "_assess_live", fake_assess)
+
+        async def scenario():
+            b = genesis_api._AssessmentBroadcaster(0.01)
+            queues = [b.subscribe() for _ in range(5)]
+            received = [[(await q.get())["seq"] for _ in range(3)] for q in queues]
+            for q in queues:
+                b.unsubscribe(q)
+            await asyncio.sleep(0.05)
+            return received, b._task.done()
+
+        received, stopped = asyncio.run(scenario())
+        assert all(r == received[0] for r in received)  # every subscriber got the same snapshots
+        assert len(calls) < 10                           # scored once per tick, not once per subscriber
+        assert stopped                                   # loop exits with the last subscriber
+
+    def test_no_audit_rows_per_tick(self):
+        before = client.get("/api/audit").json()["total_entries"]
+        client.get("/api/stream/assessments?limit=3")
+        assert client.get("/api/audit").json()["total_entries"] == before
+
+    def test_slow_subscriber_queue_is_bounded(self):
+        import asyncio
+
+        async def scenario():
+            b = genesis_api._AssessmentBroadcaster(3600)
+            q = b.subscribe()
+            b._task.cancel()
+            for _ in range(genesis_api._STREAM_BACKLOG * 3):
+                b.publish({"frameworks": {}})
+            return q.qsize(), q.get_nowait()["seq"], b.seq
+
+        size, oldest, last = asyncio.run(scenario())
+        assert size == genesis_api._STREAM_BACKLOG
+        assert oldest == last - genesis_api._STREAM_BACKLOG + 1
+
+
+class TestRuntimeTelemetry:
+    def test_heartbeat_measures_blocked_loop(self):
+        import asyncio
+        import time
+        rt = genesis_api._RuntimeTelemetry(0.02)
+
+        async def scenario():
+            rt.ensure_running()
+            await asyncio.sleep(0.05)
+            time.sleep(0.2)  # block the loop
+            await asyncio.sleep(0.05)
+            rt._task.cancel()
+
+        asyncio.run(scenario())
+        assert max(rt.lag) >= 0.15
+        assert rt.snapshot()["event_loop_lag_ms"]["max_1m"] >= 150
+
+    def test_threadpool_occupancy(self):
+        import asyncio
+        import time
+        from anyio import to_thread
+        rt = genesis_api._RuntimeTelemetry(0.01)
+
+        async def scenario():
+            rt.ensure_running()
+            jobs = [asyncio.create_task(to_thread.run_sync(time.sleep, 0.15)) for _ in range(3)]
+            await asyncio.sleep(0.08)
+            seen = dict(rt.threadpool)
+            await asyncio.gather(*jobs)
+            rt._task.cancel()
+            return seen
+
+        seen = asyncio.run(scenario())
+        assert seen["busy"] == 3
+        assert seen["size"] >= 3
+
+    def test_gc_pauses_recorded_per_generation(self):
+        import gc
+        before = genesis_api._runtime.snapshot()["gc"]["2"]["collections"]
+        gc.collect()
+        gen2 = genesis_api._runtime.snapshot()["gc"]["2"]
+        assert gen2["collections"] == before + 1
+        assert gen2["pause_ms_max"] > 0
+        assert _sample(TestClient(app).get("/metrics").text, "genesis_gc_pause_seconds_count", generation="2") >= 1
+
+    def test_metrics_exported(self):
+        text = TestClient(app).get("/metrics").text
+        for name in ("genesis_event_loop_lag_seconds_count", "genesis_threadpool_busy",
+                     "genesis_process_rss_bytes", "genesis_python_allocated_blocks"):
+            assert _sample(text, name) is not None, name
+        assert _sample(text, "genesis_process_rss_bytes") > 0
+
+    def test_health_detail_includes_runtime(self):
+        rt = client.get("/api/health?detail=true").json()["runtime"]
+        assert set(rt) == {"event_loop_lag_ms", "threadpool", "gc", "memory"}
+        assert set(rt["gc"]) == {"0", "1", "2"}
+        assert rt["memory"]["rss_mb"] > 0
+        assert "runtime" not in client.get("/api/health").json()
+
+
+class TestExecutors:
+    def test_saturation_metrics_exported(self):
+        client.post("/api/risk/score", json={**METRICS_LOW, "framework": "dora"})
+        text = TestClient(app).get("/metrics").text
+        for pool in ("db-writer", "db-reader", "metrics"):
+            assert f'genesis_executor_workers{{pool="{pool}"}}' in text
+            assert f'genesis_executor_queued{{pool="{pool}"}} 0' in text
+        assert 'genesis_executor_wait_seconds_count{pool="db-writer"}' in text
+
+    def test_single_db_writer(self):
+        assert genesis_api._db_writer.size == 1
+
+    def test_cancelled_while_queued_leaves_queue(self):
+        import asyncio
+        import threading
+        pool = genesis_api._Executor("test-cancel", 1)
+        release = threading.Event()
+
+        def queued():
+            return _sample(TestClient(app).get("/metrics").text, "genesis_executor_queued", pool="test-cancel")
+
+        async def scenario():
+            busy = asyncio.ensure_future(pool.run(release.wait))
+            await asyncio.sleep(0.05)
+            waiting = asyncio.ensure_future(pool.run(lambda: None))
+            await asyncio.sleep(0.05)
+            assert queued() == 1
+            waiting.cancel()
+            await asyncio.gather(waiting, return_exceptions=True)
+            release.set()
+            await busy
+
+        asyncio.run(scenario())
+        assert queued() == 0
+
+    def test_slow_llm_does_not_starve_db_reads(self, monkeypatch):
+        import asyncio
+        import time
+        import httpx
+
+        monkeypatch.setattr(genesis_api, "_llama", _fake_llama(delay=0.5, slots=3 * genesis_api._db_readers.size))
+
+        async def scenario():
+            transport = httpx.ASGITransport(app=app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://test",
+                                         headers={"X-API-Key": "genesis-dev-key"}) as ac:
+                llm = [asyncio.create_task(ac.post("/api/ai/explain", json=TestLlamaClient._explain()))
+                       for _ in range(3 * genesis_api._db_readers.size)]
+                await asyncio.sleep(0.05)
+                start = time.perf_counter()
+                audit = await ac.get("/api/audit?limit=1")
+                elapsed = time.perf_counter() - start
+                await asyncio.gather(*llm)
+                return audit.status_code, elapsed
+
+        status, elapsed = asyncio.run(scenario())
+        assert status == 200
+        assert elapsed < 0.4
+
+
+class TestLlamaClient:
+    @staticmethod
+    def _explain() -> dict:
+        """Explain request that misses the explanation cache (unique required action)."""
+        return {"risk_score": 72.5, "risk_level": "HIGH", "framework": "dora",
+                "feature_importance": {"cpu": 0.4, "memory": 0.3}, "regulatory_action": uuid.uuid4().hex}
+
+    def test_explain_returns_completion(self, monkeypatch):
+        monkeypatch.setattr(genesis_api, "_llama", _fake_llama())
+        r = client.post("/api/ai/explain", json=self._explain())
+        assert r.status_code == 200
+        assert r.json()["explanation"] == "CPU load drives the score."
+
+    def test_loading_model_is_offline(self, monkeypatch):
+        monkeypatch.setattr(genesis_api, "_llama", _fake_llama(status=503))
+        r = client.post("/api/ai/explain", json=self._explain())
+        assert r.status_code == 503
+
+    def test_deadline_returns_504(self, monkeypatch):
+        monkeypatch.setattr(genesis_api, "_llama", _fake_llama(delay=0.5, timeout=0.1))
+        before = _sample(TestClient(app).get("/metrics").text, "genesis_llm_requests_total", outcome="timeout") or 0
+        r = client.post("/api/ai/explain", json=self._explain())
+        assert r.status_code == 504
+        assert _sample(TestClient(app).get("/metrics").text, "genesis_llm_requests_total", outcome="timeout") == before + 1
+
+    def test_in_flight_completions_capped_at_slots(self):
+        import asyncio
+        import httpx
+        active, peak = 0, 0
+
+        async def handler(request):
+            nonlocal active, peak
+            active += 1
+            peak = max(peak, active)
+            await asyncio.sleep(0.02)
+            active -= 1
+            return httpx.Response(200, json={"choices": [{"message": {"content": "ok"}}]})
+
+        llama = genesis_api._LlamaClient("http://llama.test", 2, 5.0, transport=httpx.MockTransport(handler))
+
+        async def burst():
+            return await asyncio.gather(*(llama.complete("explain") for _ in range(8)))
+
+        assert asyncio.run(burst()) == ["ok"] * 8
+        assert peak == 2
+
+    def test_slot_wait_counts_against_deadline(self):
+        import asyncio
+        llama = _fake_llama(delay=0.3, slots=1, timeout=0.45)
+
+        async def pair():
+            return await asyncio.gather(llama.complete("a"), llama.complete("b"), return_exceptions=True)
+
+        first, second = asyncio.run(pair())
+        assert first == "CPU load drives the score."
+        assert isinstance(second, TimeoutError)
+
+    def test_connection_pool_reused_within_loop(self):
+        import asyncio
+        llama = _fake_llama()
+
+        async def clients():
+            return llama._bind()[0], llama._bind()[0]
+
+        a, b = asyncio.run(clients())
+        assert a is b
+        c, _ = asyncio.run(clients())
+        assert c is not a
+        assert a.is_closed and c.is_closed  # closed before asyncio.run() closed their loops
+
+    def test_rebind_closes_previous_client_on_its_loop(self):
+        import asyncio
+        import threading
+        import time
+        llama = _fake_llama()
+
+        async def bind():
+            return llama._bind()[0]
+
+        other = asyncio.new_event_loop()
+        runner = threading.Thread(target=other.run_forever, daemon=True)
+        runner.start()
+        try:
+            old = asyncio.run_coroutine_threadsafe(bind(), other).result(5)
+            asyncio.run(bind())
+            deadline = time.monotonic() + 5
+            while not old.is_closed and time.monotonic() < deadline:
+                time.sleep(0.01)
+            assert old.is_closed
+        finally:
+            other.call_soon_threadsafe(other.stop)
+            runner.join(5)
+            other.close()
+
+    def test_pool_closed_with_its_loop(self):
+        import asyncio
+        import http.server
+        import threading
+        closed = threading.Event()
+
+        class Handler(http.server.BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"  # keep-alive: the connection stays pooled
+
+            def do_POST(self):
+                self.rfile.read(int(self.headers["Content-Length"]))
+                body = json.dumps({"choices": [{"message": {"content": "ok"}}]}).encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def finish(self):
+                super().finish()
+                closed.set()
+
+            def log_message(self, *args):
+                pass
+
+        srv = http.server.ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        threading.Thread(target=srv.serve_forever, daemon=True).start()
+        try:
+            llama = genesis_api._LlamaClient(f"http://127.0.0.1:{srv.server_port}", 1, 5.0)
+
+            async def twice():
+                first = await llama.complete("a")
+                await llama.complete("b")
+                return first, closed.is_set()
+
+            assert asyncio.run(twice()) == ("ok", False)  # one pooled keep-alive connection
+            assert closed.wait(5)  # closed when asyncio.run() finished, not at garbage collection
+        finally:
+            srv.shutdown()
+            srv.server_close()
+
+    def test_lifespan_shutdown_closes_pool(self, monkeypatch):
+        llama = _fake_llama()
+        monkeypatch.setattr(genesis_api, "_llama", llama)
+        with TestClient(app, headers=client.headers) as c:
+            assert c.post("/api/ai/explain", json=self._explain()).status_code == 200
+            http = llama._http
+        assert http.is_closed and llama._http is None
+
+
+class TestExplanationCache:
+    def _counting_llama(self, monkeypatch) -> list:
+        import httpx
+        calls = []
+
+        async def handler(request):
+            calls.append(request.url.path)
+            return httpx.Response(200, json={"choices": [{"message": {"content": "Cached answer."}}]})
+
+        monkeypatch.setattr(genesis_api, "_llama",
+                            genesis_api._LlamaClient("http://llama.test", 2, 5.0, transport=httpx.MockTransport(handler)))
+        return calls
+
+    def test_repeat_served_from_memory(self, monkeypatch):
+        calls = self._counting_llama(monkeypatch)
+        body = TestLlamaClient._explain()
+        before = _sample(TestClient(app).get("/metrics").text, "genesis_explain_cache_hits_total", tier="memory") or 0
+        first = client.post("/api/ai/explain", json=body)
+        second = client.post("/api/ai/explain", json=body)
+        assert (first.headers["x-cache"], second.headers["x-cache"]) == ("MISS", "HIT")
+        assert second.json()["explanation"] == first.json()["explanation"] == "Cached answer."
+        assert len(calls) == 1
+        assert _sample(TestClient(app).get("/metrics").text, "genesis_explain_cache_hits_total", tier="memory") == before + 1
+
+    def test_survives_restart(self, monkeypatch):
+        import asyncio
+        calls = self._counting_llama(monkeypatch)
+        body = TestLlamaClient._explain()
+        client.post("/api/ai/explain", json=body)
+        genesis_api._explanations.clear()  # process restart: memory tier gone, table kept
+        again = client.post("/api/ai/explain", json=body)
+        assert again.headers["x-cache"] == "HIT"
+        assert len(calls) == 1
+        fresh = genesis_api._ExplanationCache(8, 100, 3600)
+        req = genesis_api.LlamaExplainRequest(**body)
+        key = genesis_api._explain_key(os.path.basename(genesis_api.LLAMA_MODEL), req.max_tokens,
+                                       genesis_api._explain_prompt(req))
+        assert asyncio.run(fresh.get(key)) == "Cached answer."
+
+    def test_entries_expire(self):
+        import asyncio
+        import time
+        cache = genesis_api._ExplanationCache(8, 100, ttl=0.05)
+        key = uuid.uuid4().hex
+
+        async def roundtrip():
+            await cache.put(key, "m", "short-lived")
+            hit = await cache.get(key)
+            time.sleep(0.06)
+            return hit, await cache.get(key)
+
+        assert asyncio.run(roundtrip()) == ("short-lived", None)
+
+    def test_table_trimmed_to_row_cap(self):
+        import sqlite3
+        import time
+        cache = genesis_api._ExplanationCache(0, 3, 3600)
+        keys = [f"cap-{uuid.uuid4().hex}" for _ in range(5)]
+        now = time.time() + 60  # newer than anything else in the shared table
+        for i, key in enumerate(keys):
+            cache._insert(key, "m", f"text {i}", now + i)
+        cache.purge()
+        with sqlite3.connect(genesis_api._DB_PATH) as conn:
+            kept = {row[0] for row in conn.execute("SELECT key FROM explanation_cache")}
+        assert kept == set(keys[2:])
+
+    def test_score_bucketing_shares_prompt(self):
+        def req(score):
+            return genesis_api.LlamaExplainRequest(risk_score=score, risk_level="HIGH", framework="dora",
+                                                   feature_importance={"memory": 0.3, "cpu": 0.3})
+
+        assert genesis_api._explain_prompt(req(71.2), 5) == genesis_api._explain_prompt(req(68.9), 5)
+        assert genesis_api._explain_prompt(req(71.2)) != genesis_api._explain_prompt(req(68.9))
+        assert "cpu=30.0%, memory=30.0%" in genesis_api._explain_prompt(req(71.2))
+
+
+def _sse_events(text: str) -> list[tuple[str, dict]]:
+    events = []
+    for block in text.strip().split("\n\n"):
+        fields = dict(line.split(": ", 1) for line in block.splitlines())
+        events.append((fields["event"], json.loads(fields["data"])))
+    return events
+
+
+class TestExplainStream:
+    def test_tokens_then_done(self, monkeypatch):
+        monkeypatch.setattr(genesis_api, "_llama", _fake_llama())
+        body = TestLlamaClient._explain()
+        r = client.post("/api/ai/explain/stream", json=body)
+        assert r.status_code == 200
+        assert r.headers["content-type"].startswith("text/event-stream")
+        assert r.headers["x-cache"] == "MISS"
+        events = _sse_events(r.text)
+        tokens = [d["text"] for e, d in events if e == "token"]
+        assert len(tokens) == 5
+        assert "".join(tokens) == "CPU load drives the score."
+        assert events[-1][0] == "done"
+        assert events[-1][1]["explanation"] == "CPU load drives the score."
+
+        again = client.post("/api/ai/explain/stream", json=body)
+        assert again.headers["x-cache"] == "HIT"
+        assert _sse_events(again.text)[-1][1]["explanation"] == "CPU load drives the score."
+
+    def test_offline_before_first_token_is_503(self, monkeypatch):
+        monkeypatch.setattr(genesis_api, "_llama", _fake_llama(down=True))
+        r = client.post("/api/ai/explain/stream", json=TestLlamaClient._explain())
+        assert r.status_code == 503
+
+    def test_client_disconnect_cancels_upstream(self, monkeypatch):
+        import asyncio
+        import httpx
+        upstream_closed = []
+
+        class SlowTokens(httpx.AsyncByteStream):
+            async def __aiter__(self):
+                for i in range(1000):
+                    yield f'data: {{"choices": [{{"delta": {{"content": "t{i} "}}}}]}}\n\n'.encode()
+                    await asyncio.sleep(0.01)
+
+            async def aclose(self):
+                upstream_closed.append(True)
+
+        def handler(request):
+            return httpx.Response(200, stream=SlowTokens(), headers={"Content-Type": "text/event-stream"})
+
+        llama = genesis_api._LlamaClient("http://llama.test", 1, 30.0, transport=httpx.MockTransport(handler))
+        monkeypatch.setattr(genesis_api, "_llama", llama)
+        def scrape():
+            return _sample(TestClient(app).get("/metrics").text, "genesis_llm_requests_total", outcome="cancelled") or 0
+
+        before = scrape()
+        payload = json.dumps(TestLlamaClient._explain()).encode()
+        scope = {
+            "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "POST", "scheme": "http",
+            "path": "/api/ai/explain/stream", "raw_path": b"/api/ai/explain/stream", "query_string": b"",
+            "root_path": "", "client": ("127.0.0.1", 5000), "server": ("testserver", 80),
+            "headers": [(b"content-type", b"application/json"), (b"x-api-key", b"genesis-dev-key"),
+                        (b"content-length", str(len(payload)).encode())],
+        }
+
+        async def scenario():
+            got_tokens = asyncio.Event()
+            sent = []
+            requested, tokens_sent = False, 0
+
+            async def receive():
+                nonlocal requested
+                if not requested:
+                    requested = True
+                    return {"type": "http.request", "body": payload, "more_body": False}
+                await got_tokens.wait()
+                return {"type": "http.disconnect"}
+
+            async def send(message):
+                nonlocal tokens_sent
+                sent.append(message)
+                tokens_sent += message.get("body", b"").count(b"event: token")
+                if tokens_sent >= 3:
+                    got_tokens.set()
+
+            await asyncio.wait_for(app(scope, receive, send), timeout=5)
+            return sent, llama._sem
+
+        sent, sem = asyncio.run(scenario())
+        assert sent[0]["status"] == 200
+        tokens = b"".join(m.get("body", b"") for m in sent).count(b"event: token")
+        assert 3 <= tokens < 100
+        assert upstream_closed
+        assert not sem.locked()  # slot released
+        assert scrape() == before + 1
 
 
 class TestQES:
@@ -545,3 +2023,50 @@ class TestKeyManagement:
         r = TestClient(app).get("/metrics")
         assert r.status_code == 200
         assert "genesis_api_keys_total" in r.text
+
+
+# ─── Profiling ──────────────────────────────────────────────────────────────
+
+class TestProfiling:
+    def test_profile_blocked_without_admin_key(self):
+        r = client.get("/api/admin/profile?seconds=0.1")
+        assert r.status_code == 403
+
+    def test_profile_returns_collapsed_stacks(self):
+        r = admin_client.get("/api/admin/profile?seconds=0.2&hz=200")
+        assert r.status_code == 200
+        assert int(r.headers["x-genesis-profile-samples"]) > 0
+        line = r.text.splitlines()[0]
+        stack, count = line.rsplit(" ", 1)
+        assert int(count) >= 1
+        assert ";" in stack
+
+    def test_profile_rejects_excessive_duration(self):
+        r = admin_client.get("/api/admin/profile?seconds=600")
+        assert r.status_code == 422
+
+    def test_per_request_profile_header(self):
+        r = admin_client.get("/api/health", headers={"X-Genesis-Profile": "1"})
+        profile_id = r.headers["x-genesis-profile-id"]
+        p = admin_client.get(f"/api/admin/profile/{profile_id}")
+        assert p.status_code == 200
+
+    def test_per_request_profile_ignored_for_tenant_key(self):
+        r = client.get("/api/health", headers={"X-Genesis-Profile": "1"})
+        assert "x-genesis-profile-id" not in r.headers
+
+    def test_request_profile_readable_by_any_worker(self):
+        import sqlite3
+        r = admin_client.get("/api/health", headers={"X-Genesis-Profile": "1"})
+        profile_id = r.headers["x-genesis-profile-id"]
+        with sqlite3.connect(genesis_api._DB_PATH) as conn:  # shared store, not this process's memory
+            row = conn.execute("SELECT collapsed FROM request_profiles WHERE id=?", (profile_id,)).fetchone()
+        assert row is not None
+        assert admin_client.get(f"/api/admin/profile/{profile_id}").text == row[0]
+
+    def test_only_recent_request_profiles_kept(self, monkeypatch):
+        monkeypatch.setattr(genesis_api, "_RECENT_PROFILES_MAX", 2)
+        ids = [admin_client.get("/api/health", headers={"X-Genesis-Profile": "1"}).headers["x-genesis-profile-id"]
+               for _ in range(3)]
+        assert admin_client.get(f"/api/admin/profile/{ids[0]}").status_code == 404
+        assert all(admin_client.get(f"/api/admin/profile/{i}").status_code == 200 for i in ids[1:])
@@ -0,0 +1,66 @@
+"""
+GENESIS v10.1 — Load generator scenario parsing tests (scripts/loadgen.py).
+
+Run: pytest tests/test_loadgen.py -v
+"""
+import importlib.util
+import json
+import os
+
+_ROOT = os.path.join(os.path.dirname(__file__), "..")
+_spec = importlib.util.spec_from_file_location("genesis_loadgen", os.path.join(_ROOT, "scripts", "loadgen.py"))
+loadgen = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(loadgen)
+
+
+def _repo_scenarios(**variables):
+    with open(os.path.join(_ROOT, "genesis_api.http"), encoding="utf-8") as f:
+        return loadgen.parse_http_file(f.read(), variables)
+
+
+class TestHttpFileParser:
+    def test_parses_all_repo_scenarios(self):
+        scenarios = _repo_scenarios()
+        assert len(scenarios) == 11
+        assert scenarios[0].name == "1. System Info"
+        assert {s.method for s in scenarios} == {"GET", "POST"}
+
+    def test_base_url_variable_substituted(self):
+        scenarios = _repo_scenarios()
+        assert all(s.url.startswith("http://localhost:8080/") for s in scenarios)
+
+    def test_base_url_override(self):
+        scenarios = _repo_scenarios(baseUrl="http://127.0.0.1:9999")
+        assert scenarios[1].url == "http://127.0.0.1:9999/api/health"
+
+    def test_headers_and_json_body(self):
+        risk = next(s for s in _repo_scenarios() if "CRITICAL" in s.name)
+        assert risk.method == "POST"
+        assert risk.headers["Content-Type"] == "application/json"
+        assert json.loads(risk.body)["framework"] == "basel_iii"
+
+    def test_get_has_no_body(self):
+        health = next(s for s in _repo_scenarios() if s.url.endswith("/api/health"))
+        assert health.body is None
+
+    def test_untitled_request(self):
+        scenarios = loadgen.parse_http_file("GET http://x/a\n\n###\nPOST http://x/b HTTP/1.1\n\n{}\n")
+        assert [(s.method, s.name) for s in scenarios] == [("GET", "GET http://x/a"), ("POST", "POST http://x/b")]
+
+
+class TestMixes:
+    def test_parse_weighted(self):
+        assert loadgen.parse_weighted("a:3,b") == (["a", "b"], [3.0, 1.0])
+
+    def test_zipf_tenants_skewed(self):
+        tenants, weights = loadgen.zipf_tenants(10)
+        assert len(tenants) == 10
+        assert weights == sorted(weights, reverse=True)
+
+    def test_tenant_substituted_in_body(self):
+        sc = loadgen.Scenario("s", "POST", "/api/risk/score", {}, '{"tenant_id": "x", "cpu": 1}')
+        run = loadgen.LoadRun([sc], "http://h", ["k"], [1.0], ["bank_a"], [1.0], seed=1)
+        url, headers, body = run._build(sc)
+        assert url == "http://h/api/risk/score"
+        assert headers["X-API-Key"] == "k"
+        assert json.loads(body) == {"tenant_id": "bank_a", "cpu": 1}